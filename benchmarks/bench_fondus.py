@@ -0,0 +1,59 @@
+"""
+Benchmark des fondus : pydub (fade_in/fade_out) contre src.dsp (NumPy)
+
+Usage : python -m benchmarks.bench_fondus [--segments N] [--duree S] [--fondu MS]
+"""
+
+import argparse
+import time
+
+import numpy as np
+from pydub import AudioSegment
+
+from src import dsp
+
+
+def _segment_synthetique(duree_s: float, taux: int = 44100, canaux: int = 2) -> AudioSegment:
+    """Bruit 16 bits de la durée demandée"""
+    rng = np.random.default_rng(0)
+    echantillons = rng.integers(-8000, 8000, size=int(duree_s * taux) * canaux, dtype=np.int16)
+    return AudioSegment(
+        data=echantillons.tobytes(), sample_width=2, frame_rate=taux, channels=canaux
+    )
+
+
+def _chronometrer(fonction, segments) -> float:
+    debut = time.perf_counter()
+    for segment in segments:
+        fonction(segment)
+    return time.perf_counter() - debut
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--segments', type=int, default=20, help='Nombre de segments')
+    parser.add_argument('--duree', type=float, default=30.0, help='Durée de chaque segment (s)')
+    parser.add_argument('--fondu', type=int, default=1000, help='Durée des fondus (ms)')
+    args = parser.parse_args()
+
+    segments = [_segment_synthetique(args.duree) for _ in range(args.segments)]
+    fondu = args.fondu
+
+    print(f"🎚️  {args.segments} segments de {args.duree:.0f}s, fondus de {fondu}ms")
+
+    resultats = {
+        'pydub': _chronometrer(lambda s: s.fade_in(fondu).fade_out(fondu), segments),
+    }
+    for courbe in dsp.COURBES_FONDU:
+        resultats[f'dsp ({courbe})'] = _chronometrer(
+            lambda s: dsp.appliquer_fondus(s, fondu, fondu, courbe), segments
+        )
+
+    reference = resultats['pydub']
+    for nom, duree in resultats.items():
+        par_segment = duree / args.segments * 1000
+        print(f"   {nom:28s} {par_segment:8.2f} ms/segment  (x{reference / duree:.1f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark de l'attribution des speakers : boucle d'origine contre src.attribution_speakers
+
+Usage : python -m benchmarks.bench_speakers [--duree H] [--tours N] [--speakers N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src import attribution_speakers
+
+
+class _Tour:
+    def __init__(self, start: float, end: float):
+        self.start = start
+        self.end = end
+
+
+class _DiarisationSynthetique:
+    """Imite l'objet Annotation de pyannote (itertracks)"""
+
+    def __init__(self, tours: list):
+        self.tours = tours
+
+    def itertracks(self, yield_label: bool = False):
+        for start, end, speaker in self.tours:
+            yield _Tour(start, end), None, speaker
+
+
+def _donnees_synthetiques(duree_s: float, nb_tours: int, nb_speakers: int, rng) -> tuple:
+    """Tours (avec chevauchements de parole) et segments de 2 à 8 s découpés en mots"""
+    limites = np.sort(rng.uniform(0, duree_s, nb_tours + 1))
+    tours = []
+    for debut, fin in zip(limites[:-1], limites[1:]):
+        # Un tour sur dix déborde sur le suivant (parole superposée)
+        fin = fin + rng.uniform(0, 2) if rng.random() < 0.1 else fin
+        tours.append((float(debut), float(fin), f"SPEAKER_{rng.integers(nb_speakers):02d}"))
+
+    segments = []
+    position = 0.0
+    while position < duree_s:
+        fin = position + rng.uniform(2, 8)
+        bornes = np.linspace(position, fin, 12)
+        mots = [
+            {'word': 'mot', 'start': float(a), 'end': float(b)}
+            for a, b in zip(bornes[:-1], bornes[1:])
+        ]
+        segments.append({'start': position, 'end': fin, 'text': 'texte', 'words': mots})
+        position = fin + rng.uniform(0, 0.5)
+    return _DiarisationSynthetique(tours), segments
+
+
+def _attribution_boucle(diarize_segments, resultat: dict) -> dict:
+    """Algorithme d'origine : chaque segment comparé à chaque tour"""
+    speaker_intervals = []
+    for turn, _, speaker in diarize_segments.itertracks(yield_label=True):
+        speaker_intervals.append({'start': turn.start, 'end': turn.end, 'speaker': speaker})
+
+    for segment in resultat['segments']:
+        speaker = None
+        max_overlap = 0
+        for interval in speaker_intervals:
+            overlap_start = max(segment['start'], interval['start'])
+            overlap_end = min(segment['end'], interval['end'])
+            overlap = max(0, overlap_end - overlap_start)
+            if overlap > max_overlap:
+                max_overlap = overlap
+                speaker = interval['speaker']
+        segment['speaker'] = speaker if speaker else "SPEAKER_UNKNOWN"
+    return resultat
+
+
+def _copie(segments: list) -> dict:
+    return {'segments': [dict(seg, words=[dict(m) for m in seg['words']]) for seg in segments]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--duree', type=float, default=3.0, help="Durée de l'enregistrement (heures)"
+    )
+    parser.add_argument('--tours', type=int, default=3000, help='Nombre de tours de parole')
+    parser.add_argument('--speakers', type=int, default=4, help='Nombre de speakers')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    diarisation, segments = _donnees_synthetiques(args.duree * 3600, args.tours, args.speakers, rng)
+    nb_mots = sum(len(seg['words']) for seg in segments)
+
+    print(f"👥 {args.duree:.1f} h, {args.tours} tours, {len(segments)} segments, {nb_mots} mots")
+
+    debut = time.perf_counter()
+    reference = _attribution_boucle(diarisation, _copie(segments))
+    temps_boucle = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    segments_seuls = attribution_speakers.attribuer_speakers(
+        diarisation, _copie(segments), par_mot=False
+    )
+    temps_segments = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    avec_mots = attribution_speakers.attribuer_speakers(diarisation, _copie(segments))
+    temps_mots = time.perf_counter() - debut
+
+    identiques = all(
+        a['speaker'] == b['speaker'] == c['speaker']
+        for a, b, c in zip(reference['segments'], segments_seuls['segments'], avec_mots['segments'])
+    )
+    print(f"   {'boucle (origine)':28s} {temps_boucle * 1000:10.1f} ms")
+    print(
+        f"   {'numpy (segments)':28s} {temps_segments * 1000:10.1f} ms  "
+        f"(x{temps_boucle / temps_segments:.0f})"
+    )
+    print(
+        f"   {'numpy (segments + mots)':28s} {temps_mots * 1000:10.1f} ms  "
+        f"(x{temps_boucle / temps_mots:.0f})"
+    )
+    print(f"   {'✅' if identiques else '❌'} Attributions identiques à la boucle d'origine")
+
+
+if __name__ == '__main__':
+    main()
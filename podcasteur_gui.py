@@ -5,6 +5,7 @@ Lanceur de l'interface graphique Podcasteur
 
 import sys
 import traceback
+import multiprocessing
 from dotenv import load_dotenv
 from pathlib import Path
 import os
@@ -44,6 +45,9 @@ sys.excepthook = exception_hook
 from src.gui.main import main
 
 if __name__ == '__main__':
+    # Nécessaire pour les pools de processus dans l'exécutable PyInstaller
+    multiprocessing.freeze_support()
+
     try:
         main()
     except Exception as e:
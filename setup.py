@@ -21,6 +21,7 @@ setup(
     include_package_data=True,
     install_requires=[
         'pydub>=0.25.1',
+        'numpy>=1.24.0',
         'openai-whisper>=20231117',
         'torch>=2.0.0',
         'anthropic>=0.18.0',
@@ -0,0 +1,626 @@
+"""
+Module d'assemblage du montage
+Calcule la disposition finale (segments, silences, intro/outro) puis
+écrit chaque élément une seule fois dans un tampon préalloué
+"""
+
+from pydub import AudioSegment
+from concurrent.futures import ThreadPoolExecutor
+import tempfile
+import numpy as np
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+from . import dsp
+from . import flux_audio
+from . import sonie
+
+
+# Taille des blocs de silence envoyés à la sortie en flux (frames)
+TAILLE_BLOC_SILENCE = 65536
+
+# Règles de choix du format de sortie (audio.format_montage)
+CHOIX_FORMAT = ('majoritaire', 'maximum')
+
+_CLES_FORMAT = ('canaux', 'taux_echantillonnage', 'largeur_echantillon')
+
+
+class SourceDifferee:
+    """Élément du plan dont l'audio n'est chargé qu'au moment de l'écriture"""
+
+    def __init__(
+        self,
+        charger: Callable[[], AudioSegment],
+        format_source: dict,
+        nb_frames: int,
+        cache=None,
+        cle_cache: Optional[str] = None
+    ):
+        """
+        Args:
+            charger: Fonction retournant l'audio de l'élément (fondus appliqués)
+            format_source: Format de l'audio retourné
+            nb_frames: Longueur de l'audio retourné, à la fréquence source
+            cache: CacheSegments conservant le PCM traité (optionnel)
+            cle_cache: Identité de l'élément dans le cache
+        """
+        self.charger = charger
+        self.format = format_source
+        self.nb_frames = nb_frames
+        self.cache = cache
+        self.cle_cache = cle_cache
+        # Une passe de mesure puis d'écriture ne compte qu'une consultation du cache
+        self._cache_consulte = False
+
+    def charger_au_format(self, format_sortie: dict) -> AudioSegment:
+        """Audio de l'élément au format de sortie, repris du cache si possible"""
+        if self.cache is None or self.cle_cache is None:
+            return harmoniser(self.charger(), format_sortie)
+
+        donnees = self.cache.lire(self.cle_cache, format_sortie, compter=not self._cache_consulte)
+        self._cache_consulte = True
+        if donnees is not None:
+            return AudioSegment(
+                data=donnees,
+                sample_width=format_sortie['largeur_echantillon'],
+                frame_rate=format_sortie['taux_echantillonnage'],
+                channels=format_sortie['canaux']
+            )
+
+        audio = harmoniser(self.charger(), format_sortie)
+        self.cache.ecrire(self.cle_cache, format_sortie, audio.raw_data)
+        return audio
+
+
+def format_de(extrait: Union[AudioSegment, SourceDifferee]) -> dict:
+    """Format PCM d'un extrait chargé ou différé"""
+    if isinstance(extrait, SourceDifferee):
+        return {c: extrait.format[c] for c in _CLES_FORMAT}
+    return {
+        'canaux': extrait.channels,
+        'taux_echantillonnage': extrait.frame_rate,
+        'largeur_echantillon': extrait.sample_width
+    }
+
+
+def format_montage(audios: List[Union[AudioSegment, SourceDifferee]]) -> dict:
+    """
+    Choisit le format de sortie d'un montage
+
+    Même règle que pydub lors d'une addition : maximum des canaux,
+    des fréquences et des largeurs d'échantillon.
+    """
+    formats = [format_de(a) for a in audios]
+    return {
+        'canaux': max(f['canaux'] for f in formats),
+        'taux_echantillonnage': max(f['taux_echantillonnage'] for f in formats),
+        'largeur_echantillon': max(f['largeur_echantillon'] for f in formats)
+    }
+
+
+def _duree_de(extrait: Union[AudioSegment, SourceDifferee]) -> float:
+    """Durée d'un extrait chargé ou différé (secondes)"""
+    if isinstance(extrait, SourceDifferee):
+        return extrait.nb_frames / extrait.format['taux_echantillonnage']
+    return extrait.frame_count() / extrait.frame_rate
+
+
+def format_majoritaire(audios: List[Union[AudioSegment, SourceDifferee]]) -> dict:
+    """
+    Format le plus représenté, pondéré par la durée des éléments
+
+    Le moins de frames possible est ainsi converti ; en cas d'égalité, le
+    format de meilleure qualité l'emporte.
+    """
+    durees = {}
+    for audio in audios:
+        format_audio = format_de(audio)
+        cle = tuple(format_audio[c] for c in _CLES_FORMAT)
+        durees[cle] = durees.get(cle, 0) + _duree_de(audio)
+
+    meilleur = max(durees, key=lambda cle: (durees[cle], cle))
+    return dict(zip(_CLES_FORMAT, meilleur))
+
+
+def choisir_format(
+    audios: List[Union[AudioSegment, SourceDifferee]],
+    reglage='majoritaire'
+) -> dict:
+    """
+    Format cible d'un montage selon la configuration
+
+    Args:
+        audios: Éléments du montage, chargés ou différés
+        reglage: 'majoritaire', 'maximum' (règle de pydub) ou dictionnaire
+                 imposant tout ou partie de canaux, taux_echantillonnage et
+                 largeur_echantillon (le reste suit la majorité)
+
+    Returns:
+        Format PCM de la sortie
+    """
+    if isinstance(reglage, dict):
+        impose = {c: int(reglage[c]) for c in _CLES_FORMAT if reglage.get(c)}
+        return {**format_majoritaire(audios), **impose}
+    if reglage == 'maximum':
+        return format_montage(audios)
+    if reglage == 'majoritaire':
+        return format_majoritaire(audios)
+    raise ValueError(f"Format de montage inconnu : {reglage} (choix : {', '.join(CHOIX_FORMAT)})")
+
+
+def decrire_format(format_pcm: dict) -> str:
+    """Description lisible d'un format PCM"""
+    canaux = {1: 'mono', 2: 'stéréo'}.get(format_pcm['canaux'], f"{format_pcm['canaux']} canaux")
+    bits = 8 * format_pcm['largeur_echantillon']
+    return f"{format_pcm['taux_echantillonnage']} Hz, {canaux}, {bits} bits"
+
+
+def harmoniser(audio: AudioSegment, format_sortie: dict) -> AudioSegment:
+    """Convertit un élément au format de sortie (une seule fois par élément)"""
+    return dsp.convertir_format(audio, format_sortie)
+
+
+class PlanMontage:
+    """Disposition des éléments du montage dans le fichier de sortie"""
+
+    def __init__(self, format_sortie: dict):
+        """
+        Initialise un plan vide
+
+        Args:
+            format_sortie: Format PCM de la sortie
+        """
+        self.format = format_sortie
+        self.elements = []
+        self.nb_frames = 0
+        # Renseignée par la normalisation en sonie (valeurs mesurées)
+        self.mesure_sonie = None
+
+    def ajouter(self, nature: str, audio: Optional[AudioSegment], nb_frames: int, **infos) -> dict:
+        """
+        Ajoute un élément à la suite du plan
+
+        Args:
+            nature: 'segment', 'silence', 'intro' ou 'outro'
+            audio: Audio de l'élément (None pour un silence)
+            nb_frames: Longueur réservée dans la sortie
+            **infos: Informations conservées avec l'élément (description...)
+
+        Returns:
+            L'élément ajouté
+        """
+        element = {
+            'nature': nature,
+            'audio': audio,
+            'debut_frame': self.nb_frames,
+            'nb_frames': nb_frames,
+            **infos
+        }
+        self.elements.append(element)
+        self.nb_frames += nb_frames
+        return element
+
+    def ajouter_audio(self, nature: str, audio: AudioSegment, **infos) -> dict:
+        """Ajoute un audio déjà au format de sortie"""
+        return self.ajouter(nature, audio, int(audio.frame_count()), **infos)
+
+    def ajouter_differe(self, nature: str, source: SourceDifferee, **infos) -> dict:
+        """Ajoute un élément chargé seulement à l'écriture"""
+        taux_source = source.format['taux_echantillonnage']
+        taux_sortie = self.format['taux_echantillonnage']
+        # Longueur exacte produite par le rééchantillonnage de harmoniser()
+        nb_frames = dsp.longueur_reechantillonnee(source.nb_frames, taux_source, taux_sortie)
+        return self.ajouter(nature, source, nb_frames, **infos)
+
+    def ajouter_silence(self, duree_ms: int) -> dict:
+        """Ajoute un silence de la durée indiquée"""
+        nb_frames = int(self.format['taux_echantillonnage'] * duree_ms / 1000)
+        return self.ajouter('silence', None, nb_frames)
+
+    def secondes(self, frames: int) -> float:
+        """Convertit un nombre de frames en secondes"""
+        return frames / self.format['taux_echantillonnage']
+
+    def debut(self, element: dict) -> float:
+        """Position de début d'un élément dans la sortie (secondes)"""
+        return self.secondes(element['debut_frame'])
+
+    def fin(self, element: dict) -> float:
+        """Position de fin d'un élément dans la sortie (secondes)"""
+        return self.secondes(element['debut_frame'] + element['nb_frames'])
+
+    @property
+    def duree(self) -> float:
+        """Durée totale de la sortie (secondes)"""
+        return self.secondes(self.nb_frames)
+
+    @property
+    def largeur_frame(self) -> int:
+        """Nombre d'octets par frame"""
+        return self.format['canaux'] * self.format['largeur_echantillon']
+
+    def elements_de_nature(self, nature: str) -> List[dict]:
+        """Liste les éléments d'une nature donnée"""
+        return [e for e in self.elements if e['nature'] == nature]
+
+    def plage_contenu(self) -> tuple:
+        """Frames de début et de fin du contenu (segments et silences, sans intro/outro)"""
+        segments = self.elements_de_nature('segment')
+        if not segments:
+            return 0, 0
+        return segments[0]['debut_frame'], segments[-1]['debut_frame'] + segments[-1]['nb_frames']
+
+
+def planifier_montage(
+    extraits: List[Union[AudioSegment, SourceDifferee]],
+    duree_silence: int,
+    descriptions: Optional[List[dict]] = None,
+    intro: Optional[AudioSegment] = None,
+    outro: Optional[AudioSegment] = None,
+    format_sortie: Optional[dict] = None
+) -> PlanMontage:
+    """
+    Calcule le plan complet d'un montage
+
+    Chaque élément est converti une fois au format de sortie puis
+    positionné ; les positions de sortie des métadonnées se lisent
+    ensuite directement sur le plan.
+
+    Args:
+        extraits: Segments (fondus déjà appliqués) dans l'ordre du montage,
+                  chargés ou différés
+        duree_silence: Silence entre segments en ms
+        descriptions: Informations à attacher à chaque segment
+        intro: Générique de début optionnel
+        outro: Générique de fin optionnel
+        format_sortie: Format cible (défaut : règle de pydub, voir format_montage)
+
+    Returns:
+        Plan du montage
+    """
+    if format_sortie is None:
+        elements_sonores = [a for a in (intro, outro) if a is not None]
+        format_sortie = format_montage(extraits + elements_sonores)
+    plan = PlanMontage(format_sortie)
+
+    if intro is not None:
+        plan.ajouter_audio('intro', harmoniser(intro, format_sortie))
+
+    for i, extrait in enumerate(extraits):
+        if i > 0:
+            plan.ajouter_silence(duree_silence)
+        infos = descriptions[i] if descriptions else {}
+        if isinstance(extrait, SourceDifferee):
+            plan.ajouter_differe('segment', extrait, **infos)
+        else:
+            plan.ajouter_audio('segment', harmoniser(extrait, format_sortie), **infos)
+
+    if outro is not None:
+        plan.ajouter_audio('outro', harmoniser(outro, format_sortie))
+
+    return plan
+
+
+def metadonnees_segments(plan: PlanMontage) -> List[dict]:
+    """
+    Construit les métadonnées des segments à partir du plan
+
+    Les positions de sortie tiennent déjà compte de l'intro et des silences.
+    """
+    return [
+        {
+            'index': element.get('index'),
+            'description': element.get('description'),
+            'debut_source': element.get('debut_source'),
+            'fin_source': element.get('fin_source'),
+            'debut_output': plan.debut(element),
+            'fin_output': plan.fin(element),
+            'duree': plan.secondes(element['nb_frames']),
+            'fichier_source': element.get('fichier_source')
+        }
+        for element in plan.elements_de_nature('segment')
+    ]
+
+
+def assembler(
+    plan: PlanMontage,
+    normaliser: bool = False,
+    parametres_sonie: Optional[dict] = None
+) -> AudioSegment:
+    """
+    Assemble le montage en une seule passe
+
+    Le tampon de sortie est alloué une fois à sa taille finale (les
+    silences restent à zéro) et chaque élément y est copié à sa position.
+
+    Args:
+        plan: Plan du montage
+        normaliser: Normalise le contenu (hors intro/outro) ; par défaut
+                    sur le pic, comme pydub.effects.normalize
+        parametres_sonie: Cible LUFS et plafond true-peak (voir
+                          sonie.parametres_sonie) pour normaliser en sonie
+
+    Returns:
+        AudioSegment final
+    """
+    largeur_frame = plan.largeur_frame
+    tampon = bytearray(plan.nb_frames * largeur_frame)
+
+    for element in plan.elements:
+        if element['audio'] is None:
+            continue
+        debut = element['debut_frame'] * largeur_frame
+        taille = element['nb_frames'] * largeur_frame
+        donnees = memoryview(_audio_element(plan, element).raw_data)[:taille]
+        tampon[debut:debut + len(donnees)] = donnees
+        # L'élément est copié : on libère sa mémoire au plus tôt
+        element['audio'] = None
+
+    if normaliser and parametres_sonie:
+        echantillons = _tableau(plan, tampon)
+        debut, fin = plan.plage_contenu()
+        contenu = echantillons[debut:fin]
+
+        analyseur = _analyseur(plan)
+        analyseur.ajouter(contenu)
+        gain_db = _enregistrer_mesure(plan, analyseur, parametres_sonie)
+        dsp.appliquer_gain(contenu, gain_db)
+
+        episode = _analyseur(plan)
+        episode.ajouter(echantillons)
+        plan.mesure_sonie['episode'] = episode.resultat()
+    elif normaliser:
+        debut, fin = plan.plage_contenu()
+        normaliser_plage(tampon, debut * largeur_frame, fin * largeur_frame,
+                         plan.format['largeur_echantillon'])
+
+    return AudioSegment(
+        data=tampon,
+        sample_width=plan.format['largeur_echantillon'],
+        frame_rate=plan.format['taux_echantillonnage'],
+        channels=plan.format['canaux']
+    )
+
+
+def exporter_en_flux(
+    plan: PlanMontage,
+    destinations: List[Tuple[Path, dict]],
+    audio_config: dict,
+    normaliser: bool = False,
+    parametres_sonie: Optional[dict] = None
+):
+    """
+    Assemble et encode le montage au fil de l'eau
+
+    Les éléments sont écrits dans l'ordre du plan directement vers la
+    sortie (ffmpeg via stdin, ou WAV) : seul l'élément en cours est en
+    mémoire, et l'encodage avance pendant l'assemblage. Avec plusieurs
+    destinations, le même flux alimente un encodeur par cible en parallèle.
+
+    La normalisation demande une première passe de lecture : mesure du
+    pic, ou de la sonie intégrée et du true-peak si parametres_sonie est
+    fourni. Le PCM des éléments différés lu pendant cette passe est gardé
+    dans un fichier temporaire et relu à la seconde : chaque segment n'est
+    extrait (et décodé) qu'une fois. Le gain unique qui en découle est
+    appliqué pendant l'export, et la sonie de l'épisode complet est
+    mesurée au passage.
+
+    Args:
+        plan: Plan du montage
+        destinations: Couples (fichier à créer, cible d'export), voir
+                      flux_audio.cibles_export
+        audio_config: Section 'audio' de la configuration (débit, qualité)
+        normaliser: Normalise le contenu (hors intro/outro)
+        parametres_sonie: Cible LUFS et plafond true-peak (voir
+                          sonie.parametres_sonie) pour normaliser en sonie
+    """
+    if not normaliser:
+        _ecrire_elements(plan, destinations, audio_config)
+        return
+
+    type_numpy = dsp.type_echantillons(plan.format['largeur_echantillon'])
+    episode = None
+
+    with _ReprisePCM(destinations[0][0].parent) as reprise:
+        if parametres_sonie:
+            gain_db = _enregistrer_mesure(plan, _mesurer_contenu(plan, reprise), parametres_sonie)
+            facteur = 10 ** (gain_db / 20)
+            episode = _analyseur(plan)
+        else:
+            facteur = dsp.facteur_normalisation(_pic_contenu(plan, reprise), type_numpy)
+
+        _ecrire_elements(plan, destinations, audio_config, facteur, episode, reprise)
+
+    if episode is not None:
+        plan.mesure_sonie['episode'] = episode.resultat()
+
+
+def _ecrire_elements(
+    plan: PlanMontage,
+    destinations: List[Tuple[Path, dict]],
+    audio_config: dict,
+    facteur: Optional[float] = None,
+    episode: Optional['sonie.AnalyseurSonie'] = None,
+    reprise: Optional['_ReprisePCM'] = None
+):
+    """Seconde passe de exporter_en_flux : écrit les éléments dans l'ordre du plan"""
+    type_numpy = dsp.type_echantillons(plan.format['largeur_echantillon'])
+
+    with flux_audio.ouvrir_sorties(destinations, plan.format, audio_config) as sortie:
+        for element in plan.elements:
+            if element['audio'] is None:
+                # Silence envoyé par blocs pour ne pas allouer toute sa durée
+                restant = element['nb_frames']
+                while restant > 0:
+                    nb = min(restant, TAILLE_BLOC_SILENCE)
+                    sortie.ecrire(bytes(nb * plan.largeur_frame))
+                    restant -= nb
+                if episode is not None:
+                    episode.ajouter_silence(element['nb_frames'])
+                continue
+
+            donnees = reprise.relire(element) if reprise is not None else None
+            if donnees is None:
+                donnees = _donnees_element(plan, element)
+            if facteur is not None and element['nature'] == 'segment':
+                donnees = bytearray(donnees)
+                dsp.appliquer_gain_lineaire(np.frombuffer(donnees, dtype=type_numpy), facteur)
+
+            sortie.ecrire(donnees)
+            if episode is not None:
+                episode.ajouter(_tableau(plan, donnees))
+            element['audio'] = None
+
+
+def exporter_audio(audio: AudioSegment, destinations: List[Tuple[Path, dict]], audio_config: dict):
+    """
+    Exporte un montage assemblé en mémoire vers chaque destination
+
+    Les encodages (un processus ffmpeg par cible) tournent en parallèle.
+
+    Args:
+        audio: Montage assemblé
+        destinations: Couples (fichier à créer, cible d'export)
+        audio_config: Section 'audio' de la configuration
+    """
+    def exporter(destination):
+        chemin, cible = destination
+        parametres = flux_audio.parametres_encodage({**audio_config, **cible}, cible['format'])
+        # Sans option, pydub écrit le WAV lui-même au lieu d'appeler ffmpeg
+        audio.export(chemin, format=cible['format'], parameters=parametres or None)
+
+    with ThreadPoolExecutor(max_workers=len(destinations)) as executeur:
+        # list() propage la première exception éventuelle
+        list(executeur.map(exporter, destinations))
+
+
+def _tableau(plan: PlanMontage, donnees) -> np.ndarray:
+    """Vue (frames, canaux) sur des données PCM au format du plan"""
+    type_numpy = dsp.type_echantillons(plan.format['largeur_echantillon'])
+    return np.frombuffer(donnees, dtype=type_numpy).reshape(-1, plan.format['canaux'])
+
+
+def _analyseur(plan: PlanMontage) -> 'sonie.AnalyseurSonie':
+    """Analyseur de sonie au format du plan"""
+    return sonie.AnalyseurSonie(plan.format['taux_echantillonnage'], plan.format['canaux'])
+
+
+class _ReprisePCM:
+    """
+    PCM des éléments différés lus pendant la première passe de l'export
+
+    Conservé dans un fichier temporaire (sur disque, pas en mémoire) et
+    relu tel quel à la seconde passe, sans nouvelle extraction.
+    """
+
+    def __init__(self, dossier: Path):
+        self._fichier = tempfile.TemporaryFile(dir=dossier, prefix='.reprise_')
+        self._positions = {}
+
+    def garder(self, element: dict, donnees: bytes):
+        """Conserve le PCM d'un élément différé (les autres sont déjà en mémoire)"""
+        if not isinstance(element['audio'], SourceDifferee):
+            return
+        self._fichier.seek(0, 2)
+        self._positions[id(element)] = (self._fichier.tell(), len(donnees))
+        self._fichier.write(donnees)
+
+    def relire(self, element: dict) -> Optional[bytes]:
+        """PCM conservé pour un élément, ou None s'il n'a pas été lu en première passe"""
+        position = self._positions.pop(id(element), None)
+        if position is None:
+            return None
+        self._fichier.seek(position[0])
+        return self._fichier.read(position[1])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self._fichier.close()
+
+
+def _mesurer_contenu(
+    plan: PlanMontage,
+    reprise: Optional[_ReprisePCM] = None
+) -> 'sonie.AnalyseurSonie':
+    """Mesure la sonie du contenu, silences compris (première passe en flux)"""
+    analyseur = _analyseur(plan)
+    debut, fin = plan.plage_contenu()
+    for element in plan.elements:
+        if not debut <= element['debut_frame'] < fin:
+            continue
+        if element['audio'] is None:
+            analyseur.ajouter_silence(element['nb_frames'])
+        else:
+            donnees = _donnees_element(plan, element)
+            analyseur.ajouter(_tableau(plan, donnees))
+            if reprise is not None:
+                reprise.garder(element, donnees)
+    return analyseur
+
+
+def _enregistrer_mesure(
+    plan: PlanMontage,
+    analyseur: 'sonie.AnalyseurSonie',
+    parametres_sonie: dict
+) -> float:
+    """Calcule le gain de normalisation et note les mesures dans le plan"""
+    gain_db = sonie.gain_normalisation(
+        analyseur.lufs_integre,
+        analyseur.true_peak_dbtp,
+        parametres_sonie['cible_lufs'],
+        parametres_sonie['plafond_true_peak']
+    )
+    plan.mesure_sonie = {
+        'cible_lufs': parametres_sonie['cible_lufs'],
+        'plafond_true_peak_dbtp': parametres_sonie['plafond_true_peak'],
+        'contenu': analyseur.resultat(),
+        'gain_db': round(gain_db, 2)
+    }
+    return gain_db
+
+
+def _audio_element(plan: PlanMontage, element: dict) -> AudioSegment:
+    """Audio d'un élément au format de sortie (chargé si différé)"""
+    audio = element['audio']
+    if isinstance(audio, SourceDifferee):
+        return audio.charger_au_format(plan.format)
+    return audio
+
+
+def _donnees_element(
+    plan: PlanMontage,
+    element: dict,
+    audio: Optional[AudioSegment] = None
+) -> bytes:
+    """Données PCM d'un élément, exactement à la longueur réservée par le plan"""
+    taille = element['nb_frames'] * plan.largeur_frame
+    if audio is None:
+        audio = _audio_element(plan, element)
+    donnees = audio.raw_data[:taille]
+    if len(donnees) < taille:
+        donnees += bytes(taille - len(donnees))
+    return donnees
+
+
+def _pic_contenu(plan: PlanMontage, reprise: Optional[_ReprisePCM] = None) -> float:
+    """Pic d'amplitude des segments (première passe de l'export en flux)"""
+    type_numpy = dsp.type_echantillons(plan.format['largeur_echantillon'])
+    pic = 0
+    for element in plan.elements_de_nature('segment'):
+        audio = _audio_element(plan, element)
+        pic = max(pic, dsp.pic(np.frombuffer(audio.raw_data, dtype=type_numpy)))
+        if reprise is not None:
+            reprise.garder(element, _donnees_element(plan, element, audio))
+    return pic
+
+
+def normaliser_plage(tampon: bytearray, debut: int, fin: int, largeur: int, marge: float = 0.1):
+    """
+    Normalise le pic d'une plage du tampon, sur place
+
+    Même calcul que pydub.effects.normalize (marge de 0,1 dB).
+    """
+    echantillons = np.frombuffer(tampon, dtype=dsp.type_echantillons(largeur))
+    dsp.normaliser(echantillons[debut // largeur:fin // largeur], marge)
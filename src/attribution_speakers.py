@@ -0,0 +1,142 @@
+"""
+Module d'attribution des speakers
+Associe chaque segment (et chaque mot) au tour de parole de la diarisation
+qui le recouvre le plus. Les tours sont triés une fois : seuls ceux qui
+peuvent recouvrir un segment sont comparés, en un calcul NumPy vectorisé
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+
+SPEAKER_INCONNU = "SPEAKER_UNKNOWN"
+
+
+def tours_diarisation(diarize_segments) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Tours de parole d'un résultat pyannote
+
+    Returns:
+        Tuple (debuts, fins, speakers) dans l'ordre de itertracks()
+    """
+    debuts, fins, speakers = [], [], []
+    for turn, _, speaker in diarize_segments.itertracks(yield_label=True):
+        debuts.append(turn.start)
+        fins.append(turn.end)
+        speakers.append(speaker)
+    return np.array(debuts, np.float64), np.array(fins, np.float64), speakers
+
+
+def recouvrement_majoritaire(
+    debuts: np.ndarray,
+    fins: np.ndarray,
+    tours_debuts: np.ndarray,
+    tours_fins: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tour qui recouvre le plus chaque plage [debut, fin]
+
+    À recouvrement égal, le premier tour (ordre d'origine) l'emporte ;
+    un recouvrement nul ne compte pas.
+
+    Args:
+        debuts, fins: Plages à attribuer (secondes)
+        tours_debuts, tours_fins: Tours de parole (secondes)
+
+    Returns:
+        Tuple (indice du tour ou -1, recouvrement en secondes)
+    """
+    debuts = np.asarray(debuts, np.float64)
+    fins = np.asarray(fins, np.float64)
+    indices = np.full(len(debuts), -1, np.int64)
+    recouvrements = np.zeros(len(debuts), np.float64)
+    if not len(debuts) or not len(tours_debuts):
+        return indices, recouvrements
+
+    # Tours triés par début ; fin maximale cumulée pour borner la recherche
+    ordre = np.argsort(tours_debuts, kind='stable')
+    tries_debuts = tours_debuts[ordre]
+    tries_fins = tours_fins[ordre]
+    fin_max = np.maximum.accumulate(tries_fins)
+
+    # Candidats de chaque plage : tours [premier, dernier[ (début < fin de la
+    # plage, et aucun tour avant `premier` ne se termine après son début)
+    premiers = np.searchsorted(fin_max, debuts, side='right')
+    derniers = np.searchsorted(tries_debuts, fins, side='left')
+    nombres = np.maximum(derniers - premiers, 0)
+    if not nombres.sum():
+        return indices, recouvrements
+
+    # Une ligne par couple (plage, tour candidat)
+    plages = np.repeat(np.arange(len(debuts)), nombres)
+    departs = np.cumsum(nombres) - nombres
+    candidats = (
+        np.arange(nombres.sum()) - np.repeat(departs, nombres) + np.repeat(premiers, nombres)
+    )
+
+    recouvrement = np.maximum(
+        np.minimum(fins[plages], tries_fins[candidats])
+        - np.maximum(debuts[plages], tries_debuts[candidats]),
+        0
+    )
+
+    # Meilleur recouvrement par plage, puis premier tour d'origine qui l'atteint
+    avec_candidats = np.flatnonzero(nombres)
+    groupes = departs[avec_candidats]
+    meilleurs = np.maximum.reduceat(recouvrement, groupes)
+    atteint = recouvrement == np.repeat(meilleurs, nombres[avec_candidats])
+    origines = np.where(atteint, ordre[candidats], len(tours_debuts))
+    gagnants = np.minimum.reduceat(origines, groupes)
+
+    positif = meilleurs > 0
+    indices[avec_candidats[positif]] = gagnants[positif]
+    recouvrements[avec_candidats] = meilleurs
+    return indices, recouvrements
+
+
+def attribuer_speakers(diarize_segments, resultat: dict, par_mot: bool = True) -> dict:
+    """
+    Attribue à chaque segment le speaker majoritaire
+
+    Chaque segment reçoit 'speaker' et 'confiance_speaker' (part de sa
+    durée recouverte par ce speaker). Avec par_mot, chaque mot horodaté
+    reçoit aussi son speaker majoritaire.
+
+    Args:
+        diarize_segments: Résultat de pyannote
+        resultat: Transcription alignée (modifiée sur place)
+        par_mot: Attribuer aussi les mots
+
+    Returns:
+        Résultat avec speakers attribués
+    """
+    tours_debuts, tours_fins, speakers = tours_diarisation(diarize_segments)
+    segments = resultat['segments']
+
+    # Segments et mots attribués en un seul passage
+    plages = [(seg['start'], seg['end']) for seg in segments]
+    mots = []
+    if par_mot:
+        mots = [
+            mot for seg in segments for mot in seg.get('words', [])
+            if mot.get('start') is not None and mot.get('end') is not None
+        ]
+        plages += [(mot['start'], mot['end']) for mot in mots]
+
+    bornes = np.array(plages, np.float64).reshape(-1, 2)
+    indices, recouvrements = recouvrement_majoritaire(
+        bornes[:, 0], bornes[:, 1], tours_debuts, tours_fins
+    )
+    durees = bornes[:, 1] - bornes[:, 0]
+    confiances = np.divide(recouvrements, durees, out=np.zeros_like(durees), where=durees > 0)
+
+    for segment, indice, confiance in zip(segments, indices.tolist(), confiances.tolist()):
+        segment['speaker'] = speakers[indice] if indice >= 0 else SPEAKER_INCONNU
+        segment['confiance_speaker'] = round(min(confiance, 1.0), 3)
+
+    for mot, indice in zip(mots, indices[len(segments):].tolist()):
+        if indice >= 0:
+            mot['speaker'] = speakers[indice]
+
+    return resultat
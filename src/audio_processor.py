@@ -4,13 +4,25 @@ Gère la concaténation, les fondus et l'export
 """
 
 from pydub import AudioSegment
-from pydub.effects import normalize
 from pathlib import Path
-from typing import List, Union, Optional
+from typing import Callable, List, Union, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+import contextlib
+import io
 import os
 import json
+import tempfile
 from datetime import datetime
 
+from . import assemblage
+from . import cache_rendu
+from . import dsp
+from . import flux_audio
+from . import index_audio
+from . import sonie
+from .elements_sonores import CacheElementsSonores, ElementSonore
+
 
 class AudioProcessor:
     """Gère toutes les opérations de traitement audio"""
@@ -24,14 +36,17 @@ class AudioProcessor:
         """
         self.config = config
         self.audio_config = config['audio']
+        # Durée réellement écrite de chaque fichier par la dernière concaténation
+        self.durees_concatenees: List[float] = []
 
     def concatener_fichiers(
         self,
         fichiers: List[Path],
         chemin_sortie: Path,
         methode_tri: str = "nom",
-        ordre_tri: str = "asc"
-    ) -> AudioSegment:
+        ordre_tri: str = "asc",
+        en_flux: Optional[bool] = None
+    ) -> Union[AudioSegment, Path]:
         """
         Concatène plusieurs fichiers audio en un seul
 
@@ -40,23 +55,36 @@ class AudioProcessor:
             chemin_sortie: Chemin pour sauvegarder le fichier concaténé
             methode_tri: "nom" ou "date"
             ordre_tri: "asc" ou "desc"
+            en_flux: Écrit le WAV bloc par bloc sans tout charger en mémoire
+                     (par défaut : audio.concatenation_flux de la config)
 
         Returns:
-            AudioSegment concaténé
+            AudioSegment concaténé, ou chemin du fichier créé en mode flux ;
+            self.durees_concatenees reçoit la durée de chaque fichier dans
+            le résultat (secondes, dans l'ordre de concaténation)
         """
         print(f"🔗 Concaténation de {len(fichiers)} fichiers...")
+        self.durees_concatenees = []
 
         # Trier les fichiers
-        fichiers_tries = self._trier_fichiers(fichiers, methode_tri, ordre_tri)
+        fichiers_tries = self.trier_fichiers(fichiers, methode_tri, ordre_tri)
+
+        if en_flux is None:
+            en_flux = self.audio_config.get('concatenation_flux', True)
+
+        if en_flux:
+            return self._concatener_en_flux(fichiers_tries, chemin_sortie)
 
         # Charger le premier fichier
         combine = AudioSegment.from_file(fichiers_tries[0])
+        self.durees_concatenees.append(combine.frame_count() / combine.frame_rate)
         print(f"  ✓ Chargé {fichiers_tries[0].name}")
 
         # Concaténer les autres
         for i, fichier in enumerate(fichiers_tries[1:], 2):
             audio = AudioSegment.from_file(fichier)
             combine += audio
+            self.durees_concatenees.append(audio.frame_count() / audio.frame_rate)
             print(f"  ✓ Ajouté {fichier.name} ({i}/{len(fichiers_tries)})")
 
         # Exporter
@@ -67,7 +95,196 @@ class AudioProcessor:
 
         return combine
 
-    def _trier_fichiers(
+    def _concatener_en_flux(
+        self,
+        fichiers_tries: List[Path],
+        chemin_sortie: Path
+    ) -> Path:
+        """
+        Concatène en décodant chaque fichier par blocs
+
+        Seul un bloc est gardé en mémoire à la fois. Les conversions sont
+        celles de pydub (combine += audio) : le fichier créé est identique
+        octet pour octet à celui de la concaténation en mémoire.
+
+        Args:
+            fichiers_tries: Fichiers dans l'ordre de concaténation
+            chemin_sortie: Chemin du fichier WAV à créer
+
+        Returns:
+            Chemin du fichier créé
+        """
+        if self.audio_config.get('concatenation_directe', True):
+            chunks = [flux_audio.lire_chunks_wav(f) for f in fichiers_tries]
+            if self._formats_identiques(chunks):
+                return self._concatener_sans_decodage(fichiers_tries, chunks, chemin_sortie)
+            print("   ℹ️  Formats différents : décodage des fichiers")
+
+        # Lire les en-têtes pour fixer le format de sortie avant d'écrire
+        formats = [flux_audio.lire_format(f) for f in fichiers_tries]
+        promotions = flux_audio.PromotionsPCM(formats)
+
+        # Les formats compressés sont décodés en parallèle si possible
+        a_decoder = [i for i, f in enumerate(formats) if not f['wav_natif']]
+        nb_processus = self._nombre_processus_decodage(len(a_decoder))
+
+        with flux_audio.EcrivainWav(chemin_sortie, promotions.format_sortie) as sortie:
+            if nb_processus > 1:
+                self._assembler_decodage_parallele(
+                    fichiers_tries, formats, promotions, a_decoder,
+                    nb_processus, sortie, chemin_sortie.parent
+                )
+            else:
+                for i, (fichier, format_source) in enumerate(zip(fichiers_tries, formats)):
+                    convertisseur = promotions.convertisseur_ajout(i, format_source)
+                    debut = sortie.nb_frames
+
+                    for bloc in flux_audio.iterer_blocs_pcm(fichier, format_source):
+                        sortie.ecrire(promotions.reconvertir(i, convertisseur.convertir(bloc)))
+
+                    self._noter_duree(sortie, debut)
+                    self._afficher_ajout(fichier, i + 1, len(fichiers_tries))
+
+        print(f"✅ Concaténation terminée : {sortie.duree:.1f}s")
+        print(f"📄 Fichier créé : {chemin_sortie.name}")
+
+        return chemin_sortie
+
+    def _nombre_processus_decodage(self, nb_fichiers: int) -> int:
+        """Nombre de processus de décodage (audio.processus_decodage, 0 = auto)"""
+        nb_processus = self.audio_config.get('processus_decodage', 0)
+        if not nb_processus:
+            nb_processus = os.cpu_count() or 1
+        return max(1, min(nb_processus, nb_fichiers))
+
+    def _assembler_decodage_parallele(
+        self,
+        fichiers_tries: List[Path],
+        formats: List[dict],
+        promotions: 'flux_audio.PromotionsPCM',
+        a_decoder: List[int],
+        nb_processus: int,
+        sortie: 'flux_audio.EcrivainWav',
+        dossier_temp: Path
+    ):
+        """
+        Décode les fichiers compressés dans un pool de processus
+
+        Chaque processus écrit un fichier PCM temporaire au format de
+        l'accumulateur après son ajout ; l'assemblage suit l'ordre de tri,
+        applique les reconversions suivantes et commence dès que le
+        fichier suivant est prêt.
+        """
+        print(f"   ⚙️  Décodage parallèle : {len(a_decoder)} fichiers, {nb_processus} processus")
+
+        with tempfile.TemporaryDirectory(dir=dossier_temp, prefix='.concat_') as dossier:
+            with ProcessPoolExecutor(max_workers=nb_processus) as pool:
+                taches = {
+                    i: pool.submit(
+                        flux_audio.decoder_vers_fichier,
+                        fichiers_tries[i],
+                        formats[i],
+                        promotions.formats_ajout[i],
+                        Path(dossier) / f"{i:05d}.pcm"
+                    )
+                    for i in a_decoder
+                }
+
+                for i, (fichier, format_source) in enumerate(zip(fichiers_tries, formats)):
+                    debut = sortie.nb_frames
+                    if i in taches:
+                        taches[i].result()
+                        chemin_pcm = Path(dossier) / f"{i:05d}.pcm"
+                        sortie.ecrire_fichier_pcm(
+                            chemin_pcm,
+                            promotions.formats_ajout[i],
+                            lambda bloc, i=i: promotions.reconvertir(i, bloc)
+                        )
+                        chemin_pcm.unlink()
+                    else:
+                        convertisseur = promotions.convertisseur_ajout(i, format_source)
+                        for bloc in flux_audio.iterer_blocs_pcm(fichier, format_source):
+                            sortie.ecrire(promotions.reconvertir(i, convertisseur.convertir(bloc)))
+
+                    self._noter_duree(sortie, debut)
+                    self._afficher_ajout(fichier, i + 1, len(fichiers_tries))
+
+    def _noter_duree(self, sortie: 'flux_audio.EcrivainWav', debut: int):
+        """Ajoute aux durées concaténées les frames écrites depuis `debut`"""
+        taux = sortie.format['taux_echantillonnage']
+        self.durees_concatenees.append((sortie.nb_frames - debut) / taux)
+
+    @staticmethod
+    def _afficher_ajout(fichier: Path, position: int, total: int):
+        """Affiche la progression de la concaténation"""
+        if position == 1:
+            print(f"  ✓ Chargé {fichier.name}")
+        else:
+            print(f"  ✓ Ajouté {fichier.name} ({position}/{total})")
+
+    @staticmethod
+    def _formats_identiques(chunks: List[Optional[dict]]) -> bool:
+        """Vérifie que tous les fichiers sont des WAV PCM de même format"""
+        if any(c is None for c in chunks):
+            return False
+
+        # pydub élargit le 24 bits en 32 bits : pas de copie directe possible
+        if chunks[0]['largeur_echantillon'] not in (1, 2, 4):
+            return False
+
+        cles = ('canaux', 'taux_echantillonnage', 'largeur_echantillon')
+        reference = tuple(chunks[0][k] for k in cles)
+        return all(tuple(c[k] for k in cles) == reference for c in chunks)
+
+    def _concatener_sans_decodage(
+        self,
+        fichiers_tries: List[Path],
+        chunks: List[dict],
+        chemin_sortie: Path
+    ) -> Path:
+        """
+        Concatène des WAV de même format en recopiant leurs données PCM
+
+        Aucun décodage : seul l'en-tête RIFF est réécrit, les blocs de
+        données sont copiés par le noyau (os.sendfile) quand c'est possible.
+
+        Args:
+            fichiers_tries: Fichiers dans l'ordre de concaténation
+            chunks: Positions des données retournées par lire_chunks_wav()
+            chemin_sortie: Chemin du fichier WAV à créer
+
+        Returns:
+            Chemin du fichier créé
+        """
+        print("   ⚡ Formats identiques : copie directe des données PCM")
+
+        taille_totale = sum(c['taille_donnees'] for c in chunks)
+        largeur_frame = chunks[0]['canaux'] * chunks[0]['largeur_echantillon']
+        self.durees_concatenees = [
+            c['taille_donnees'] // largeur_frame / c['taux_echantillonnage'] for c in chunks
+        ]
+
+        with open(chemin_sortie, 'wb', buffering=0) as sortie:
+            flux_audio.ecrire_entete_wav(sortie, chunks[0], taille_totale)
+
+            for i, (fichier, chunk) in enumerate(zip(fichiers_tries, chunks), 1):
+                with open(fichier, 'rb') as source:
+                    flux_audio.copier_plage(
+                        source,
+                        sortie,
+                        chunk['offset_donnees'],
+                        chunk['taille_donnees']
+                    )
+
+                self._afficher_ajout(fichier, i, len(fichiers_tries))
+
+        duree = taille_totale / largeur_frame / chunks[0]['taux_echantillonnage']
+        print(f"✅ Concaténation terminée : {duree:.1f}s")
+        print(f"📄 Fichier créé : {chemin_sortie.name}")
+
+        return chemin_sortie
+
+    def trier_fichiers(
         self,
         fichiers: List[Path],
         methode: str,
@@ -79,9 +296,11 @@ class AudioProcessor:
         if methode == "nom":
             return sorted(fichiers, reverse=inverse)
         elif methode == "date":
+            # Un seul stat par fichier, toujours à jour (sans sonder l'audio)
+            dates = {f: os.stat(f).st_ctime for f in fichiers}
             return sorted(
                 fichiers,
-                key=lambda p: os.path.getctime(p),
+                key=lambda p: dates[p],
                 reverse=inverse
             )
         else:
@@ -92,8 +311,10 @@ class AudioProcessor:
             audio_source: Union[AudioSegment, Path],  # Peut être ignoré si segments ont 'fichier'
             segments: List[dict],
             chemin_sortie: Path,
-            generer_metadonnees: bool = True
-    ) -> tuple[AudioSegment, Path]:
+            generer_metadonnees: bool = True,
+            cibles_export: Optional[List[dict]] = None,
+            sources_decodees: Optional[dict] = None
+    ) -> tuple[Optional[AudioSegment], Path]:
         """
         Crée la version montée avec les segments sélectionnés
 
@@ -101,106 +322,36 @@ class AudioProcessor:
             audio_source: Audio source par défaut (peut être None si segments ont 'fichier')
             segments: Liste de segments avec 'debut', 'fin', 'fichier', 'description'
             ...
+            cibles_export: Formats à produire en un seul rendu, par ex.
+                           [{'format': 'mp3', 'debit': '192k'}, {'format': 'wav'}]
+                           (défaut : audio.exports, sinon audio.format_export)
+            sources_decodees: Copies WAV déjà décodées des sources compressées
+                              ({fichier: chemin}, voir creer_montages), lues
+                              à la place des originaux
+
+        Returns:
+            Tuple (AudioSegment final, chemin du premier fichier). L'AudioSegment
+            vaut None en export en flux (audio.export_flux), où il n'est jamais
+            matérialisé en entier, et quand le rendu vient du cache.
         """
         print(f"✂️ Création du montage avec {len(segments)} segments...")
 
-        # Cache pour les fichiers audio
-        cache_audio = {}
-
-        extraits = []
-        metadonnees_segments = []
-        position_output = 0.0
-
-        for i, seg in enumerate(segments, 1):
-            # Déterminer le fichier source
-            fichier_source = seg.get('fichier', 'mix_complet.wav')
-
-            # Charger le fichier audio (avec cache)
-            if fichier_source not in cache_audio:
-                chemin_fichier = Path(fichier_source)
-                if not chemin_fichier.exists():
-                    # Si chemin absolu n'existe pas, essayer relatif à output/
-                    chemin_fichier = Path('output') / fichier_source
-
-                print(f"   📂 Chargement de {chemin_fichier.name}...")
-                cache_audio[fichier_source] = AudioSegment.from_file(chemin_fichier)
-
-            audio = cache_audio[fichier_source]
-
-            # Extraire le segment
-            debut_ms = int(seg['debut'] * 1000)
-            fin_ms = int(seg['fin'] * 1000)
-            segment = audio[debut_ms:fin_ms]
-
-            # Appliquer les fondus
-            duree_fondu = self.audio_config['duree_fondu']
-            segment = segment.fade_in(duree_fondu).fade_out(duree_fondu)
-
-            extraits.append(segment)
-            duree = (fin_ms - debut_ms) / 1000
-
-            # Métadonnées
-            if generer_metadonnees:
-                metadonnees_segments.append({
-                    'index': i,
-                    'description': seg.get('description', f'Segment {i}'),
-                    'debut_source': seg['debut'],
-                    'fin_source': seg['fin'],
-                    'debut_output': position_output,
-                    'fin_output': position_output + duree,
-                    'duree': duree,
-                    'fichier_source': fichier_source  # ← Conserver le vrai fichier
-                })
-
-                silence_sec = self.audio_config['silence_entre_segments'] / 1000
-                position_output += duree + silence_sec
-
-            print(f"  ✓ Segment {i}: {fichier_source} [{seg['debut']:.1f}s → {seg['fin']:.1f}s] ({duree:.1f}s)")
-
-        # Combiner avec des silences
-        duree_silence = self.audio_config['silence_entre_segments']
-        silence = AudioSegment.silent(duration=duree_silence)
-
-        final = extraits[0]
-        for segment in extraits[1:]:
-            final = final + silence + segment
+        if cibles_export is None:
+            cibles_export = flux_audio.cibles_export(self.audio_config)
+        formats = ', '.join(cible['format'].upper() for cible in cibles_export)
 
-        # Normaliser si configuré
-        if self.audio_config['normaliser']:
-            print("📊 Normalisation de l'audio...")
-            final = normalize(final)
-
-        # Ajouter intro/outro si configuré et ajuster les métadonnées
-        duree_intro = 0
-        duree_outro = 0
-        fichier_intro = None
-        fichier_outro = None
-        
+        chemins_sources = self._resoudre_sources(segments)
+        config_elements = None
         if self.config.get('elements_sonores', {}).get('activer'):
-            print("\n🎵 Ajout des éléments sonores...")
-            
-            # Récupérer les noms de fichiers avant l'ajout
             config_elements = self.config['elements_sonores']
-            if config_elements.get('generique_debut', {}).get('fichier'):
-                fichier_intro = config_elements['generique_debut']['fichier']
-            if config_elements.get('generique_fin', {}).get('fichier'):
-                fichier_outro = config_elements['generique_fin']['fichier']
-            
-            final, duree_intro, duree_outro = self.ajouter_elements_sonores(
-                final,
-                config_elements
-            )
-            
-            # Ajuster les timestamps des métadonnées si intro présente
-            if duree_intro > 0 and generer_metadonnees:
-                print(f"   📊 Ajustement des timestamps (+{duree_intro:.1f}s d'intro)")
-                for seg in metadonnees_segments:
-                    seg['debut_output'] += duree_intro
-                    seg['fin_output'] += duree_intro
 
-        # Exporter
-        format_export = self.audio_config['format_export']
-        debit = self.audio_config['debit']
+        # Un rendu identique (sources, coupes, réglages) est repris du cache
+        cache = cache_rendu.CacheRendu.depuis_config(chemin_sortie.parent, self.audio_config)
+        cle_rendu = None
+        rendu = None
+        if cache is not None:
+            cle_rendu = self._cle_rendu(segments, chemins_sources, config_elements, cibles_export)
+            rendu = cache.chercher(cle_rendu)
 
         # Feature 1: Nom de fichier horodaté avec dossier dédié
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -211,25 +362,52 @@ class AudioProcessor:
         dossier_podcast = chemin_sortie.parent / nom_avec_timestamp
         dossier_podcast.mkdir(parents=True, exist_ok=True)
 
-        # Fichier de sortie dans ce dossier
-        chemin_sortie_horodate = dossier_podcast / f"{nom_avec_timestamp}{chemin_sortie.suffix}"
-
-        print(f"\n💾 Export en {format_export.upper()}...")
-        print(f"📁 Dossier de sortie : {dossier_podcast.name}/")
-
-        params_export = {'format': format_export}
-        if format_export == 'mp3':
-            params_export['bitrate'] = debit
-            params_export['parameters'] = ["-q:a", "2"]
-
-        final.export(chemin_sortie_horodate, **params_export)
-
-        duree_finale = len(final) / 1000
-        taille_fichier = chemin_sortie_horodate.stat().st_size / (1024 * 1024)
+        # Fichiers de sortie dans ce dossier (le premier sert de référence)
+        chemins_export = flux_audio.chemins_export(
+            dossier_podcast / f"{nom_avec_timestamp}{chemin_sortie.suffix}",
+            cibles_export
+        )
+        destinations = list(zip(chemins_export, cibles_export))
+        chemin_sortie_horodate = chemins_export[0]
+
+        if rendu is not None:
+            print("♻️  Rendu identique trouvé dans le cache, réutilisé sans décodage ni encodage")
+            print(f"📁 Dossier de sortie : {dossier_podcast.name}/")
+            cache.restaurer(cle_rendu, rendu, chemins_export)
+            final = None
+            infos_rendu = rendu['infos']
+
+            # Seules les descriptions peuvent différer à clé identique
+            for info, seg in zip(infos_rendu['segments'], segments):
+                info['description'] = seg.get('description', f"Segment {info['index']}")
+        else:
+            final, infos_rendu = self._rendre_montage(
+                segments,
+                chemins_sources,
+                config_elements,
+                destinations,
+                formats,
+                dossier_podcast,
+                sources_decodees or {}
+            )
+            if cache is not None:
+                try:
+                    cache.enregistrer(cle_rendu, chemins_export, {'infos': infos_rendu})
+                except OSError as e:
+                    # Le montage est produit : un cache indisponible n'est pas une erreur
+                    print(f"   ⚠️  Rendu non mis en cache : {e}")
+
+        duree_finale = infos_rendu['duree_finale']
+        duree_intro = infos_rendu['duree_intro']
+        duree_outro = infos_rendu['duree_outro']
+        metadonnees_segments = infos_rendu['segments']
 
         print(f"✅ Montage terminé : {duree_finale:.1f}s ({duree_finale/60:.1f}min)")
-        print(f"📏 Taille du fichier : {taille_fichier:.2f} Mo")
-        print(f"📄 Fichier : {chemin_sortie_horodate.name}")
+        for chemin in chemins_export:
+            taille_fichier = chemin.stat().st_size / (1024 * 1024)
+            print(f"📄 Fichier : {chemin.name} ({taille_fichier:.2f} Mo)")
+        if infos_rendu['mesure_sonie']:
+            print(f"🔊 {sonie.resume(infos_rendu['mesure_sonie'])}")
 
         # Feature 2: Générer les métadonnées avec info intro/outro
         if generer_metadonnees:
@@ -241,8 +419,10 @@ class AudioProcessor:
                 metadonnees_segments,
                 duree_intro,
                 duree_outro,
-                fichier_intro,
-                fichier_outro
+                infos_rendu['fichier_intro'],
+                infos_rendu['fichier_outro'],
+                infos_rendu['mesure_sonie'],
+                [{'fichier': chemin.name, **cible} for chemin, cible in destinations]
             )
 
             # Générer aussi les labels Audacity avec intro/outro
@@ -256,6 +436,385 @@ class AudioProcessor:
 
         return final, chemin_sortie_horodate
 
+    def creer_montages(
+            self,
+            montages: List[dict],
+            progression: Optional[Callable[[int, int, dict], None]] = None
+    ) -> List[Path]:
+        """
+        Crée plusieurs montages d'un coup, en parallèle
+
+        Les sources communes ne sont préparées qu'une fois : les WAV sont
+        projetés en mémoire par chaque processus (pages partagées par le
+        système), les sources compressées citées par plusieurs montages
+        sont décodées une seule fois vers un WAV temporaire.
+
+        Args:
+            montages: Liste de {'segments': [...], 'chemin_sortie': Path,
+                      'titre': str (optionnel, pour l'affichage)}
+            progression: Fonction appelée après chaque rendu avec
+                         (nombre terminé, total, montage complété de 'chemin')
+
+        Returns:
+            Chemin du premier fichier de chaque montage, dans l'ordre donné
+        """
+        total = len(montages)
+        if not total:
+            return []
+
+        montages = self._dedoublonner_sorties(montages)
+        nb_processus = self._nombre_processus_montage(total)
+        print(f"🎬 {total} montages, {nb_processus} processus")
+
+        # Sources citées par plusieurs montages
+        usages = {}
+        chemins_sources = {}
+        for montage in montages:
+            for fichier, chemin in self._resoudre_sources(montage['segments']).items():
+                chemins_sources[fichier] = chemin
+                usages[fichier] = usages.get(fichier, 0) + 1
+
+        a_decoder = {
+            fichier: chemin for fichier, chemin in chemins_sources.items()
+            if usages[fichier] > 1 and not flux_audio.lire_format(chemin)['wav_natif']
+        }
+
+        # Génériques préparés avant de lancer les processus (cache disque partagé)
+        if self.config.get('elements_sonores', {}).get('activer'):
+            for element in self._preparer_elements_sonores(self.config['elements_sonores']):
+                if element is not None:
+                    element.audio
+
+        dossier_temp = montages[0]['chemin_sortie'].parent
+        dossier_temp.mkdir(parents=True, exist_ok=True)
+        chemins = [None] * total
+
+        with tempfile.TemporaryDirectory(dir=dossier_temp, prefix='.montages_') as dossier:
+            with ProcessPoolExecutor(max_workers=nb_processus) as pool:
+                sources_decodees = {}
+                if a_decoder:
+                    print(f"   ⚙️  Décodage unique de {len(a_decoder)} source(s) partagée(s)...")
+                    taches = {
+                        fichier: pool.submit(
+                            flux_audio.decoder_vers_wav,
+                            chemin,
+                            flux_audio.lire_format(chemin),
+                            Path(dossier) / f"source_{i:03d}.wav"
+                        )
+                        for i, (fichier, chemin) in enumerate(a_decoder.items())
+                    }
+                    sources_decodees = {
+                        fichier: tache.result() for fichier, tache in taches.items()
+                    }
+
+                taches = {
+                    pool.submit(
+                        _creer_montage_processus,
+                        self.config,
+                        montage['segments'],
+                        montage['chemin_sortie'],
+                        sources_decodees
+                    ): i
+                    for i, montage in enumerate(montages)
+                }
+
+                erreur = None
+                for termines, tache in enumerate(as_completed(taches), 1):
+                    i = taches[tache]
+                    titre = montages[i].get('titre', montages[i]['chemin_sortie'].stem)
+                    try:
+                        chemins[i] = tache.result()
+                    except Exception as e:
+                        print(f"  ❌ [{termines}/{total}] {titre} : {e}")
+                        erreur = erreur or e
+                        continue
+
+                    print(f"  ✓ [{termines}/{total}] {titre} → {chemins[i].name}")
+                    if progression is not None:
+                        progression(termines, total, {**montages[i], 'chemin': chemins[i]})
+
+        if erreur is not None:
+            raise erreur
+        return chemins
+
+    def _nombre_processus_montage(self, nb_montages: int) -> int:
+        """Nombre de rendus simultanés (audio.processus_montage, 0 = auto)"""
+        nb_processus = self.audio_config.get('processus_montage', 0)
+        if not nb_processus:
+            nb_processus = os.cpu_count() or 1
+        return max(1, min(nb_processus, nb_montages))
+
+    @staticmethod
+    def _dedoublonner_sorties(montages: List[dict]) -> List[dict]:
+        """Suffixe les noms de sortie identiques (même titre, même seconde)"""
+        vus = {}
+        resultat = []
+        for montage in montages:
+            chemin = Path(montage['chemin_sortie'])
+            n = vus.get(chemin, 0) + 1
+            vus[chemin] = n
+            if n > 1:
+                chemin = chemin.with_name(f"{chemin.stem}_{n}{chemin.suffix}")
+            resultat.append({**montage, 'chemin_sortie': chemin})
+        return resultat
+
+    def _resoudre_sources(self, segments: List[dict]) -> dict:
+        """Associe chaque fichier cité par les segments à son chemin sur disque"""
+        chemins_sources = {}
+        for seg in segments:
+            fichier_source = seg.get('fichier', 'mix_complet.wav')
+            if fichier_source not in chemins_sources:
+                chemin_fichier = Path(fichier_source)
+                if not chemin_fichier.exists():
+                    # Si chemin absolu n'existe pas, essayer relatif à output/
+                    chemin_fichier = Path('output') / fichier_source
+                chemins_sources[fichier_source] = chemin_fichier
+        return chemins_sources
+
+    def _cle_rendu(
+            self,
+            segments: List[dict],
+            chemins_sources: dict,
+            config_elements: Optional[dict],
+            cibles_export: List[dict]
+    ) -> str:
+        """
+        Clé de cache du rendu
+
+        Couvre tout ce qui modifie les fichiers produits : empreintes des
+        sources, coupes, réglages audio, intro/outro et options d'encodage.
+        Les descriptions des segments n'en font pas partie.
+        """
+        mode = self.audio_config.get('cache_rendu_empreinte', 'stat')
+        empreintes = {
+            fichier: cache_rendu.empreinte_fichier(chemin, mode)
+            for fichier, chemin in chemins_sources.items()
+        }
+
+        elements = {}
+        if config_elements:
+            fondus_generiques = (
+                ('generique_debut', 'duree_fondu_sortie'),
+                ('generique_fin', 'duree_fondu_entree')
+            )
+            for nom, cle_fondu in fondus_generiques:
+                element = config_elements.get(nom, {})
+                if element.get('fichier') and Path(element['fichier']).exists():
+                    elements[nom] = {
+                        'source': cache_rendu.empreinte_fichier(Path(element['fichier']), mode),
+                        'fondu': element.get(cle_fondu, 1000)
+                    }
+
+        return cache_rendu.calculer_cle({
+            'segments': [
+                {
+                    'source': empreintes[seg.get('fichier', 'mix_complet.wav')],
+                    'debut': int(seg['debut'] * 1000),
+                    'fin': int(seg['fin'] * 1000)
+                }
+                for seg in segments
+            ],
+            'audio': {cle: self.audio_config.get(cle) for cle in cache_rendu.CLES_AUDIO_RENDU},
+            'elements_sonores': elements,
+            'cibles': [
+                {
+                    'format': cible['format'],
+                    'parametres': flux_audio.parametres_encodage(
+                        {**self.audio_config, **cible}, cible['format']
+                    )
+                }
+                for cible in cibles_export
+            ]
+        })
+
+    def _rendre_montage(
+            self,
+            segments: List[dict],
+            chemins_sources: dict,
+            config_elements: Optional[dict],
+            destinations: list,
+            formats: str,
+            dossier_podcast: Path,
+            sources_decodees: dict
+    ) -> tuple[Optional[AudioSegment], dict]:
+        """
+        Extrait, assemble et exporte le montage
+
+        Returns:
+            Tuple (AudioSegment final ou None en flux, informations du rendu)
+        """
+        # Lecture par plages : seules les frames des segments sont lues
+        lecteur = flux_audio.LecteurSegments()
+
+        extraits = []
+        infos_segments = []
+        en_flux = self.audio_config.get('export_flux', True)
+
+        # Montage incrémental : PCM traité de chaque segment conservé sur disque
+        cache_segments = cache_rendu.CacheSegments.depuis_config(self.audio_config)
+        empreintes = {}
+
+        for fichier_source, chemin_fichier in chemins_sources.items():
+            print(f"   📂 Ouverture de {chemin_fichier.name}...")
+            if cache_segments is not None:
+                empreintes[fichier_source] = cache_rendu.empreinte_fichier(
+                    chemin_fichier,
+                    self.audio_config.get('cache_rendu_empreinte', 'stat')
+                )
+
+        for i, seg in enumerate(segments, 1):
+            fichier_source = seg.get('fichier', 'mix_complet.wav')
+
+            # Extraire le segment (au moment de l'écriture en mode flux)
+            debut_ms = int(seg['debut'] * 1000)
+            fin_ms = int(seg['fin'] * 1000)
+            chemin_fichier = sources_decodees.get(fichier_source, chemins_sources[fichier_source])
+
+            if en_flux or cache_segments is not None:
+                cle_segment = None
+                if cache_segments is not None:
+                    description_segment = {
+                        'source': empreintes[fichier_source],
+                        'debut': debut_ms,
+                        'fin': fin_ms,
+                        'fondu': self.audio_config['duree_fondu'],
+                        'courbe': self.audio_config.get('courbe_fondu', 'lineaire')
+                    }
+                    if fichier_source in sources_decodees:
+                        # Décodage complet : calage des frames différent d'une lecture par plage
+                        description_segment['lecture'] = 'decodee'
+                    cle_segment = cache_rendu.calculer_cle(description_segment)
+
+                extraits.append(assemblage.SourceDifferee(
+                    partial(self._extraire_segment, lecteur, chemin_fichier, debut_ms, fin_ms),
+                    lecteur.format(chemin_fichier),
+                    lecteur.nb_frames_plage(chemin_fichier, debut_ms, fin_ms),
+                    cache=cache_segments,
+                    cle_cache=cle_segment
+                ))
+            else:
+                extraits.append(self._extraire_segment(lecteur, chemin_fichier, debut_ms, fin_ms))
+
+            infos_segments.append({
+                'index': i,
+                'description': seg.get('description', f'Segment {i}'),
+                'debut_source': seg['debut'],
+                'fin_source': seg['fin'],
+                'fichier_source': fichier_source  # ← Conserver le vrai fichier
+            })
+
+            duree = (fin_ms - debut_ms) / 1000
+            print(f"  ✓ Segment {i}: {fichier_source} [{seg['debut']:.1f}s → {seg['fin']:.1f}s] ({duree:.1f}s)")
+
+        # Charger intro/outro si configuré (placés directement dans le plan)
+        intro = None
+        outro = None
+        fichier_intro = None
+        fichier_outro = None
+
+        element_intro = None
+        element_outro = None
+        if config_elements:
+            print("\n🎵 Ajout des éléments sonores...")
+            element_intro, element_outro = self._preparer_elements_sonores(config_elements)
+
+        # Harmonisation : un seul format cible, chaque élément converti une fois
+        audios = extraits + [e.audio for e in (element_intro, element_outro) if e is not None]
+        format_sortie = assemblage.choisir_format(
+            audios,
+            self.audio_config.get('format_montage', 'majoritaire')
+        )
+        a_convertir = sum(assemblage.format_de(a) != format_sortie for a in audios)
+        print(f"\n🎛️  Format du montage : {assemblage.decrire_format(format_sortie)}"
+              + (f" ({a_convertir} élément(s) à convertir)" if a_convertir else ""))
+
+        # Génériques convertis au format du montage (mis en cache par format)
+        if element_intro is not None:
+            intro = element_intro.au_format(format_sortie)
+            fichier_intro = config_elements['generique_debut']['fichier']
+        if element_outro is not None:
+            outro = element_outro.au_format(format_sortie)
+            fichier_outro = config_elements['generique_fin']['fichier']
+
+        # Calculer la disposition finale (assemblage en une seule passe)
+        duree_silence = self.audio_config['silence_entre_segments']
+        plan = assemblage.planifier_montage(
+            extraits,
+            duree_silence,
+            infos_segments,
+            intro=intro,
+            outro=outro,
+            format_sortie=format_sortie
+        )
+        extraits.clear()
+
+        # Exporter
+        normaliser = self.audio_config['normaliser']
+        parametres_sonie = sonie.parametres_sonie(self.audio_config)
+
+        print(f"🔧 Assemblage avec {duree_silence}ms de silence entre segments...")
+        if normaliser and parametres_sonie:
+            print(f"📊 Normalisation en sonie ({parametres_sonie['cible_lufs']} LUFS)...")
+        elif normaliser:
+            print("📊 Normalisation de l'audio...")
+
+        print(f"\n💾 Export en {formats}...")
+        print(f"📁 Dossier de sortie : {dossier_podcast.name}/")
+
+        if en_flux:
+            # Assemblage et encodage simultanés, sans matérialiser l'épisode
+            final = None
+            assemblage.exporter_en_flux(
+                plan,
+                destinations,
+                self.audio_config,
+                normaliser=normaliser,
+                parametres_sonie=parametres_sonie
+            )
+        else:
+            final = assemblage.assembler(
+                plan, normaliser=normaliser, parametres_sonie=parametres_sonie
+            )
+            assemblage.exporter_audio(final, destinations, self.audio_config)
+
+        if cache_segments is not None and cache_segments.succes:
+            print(f"♻️  Segments repris du cache : {cache_segments.succes}, "
+                  f"retraités : {cache_segments.echecs}")
+
+        # Positions de sortie lues sur le plan (intro et silences inclus)
+        elements_intro = plan.elements_de_nature('intro')
+        elements_outro = plan.elements_de_nature('outro')
+
+        return final, {
+            'duree_finale': plan.duree,
+            'duree_intro': plan.secondes(elements_intro[0]['nb_frames']) if elements_intro else 0,
+            'duree_outro': plan.secondes(elements_outro[0]['nb_frames']) if elements_outro else 0,
+            'segments': assemblage.metadonnees_segments(plan),
+            'mesure_sonie': plan.mesure_sonie,
+            'fichier_intro': fichier_intro,
+            'fichier_outro': fichier_outro
+        }
+
+    def _extraire_segment(
+            self,
+            lecteur: 'flux_audio.LecteurSegments',
+            chemin_fichier: Path,
+            debut_ms: int,
+            fin_ms: int
+    ) -> AudioSegment:
+        """Extrait un segment de sa source et applique les fondus"""
+        duree_fondu = self.audio_config['duree_fondu']
+        courbe = self.audio_config.get('courbe_fondu', 'lineaire')
+
+        # WAV projeté en mémoire : la plage n'est copiée qu'une fois, pour les fondus
+        vue = lecteur.tableau(chemin_fichier, debut_ms, fin_ms)
+        if vue is not None:
+            taux = lecteur.format(chemin_fichier)['taux_echantillonnage']
+            return dsp.appliquer_fondus_vue(vue, taux, duree_fondu, duree_fondu, courbe)
+
+        segment = lecteur.extraire(chemin_fichier, debut_ms, fin_ms)
+        return dsp.appliquer_fondus(segment, duree_fondu, duree_fondu, courbe)
+
     def ajouter_elements_sonores(
             self,
             audio_principal: AudioSegment,
@@ -271,54 +830,102 @@ class AudioProcessor:
         Returns:
             Tuple (AudioSegment avec intro/outro, durée intro, durée outro)
         """
+        intro, outro = self._charger_elements_sonores(config_elements)
+
         resultat = audio_principal
         duree_intro = 0
         duree_outro = 0
 
-        # Ajouter l'intro
+        if intro is not None:
+            resultat = intro + resultat
+            duree_intro = len(intro) / 1000
+
+        if outro is not None:
+            resultat = resultat + outro
+            duree_outro = len(outro) / 1000
+
+        return resultat, duree_intro, duree_outro
+
+    def _charger_elements_sonores(
+            self,
+            config_elements: dict
+    ) -> tuple[Optional[AudioSegment], Optional[AudioSegment]]:
+        """
+        Charge l'intro et l'outro configurées, fondus appliqués
+
+        Args:
+            config_elements: Configuration des éléments sonores
+
+        Returns:
+            Tuple (intro, outro), None pour un élément absent
+        """
+        element_intro, element_outro = self._preparer_elements_sonores(config_elements)
+        return (
+            element_intro.audio if element_intro else None,
+            element_outro.audio if element_outro else None
+        )
+
+    def _preparer_elements_sonores(
+            self,
+            config_elements: dict
+    ) -> tuple[Optional[ElementSonore], Optional[ElementSonore]]:
+        """
+        Prépare l'intro et l'outro configurées via le cache des éléments sonores
+
+        Le décodage et les fondus ne sont refaits que si le fichier ou ses
+        réglages changent ; la conversion au format du montage est faite
+        ensuite par ElementSonore.au_format().
+
+        Args:
+            config_elements: Configuration des éléments sonores
+
+        Returns:
+            Tuple (intro, outro), None pour un élément absent
+        """
+        element_intro = None
+        element_outro = None
+        courbe = self.audio_config.get('courbe_fondu', 'lineaire')
+        cache = CacheElementsSonores.depuis_config(config_elements)
+
+        # Charger l'intro
         generique_debut = config_elements.get('generique_debut', {})
         if generique_debut.get('fichier'):
             intro_path = Path(generique_debut['fichier'])
 
             if intro_path.exists():
                 print(f"   🎵 Ajout de l'intro : {intro_path.name}")
-                intro = AudioSegment.from_file(intro_path)
 
                 # Récupérer le fondu avec valeur par défaut
                 fondu_sortie = generique_debut.get('duree_fondu_sortie', 1000)
-                if fondu_sortie and fondu_sortie > 0:
-                    intro = intro.fade_out(fondu_sortie)
+                element_intro = ElementSonore(
+                    intro_path, cache, fondu_sortie=max(fondu_sortie or 0, 0), courbe=courbe
+                )
 
-                resultat = intro + resultat
-                duree_intro = len(intro) / 1000
-                print(f"   ✅ Intro ajoutée ({duree_intro:.1f}s)")
-            # ← SUPPRIMER le else avec le print warning
+                print(f"   ✅ Intro ajoutée ({len(element_intro.audio) / 1000:.1f}s)")
 
-        # Ajouter l'outro
+        # Charger l'outro
         generique_fin = config_elements.get('generique_fin', {})
         if generique_fin.get('fichier'):
             outro_path = Path(generique_fin['fichier'])
 
             if outro_path.exists():
                 print(f"   🎵 Ajout de l'outro : {outro_path.name}")
-                outro = AudioSegment.from_file(outro_path)
 
                 # Récupérer le fondu avec valeur par défaut
                 fondu_entree = generique_fin.get('duree_fondu_entree', 1000)
-                if fondu_entree and fondu_entree > 0:
-                    outro = outro.fade_in(fondu_entree)
+                element_outro = ElementSonore(
+                    outro_path, cache, fondu_entree=max(fondu_entree or 0, 0), courbe=courbe
+                )
 
-                resultat = resultat + outro
-                duree_outro = len(outro) / 1000
-                print(f"   ✅ Outro ajoutée ({duree_outro:.1f}s)")
-            # ← SUPPRIMER le else avec le print warning
+                print(f"   ✅ Outro ajoutée ({len(element_outro.audio) / 1000:.1f}s)")
 
-        # Afficher message uniquement si des éléments ont été ajoutés
-        if duree_intro > 0 or duree_outro > 0:
-            duree_totale_elements = duree_intro + duree_outro
+        # Afficher message uniquement si des éléments ont été chargés
+        elements = [e for e in (element_intro, element_outro) if e is not None]
+        if elements:
+            duree_totale_elements = sum(len(e.audio) for e in elements) / 1000
             print(f"   📊 Durée totale des éléments sonores : {duree_totale_elements:.1f}s")
 
-        return resultat, duree_intro, duree_outro
+        return element_intro, element_outro
 
     def _generer_metadonnees(
         self,
@@ -329,7 +936,9 @@ class AudioProcessor:
         duree_intro: float = 0,
         duree_outro: float = 0,
         fichier_intro: str = None,
-        fichier_outro: str = None
+        fichier_outro: str = None,
+        mesure_sonie: Optional[dict] = None,
+        exports: Optional[List[dict]] = None
     ):
         """Génère un fichier JSON avec les métadonnées du podcast"""
 
@@ -386,11 +995,17 @@ class AudioProcessor:
                 'duree_fondu_ms': self.audio_config['duree_fondu'],
                 'silence_entre_segments_ms': self.audio_config['silence_entre_segments'],
                 'normalisation': self.audio_config['normaliser'],
+                'mode_normalisation': self.audio_config.get('mode_normalisation', 'crete'),
                 'format_export': self.audio_config['format_export'],
                 'debit': self.audio_config.get('debit', 'N/A')
             }
         }
 
+        if exports and len(exports) > 1:
+            metadonnees['exports'] = exports
+        if mesure_sonie:
+            metadonnees['sonie'] = mesure_sonie
+
         with open(chemin_fichier, 'w', encoding='utf-8') as f:
             json.dump(metadonnees, f, indent=2, ensure_ascii=False)
 
@@ -440,11 +1055,33 @@ class AudioProcessor:
 
     @staticmethod
     def obtenir_infos_audio(chemin_fichier: Path) -> dict:
-        """Obtient les informations d'un fichier audio"""
-        audio = AudioSegment.from_file(chemin_fichier)
+        """Obtient les informations d'un fichier audio (sans le décoder)"""
+        infos = index_audio.index_par_defaut().infos(chemin_fichier)
         return {
-            'duree': len(audio) / 1000,
-            'canaux': audio.channels,
-            'taux_echantillonnage': audio.frame_rate,
-            'largeur_echantillon': audio.sample_width
-        }
\ No newline at end of file
+            'duree': infos['duree'],
+            'canaux': infos['canaux'],
+            'taux_echantillonnage': infos['taux_echantillonnage'],
+            'largeur_echantillon': infos['largeur_echantillon']
+        }
+
+
+def _creer_montage_processus(
+        config: dict,
+        segments: List[dict],
+        chemin_sortie: Path,
+        sources_decodees: dict
+) -> Path:
+    """
+    Rend un montage dans un processus du pool (voir creer_montages)
+
+    La sortie console est masquée : la progression est affichée par le
+    processus principal, à la fin de chaque rendu.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, chemin = AudioProcessor(config).creer_montage(
+            None,
+            segments,
+            chemin_sortie,
+            sources_decodees=sources_decodees
+        )
+    return chemin
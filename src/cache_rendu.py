@@ -0,0 +1,370 @@
+"""
+Module de cache des rendus de montage
+Conserve les fichiers produits par creer_montage, indexés par une clé
+calculée sur les sources, la liste des segments et les réglages audio,
+ainsi que le PCM traité de chaque segment pour les montages incrémentaux
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import List, Optional
+
+
+# Dossier du cache des rendus, créé dans le dossier de sortie
+NOM_DOSSIER_CACHE = '.cache_rendu'
+
+# Incrémenté quand le rendu change à réglages identiques
+VERSION_CACHE = 2
+
+# Taille lue par itération pour les empreintes de contenu
+TAILLE_BLOC_HACHAGE = 1024 * 1024
+
+# Réglages de la section audio qui modifient le signal produit
+CLES_AUDIO_RENDU = (
+    'duree_fondu', 'courbe_fondu', 'silence_entre_segments', 'normaliser',
+    'mode_normalisation', 'cible_lufs', 'plafond_true_peak', 'format_montage'
+)
+
+_FICHIER_INFOS = 'rendu.json'
+
+# Empreintes de contenu déjà calculées : (chemin, taille, mtime) → sha256
+_hachages = {}
+
+
+def dossier_cache_utilisateur() -> Path:
+    """Dossier des caches partagés entre projets (XDG_CACHE_HOME ou ~/.cache)"""
+    racine = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(racine) / 'podcasteur'
+
+
+def dossier_cache_segments_defaut() -> Path:
+    """Dossier du cache des segments traités (cache utilisateur)"""
+    return dossier_cache_utilisateur() / 'segments'
+
+
+def empreinte_fichier(chemin: Path, mode: str = 'stat') -> dict:
+    """
+    Empreinte d'un fichier source
+
+    Args:
+        chemin: Fichier à identifier
+        mode: 'stat' (chemin, taille et date de modification, immédiat) ou
+              'contenu' (taille et SHA-256, stable d'une machine à l'autre)
+
+    Returns:
+        Dictionnaire sérialisable
+    """
+    stat = chemin.stat()
+    if mode != 'contenu':
+        # Chemin complet : deux fichiers homonymes de dossiers différents sont distincts
+        return {
+            'chemin': str(chemin.resolve()),
+            'taille': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns
+        }
+
+    identite = (str(chemin.resolve()), stat.st_size, stat.st_mtime_ns)
+    if identite not in _hachages:
+        hachage = hashlib.sha256()
+        with open(chemin, 'rb') as f:
+            for bloc in iter(lambda: f.read(TAILLE_BLOC_HACHAGE), b''):
+                hachage.update(bloc)
+        _hachages[identite] = hachage.hexdigest()
+
+    return {'taille': stat.st_size, 'sha256': _hachages[identite]}
+
+
+def calculer_cle(description: dict) -> str:
+    """Hache une description JSON canonique du rendu"""
+    texte = json.dumps(
+        {'version': VERSION_CACHE, **description}, sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(texte.encode('utf-8')).hexdigest()
+
+
+def _copier(source: Path, destination: Path):
+    """Copie un fichier (copie noyau quand le système le permet)"""
+    shutil.copyfile(source, destination)
+
+
+class CacheRendu:
+    """Cache LRU de rendus complets, borné en taille"""
+
+    def __init__(self, dossier: Path, taille_max_mo: float = 2048):
+        """
+        Initialise le cache
+
+        Args:
+            dossier: Dossier du cache (créé au premier enregistrement)
+            taille_max_mo: Taille maximale ; les rendus les moins
+                           récemment utilisés sont supprimés au-delà
+        """
+        self.dossier = Path(dossier)
+        self.taille_max = int(taille_max_mo * 1024 * 1024)
+
+    @classmethod
+    def depuis_config(cls, dossier_sortie: Path, audio_config: dict) -> Optional['CacheRendu']:
+        """Cache du dossier de sortie, ou None si audio.cache_rendu est désactivé"""
+        if not audio_config.get('cache_rendu', True):
+            return None
+        return cls(
+            Path(dossier_sortie) / NOM_DOSSIER_CACHE,
+            audio_config.get('cache_rendu_taille_max_mo', 2048)
+        )
+
+    def chercher(self, cle: str) -> Optional[dict]:
+        """
+        Cherche un rendu et le marque comme utilisé
+
+        Returns:
+            Informations du rendu (avec 'fichiers'), ou None si absent
+            ou incomplet
+        """
+        infos = self._lire_infos(self.dossier / cle)
+        if infos is None:
+            return None
+
+        if not all((self.dossier / cle / nom).exists() for nom in infos['fichiers']):
+            self.supprimer(cle)
+            return None
+
+        infos['dernier_acces'] = time.time()
+        self._ecrire_infos(self.dossier / cle, infos)
+        return infos
+
+    def restaurer(self, cle: str, infos: dict, destinations: List[Path]):
+        """Copie les fichiers d'un rendu vers les destinations (même ordre)"""
+        for nom, destination in zip(infos['fichiers'], destinations):
+            _copier(self.dossier / cle / nom, destination)
+
+    def enregistrer(self, cle: str, fichiers: List[Path], infos: dict):
+        """
+        Ajoute un rendu au cache puis élague si nécessaire
+
+        Args:
+            cle: Clé du rendu
+            fichiers: Fichiers produits, dans l'ordre des cibles d'export
+            infos: Informations à restituer (durées, positions, mesures)
+        """
+        dossier_entree = self.dossier / cle
+        # Nom propre au processus : plusieurs montages parallèles partagent le cache
+        dossier_temporaire = self.dossier / f"{cle}.{os.getpid()}.tmp"
+        shutil.rmtree(dossier_temporaire, ignore_errors=True)
+
+        try:
+            dossier_temporaire.mkdir(parents=True)
+
+            noms = []
+            for i, fichier in enumerate(fichiers):
+                nom = f"{i}{fichier.suffix}"
+                _copier(fichier, dossier_temporaire / nom)
+                noms.append(nom)
+
+            maintenant = time.time()
+            self._ecrire_infos(dossier_temporaire, {
+                **infos,
+                'fichiers': noms,
+                'taille': sum(f.stat().st_size for f in fichiers),
+                'cree_le': maintenant,
+                'dernier_acces': maintenant
+            })
+
+            # Renommage en fin de copie : une entrée visible est toujours complète
+            try:
+                dossier_temporaire.rename(dossier_entree)
+            except OSError:
+                # Même clé enregistrée entre-temps par un autre processus : on la garde
+                if self._lire_infos(dossier_entree) is None:
+                    raise
+        finally:
+            shutil.rmtree(dossier_temporaire, ignore_errors=True)
+
+        self.elaguer()
+
+    def entrees(self) -> List[dict]:
+        """Liste les rendus, du plus récemment utilisé au plus ancien"""
+        if not self.dossier.exists():
+            return []
+
+        entrees = []
+        for dossier_entree in self.dossier.iterdir():
+            if dossier_entree.suffix == '.tmp':
+                continue
+            infos = self._lire_infos(dossier_entree)
+            if infos is not None:
+                entrees.append({'cle': dossier_entree.name, **infos})
+
+        entrees.sort(key=lambda e: e['dernier_acces'], reverse=True)
+        return entrees
+
+    def taille_totale(self) -> int:
+        """Taille occupée par les rendus (octets)"""
+        return sum(e['taille'] for e in self.entrees())
+
+    def elaguer(self, taille_max: Optional[int] = None) -> List[str]:
+        """
+        Supprime les rendus les moins récemment utilisés au-delà d'une taille
+
+        Args:
+            taille_max: Taille à respecter en octets (défaut : celle du cache)
+
+        Returns:
+            Clés supprimées
+        """
+        taille_max = self.taille_max if taille_max is None else taille_max
+        entrees = self.entrees()
+        total = sum(e['taille'] for e in entrees)
+
+        supprimees = []
+        while entrees and total > taille_max:
+            entree = entrees.pop()
+            self.supprimer(entree['cle'])
+            total -= entree['taille']
+            supprimees.append(entree['cle'])
+        return supprimees
+
+    def supprimer(self, cle: str):
+        """Supprime un rendu"""
+        shutil.rmtree(self.dossier / cle, ignore_errors=True)
+
+    def vider(self) -> int:
+        """Supprime tous les rendus ; retourne leur nombre"""
+        entrees = self.entrees()
+        for entree in entrees:
+            self.supprimer(entree['cle'])
+        return len(entrees)
+
+    @staticmethod
+    def _lire_infos(dossier_entree: Path) -> Optional[dict]:
+        try:
+            with open(dossier_entree / _FICHIER_INFOS, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _ecrire_infos(dossier_entree: Path, infos: dict):
+        with open(dossier_entree / _FICHIER_INFOS, 'w', encoding='utf-8') as f:
+            json.dump(infos, f, indent=2, ensure_ascii=False)
+
+
+class CacheSegments:
+    """
+    Cache disque du PCM traité de chaque segment (montage incrémental)
+
+    Un segment est identifié par l'empreinte de sa source, sa plage et ses
+    fondus ; son PCM est conservé au format du montage. Modifier une ligne
+    du découpage ne retraite donc que le segment concerné.
+    """
+
+    def __init__(self, dossier: Path, taille_max_mo: float = 4096):
+        """
+        Initialise le cache
+
+        Args:
+            dossier: Dossier du cache (créé au premier enregistrement)
+            taille_max_mo: Taille maximale ; les segments les moins
+                           récemment utilisés sont supprimés au-delà
+        """
+        self.dossier = Path(dossier)
+        self.taille_max = int(taille_max_mo * 1024 * 1024)
+        self.succes = 0
+        self.echecs = 0
+        self._taille = None
+
+    @classmethod
+    def depuis_config(cls, audio_config: dict) -> Optional['CacheSegments']:
+        """Cache utilisateur des segments, ou None si audio.montage_incremental est désactivé"""
+        if not audio_config.get('montage_incremental', True):
+            return None
+        dossier = audio_config.get('dossier_cache_segments') or dossier_cache_segments_defaut()
+        return cls(Path(dossier), audio_config.get('cache_segments_taille_max_mo', 4096))
+
+    def _chemin(self, cle: str, format_pcm: dict) -> Path:
+        cle_format = calculer_cle({
+            'segment': cle,
+            'format': [
+                format_pcm['canaux'],
+                format_pcm['taux_echantillonnage'],
+                format_pcm['largeur_echantillon']
+            ]
+        })
+        return self.dossier / f"{cle_format}.pcm"
+
+    def lire(self, cle: str, format_pcm: dict, compter: bool = True) -> Optional[bytes]:
+        """
+        PCM d'un segment au format demandé, ou None s'il n'est pas en cache
+
+        Args:
+            cle: Identité du segment
+            format_pcm: Format du montage
+            compter: Compter la consultation dans succes / echecs
+        """
+        chemin = self._chemin(cle, format_pcm)
+        try:
+            donnees = chemin.read_bytes()
+        except OSError:
+            if compter:
+                self.echecs += 1
+            return None
+
+        # La date de modification sert d'horodatage d'accès pour l'élagage
+        try:
+            os.utime(chemin)
+        except FileNotFoundError:
+            pass
+        if compter:
+            self.succes += 1
+        return donnees
+
+    def ecrire(self, cle: str, format_pcm: dict, donnees: bytes):
+        """Enregistre le PCM d'un segment puis élague si nécessaire"""
+        chemin = self._chemin(cle, format_pcm)
+        self.dossier.mkdir(parents=True, exist_ok=True)
+
+        temporaire = chemin.with_suffix(f".{os.getpid()}.tmp")
+        temporaire.write_bytes(donnees)
+        os.replace(temporaire, chemin)
+
+        if self._taille is None:
+            self._taille = sum(f.stat().st_size for f in self.dossier.glob('*.pcm'))
+        else:
+            self._taille += len(donnees)
+
+        if self._taille > self.taille_max:
+            self.elaguer()
+
+    def elaguer(self, taille_max: Optional[int] = None) -> int:
+        """
+        Supprime les segments les moins récemment utilisés au-delà d'une taille
+
+        Returns:
+            Nombre de segments supprimés
+        """
+        taille_max = self.taille_max if taille_max is None else taille_max
+        if not self.dossier.exists():
+            return 0
+
+        # Un autre processus peut élaguer en même temps : fichiers disparus ignorés
+        fichiers = []
+        for fichier in self.dossier.glob('*.pcm'):
+            try:
+                fichiers.append((fichier.stat().st_mtime, fichier.stat().st_size, fichier))
+            except FileNotFoundError:
+                pass
+        fichiers.sort()
+        total = sum(taille for _, taille, _ in fichiers)
+
+        supprimes = 0
+        while fichiers and total > taille_max:
+            _, taille, fichier = fichiers.pop(0)
+            total -= taille
+            fichier.unlink(missing_ok=True)
+            supprimes += 1
+
+        self._taille = total
+        return supprimes
@@ -0,0 +1,172 @@
+"""
+Module de cache des transcriptions
+Conserve le résultat formaté de chaque transcription, indexé par
+l'empreinte du contenu audio et les réglages du modèle : une nouvelle
+exécution sur les mêmes enregistrements ne relance pas WhisperX
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from . import cache_rendu
+
+
+# Taille maximale du cache par défaut (Mo)
+TAILLE_MAX_MO = 256
+
+
+def dossier_cache_defaut() -> Path:
+    """Dossier du cache des transcriptions (cache utilisateur)"""
+    return cache_rendu.dossier_cache_utilisateur() / 'transcriptions'
+
+
+def calculer_cle(sha256: str, reglages: dict) -> str:
+    """Clé d'une transcription : contenu audio et réglages qui changent le résultat"""
+    return cache_rendu.calculer_cle({'audio': sha256, 'transcription': reglages})
+
+
+class CacheTranscriptions:
+    """Cache LRU des transcriptions formatées, un fichier JSON par entrée"""
+
+    def __init__(self, dossier: Path, taille_max_mo: float = TAILLE_MAX_MO):
+        """
+        Initialise le cache
+
+        Args:
+            dossier: Dossier du cache (créé au premier enregistrement)
+            taille_max_mo: Taille maximale ; les transcriptions les moins
+                           récemment utilisées sont supprimées au-delà
+        """
+        self.dossier = Path(dossier)
+        self.taille_max = int(taille_max_mo * 1024 * 1024)
+
+    @classmethod
+    def depuis_config(cls, config_transcription: dict) -> Optional['CacheTranscriptions']:
+        """Cache de la section transcription, None si transcription.cache est désactivé"""
+        if not config_transcription.get('cache', True):
+            return None
+        dossier = config_transcription.get('dossier_cache') or dossier_cache_defaut()
+        return cls(Path(dossier), config_transcription.get('cache_taille_max_mo', TAILLE_MAX_MO))
+
+    def _chemin(self, cle: str) -> Path:
+        return self.dossier / f"{cle}.json"
+
+    def chercher(self, cle: str) -> Optional[dict]:
+        """
+        Cherche une transcription et la marque comme utilisée
+
+        Returns:
+            Entrée avec 'transcription', 'fichier', 'duree', 'reglages'
+            et 'cree_le', ou None si absente
+        """
+        chemin = self._chemin(cle)
+        try:
+            with open(chemin, 'r', encoding='utf-8') as f:
+                entree = json.load(f)
+            # La date de modification sert d'horodatage d'accès pour l'élagage
+            os.utime(chemin)
+        except (OSError, ValueError):
+            return None
+        return entree
+
+    def enregistrer(self, cle: str, transcription: dict, infos: dict):
+        """
+        Ajoute une transcription au cache puis élague si nécessaire
+
+        Args:
+            cle: Clé de la transcription
+            transcription: Résultat formaté ('texte', 'segments', 'langue')
+            infos: Description affichée par lister ('fichier', 'duree', 'reglages')
+        """
+        try:
+            self.dossier.mkdir(parents=True, exist_ok=True)
+            temporaire = self.dossier / f"{cle}.{os.getpid()}.tmp"
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {**infos, 'cree_le': time.time(), 'transcription': transcription},
+                    f,
+                    ensure_ascii=False
+                )
+            os.replace(temporaire, self._chemin(cle))
+            self.elaguer()
+        except OSError as e:
+            # Le cache est une optimisation : ne jamais bloquer la transcription
+            print(f"   ⚠️  Cache des transcriptions indisponible : {e}")
+
+    def entrees(self) -> List[dict]:
+        """Liste les transcriptions, de la plus récemment utilisée à la plus ancienne"""
+        if not self.dossier.exists():
+            return []
+
+        entrees = []
+        for chemin in self.dossier.glob('*.json'):
+            try:
+                stat = chemin.stat()
+                with open(chemin, 'r', encoding='utf-8') as f:
+                    entree = json.load(f)
+            except (OSError, ValueError):
+                continue
+            transcription = entree.pop('transcription', {})
+            entrees.append({
+                **entree,
+                'cle': chemin.stem,
+                'taille': stat.st_size,
+                'dernier_acces': stat.st_mtime,
+                'nb_segments': len(transcription.get('segments', []))
+            })
+
+        entrees.sort(key=lambda e: e['dernier_acces'], reverse=True)
+        return entrees
+
+    def taille_totale(self) -> int:
+        """Taille occupée par les transcriptions (octets)"""
+        if not self.dossier.exists():
+            return 0
+        return sum(f.stat().st_size for f in self.dossier.glob('*.json'))
+
+    def elaguer(self, taille_max: Optional[int] = None) -> List[str]:
+        """
+        Supprime les transcriptions les moins récemment utilisées au-delà d'une taille
+
+        Args:
+            taille_max: Taille à respecter en octets (défaut : celle du cache)
+
+        Returns:
+            Clés supprimées
+        """
+        taille_max = self.taille_max if taille_max is None else taille_max
+        if not self.dossier.exists():
+            return []
+
+        fichiers = []
+        for fichier in self.dossier.glob('*.json'):
+            try:
+                stat = fichier.stat()
+            except FileNotFoundError:
+                continue
+            fichiers.append((stat.st_mtime, stat.st_size, fichier))
+        fichiers.sort()
+        total = sum(taille for _, taille, _ in fichiers)
+
+        supprimees = []
+        while fichiers and total > taille_max:
+            _, taille, fichier = fichiers.pop(0)
+            fichier.unlink(missing_ok=True)
+            total -= taille
+            supprimees.append(fichier.stem)
+        return supprimees
+
+    def supprimer(self, cle: str) -> bool:
+        """Supprime une transcription ; retourne False si elle n'existait pas"""
+        try:
+            self._chemin(cle).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def vider(self) -> int:
+        """Supprime toutes les transcriptions ; retourne leur nombre"""
+        return len(self.elaguer(0))
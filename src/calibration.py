@@ -0,0 +1,120 @@
+"""
+Module de calibration de la transcription
+Mesure le débit de WhisperX sur un court extrait pour plusieurs réglages
+d'inférence (type de calcul, threads, taille de lot) et retient le plus
+rapide pour la machine
+"""
+
+import copy
+import os
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from . import flux_transcription
+
+
+# Types de calcul essayés selon le device
+TYPES_CALCUL = {
+    'cpu': ('int8', 'int8_float32', 'float32'),
+    'cuda': ('float16', 'int8_float16')
+}
+
+# Tailles de lot essayées
+TAILLES_LOT = (4, 8, 16, 32)
+
+# Durée de l'extrait de préchauffage (secondes)
+DUREE_PRECHAUFFAGE = 10
+
+
+def extraire_debut(chemin_audio: Path, duree: float) -> np.ndarray:
+    """Premières secondes d'un fichier, en float32 mono 16 kHz"""
+    taille = int(duree * flux_transcription.TAUX_WHISPER)
+    morceaux = []
+    disponible = 0
+    blocs = flux_transcription.iterer_audio_16k(chemin_audio)
+    try:
+        for bloc in blocs:
+            morceaux.append(bloc)
+            disponible += len(bloc)
+            if disponible >= taille:
+                break
+    finally:
+        blocs.close()
+    return np.concatenate(morceaux)[:taille] if morceaux else np.zeros(0, np.float32)
+
+
+def candidats_threads() -> List[int]:
+    """Nombres de threads essayés : tous les cœurs, puis la moitié"""
+    coeurs = os.cpu_count() or 1
+    return sorted({coeurs, max(1, coeurs // 2)}, reverse=True)
+
+
+def calibrer(
+    config: dict,
+    chemin_audio: Path,
+    duree_extrait: float = 60,
+    progression: Optional[Callable[[dict], None]] = None
+) -> List[dict]:
+    """
+    Chronomètre chaque combinaison de réglages sur un extrait
+
+    Le modèle est chargé une fois par type de calcul et nombre de threads,
+    préchauffé, puis chaque taille de lot est mesurée. Les types de calcul
+    que le matériel ne gère pas sont ignorés.
+
+    Args:
+        config: Configuration complète (section transcription utilisée)
+        chemin_audio: Fichier représentatif de vos enregistrements
+        duree_extrait: Durée de l'extrait mesuré (secondes)
+        progression: Fonction appelée avec chaque mesure
+
+    Returns:
+        Mesures triées de la plus rapide à la plus lente : 'compute_type',
+        'threads', 'batch_size', 'temps' (s) et 'temps_reel' (facteur)
+    """
+    from .transcriber import Transcriber
+
+    extrait = extraire_debut(chemin_audio, duree_extrait)
+    duree = len(extrait) / flux_transcription.TAUX_WHISPER
+    prechauffage = extrait[:DUREE_PRECHAUFFAGE * flux_transcription.TAUX_WHISPER]
+
+    device = Transcriber(config).device
+    mesures = []
+
+    for compute_type in TYPES_CALCUL[device]:
+        for threads in candidats_threads() if device == 'cpu' else [0]:
+            essai = copy.deepcopy(config)
+            essai['transcription'].update(compute_type=compute_type, threads=threads, workers=1)
+            transcriber = Transcriber(essai)
+
+            try:
+                modele = transcriber._charger_whisperx()
+            except (ValueError, RuntimeError) as e:
+                print(f"   ⏭️  {compute_type} non disponible : {e}")
+                break
+
+            modele.transcribe(prechauffage, language="fr", batch_size=TAILLES_LOT[0])
+
+            for batch_size in TAILLES_LOT:
+                debut = time.perf_counter()
+                modele.transcribe(extrait, language="fr", batch_size=batch_size)
+                temps = time.perf_counter() - debut
+
+                mesure = {
+                    'compute_type': compute_type,
+                    'threads': threads,
+                    'batch_size': batch_size,
+                    'temps': temps,
+                    'temps_reel': duree / temps if temps > 0 else 0.0
+                }
+                mesures.append(mesure)
+                if progression is not None:
+                    progression(mesure)
+
+            del modele
+            transcriber._liberer_memoire()
+
+    return sorted(mesures, key=lambda m: m['temps'])
@@ -7,10 +7,15 @@ import yaml
 from pathlib import Path
 from typing import Optional, List
 import os
+import re
 from dotenv import load_dotenv
 
 from .editor import PodcastEditor
+from .transcriber import Transcriber
 from .decoupage import Decoupage
+from .cache_rendu import CacheRendu, NOM_DOSSIER_CACHE
+from .cache_transcription import CacheTranscriptions
+from .index_audio import EXTENSIONS_AUDIO, index_par_defaut, lister_dossier
 
 
 # Charger les variables d'environnement
@@ -28,14 +33,13 @@ def _collecter_fichiers_audio(entrees: tuple) -> List[Path]:
         Liste de Path vers les fichiers audio
     """
     fichiers_audio = []
-    extensions_audio = {'.wav', '.mp3', '.ogg', '.flac', '.m4a', '.aac', '.wma', '.opus'}
 
     for entree in entrees:
         chemin = Path(entree)
 
         if chemin.is_file():
             # C'est un fichier, vérifier si c'est un fichier audio
-            if chemin.suffix.lower() in extensions_audio:
+            if chemin.suffix.lower() in EXTENSIONS_AUDIO:
                 fichiers_audio.append(chemin)
             else:
                 click.echo(f"⚠️  Ignoré (pas un fichier audio) : {chemin.name}", err=True)
@@ -43,9 +47,7 @@ def _collecter_fichiers_audio(entrees: tuple) -> List[Path]:
         elif chemin.is_dir():
             # C'est un dossier, récupérer tous les fichiers audio
             click.echo(f"📁 Analyse du dossier : {chemin}")
-            trouves = []
-            for ext in extensions_audio:
-                trouves.extend(chemin.glob(f'*{ext}'))
+            trouves = lister_dossier(chemin)
 
             if trouves:
                 click.echo(f"   Trouvé {len(trouves)} fichier(s) audio")
@@ -59,6 +61,13 @@ def _collecter_fichiers_audio(entrees: tuple) -> List[Path]:
     return fichiers_audio
 
 
+def _formater_duree(secondes: float) -> str:
+    """Durée au format h:mm:ss ou m:ss"""
+    minutes, secondes = divmod(int(round(secondes)), 60)
+    heures, minutes = divmod(minutes, 60)
+    return f"{heures}:{minutes:02d}:{secondes:02d}" if heures else f"{minutes}:{secondes:02d}"
+
+
 @click.group()
 @click.version_option(version='1.0.0')
 def cli():
@@ -167,10 +176,14 @@ def auto(entrees, sortie, duree, ton, transcription, detect_speakers, mix, confi
             click.echo("\nFormats supportés : WAV, MP3, OGG, FLAC, M4A, AAC, WMA, OPUS")
             return
 
-        # Afficher les fichiers à traiter
+        # Afficher les fichiers à traiter (durées lues dans l'index, sans décodage)
+        infos_fichiers = index_par_defaut().infos_fichiers(fichiers_path)
         click.echo(f"\n📋 Fichiers à traiter ({len(fichiers_path)}) :")
-        for i, f in enumerate(fichiers_path, 1):
-            click.echo(f"   {i}. {f.name}")
+        for i, (f, infos) in enumerate(zip(fichiers_path, infos_fichiers), 1):
+            duree = f" ({_formater_duree(infos['duree'])})" if 'duree' in infos else ""
+            click.echo(f"   {i}. {f.name}{duree}")
+        duree_totale = sum(infos.get('duree', 0) for infos in infos_fichiers)
+        click.echo(f"   Durée totale : {_formater_duree(duree_totale)}")
         click.echo()
 
     # Feature 3: Gestion transcription existante
@@ -259,6 +272,159 @@ def manuel(decoupage, source, sortie, config):
             raise
 
 
+@cli.command('transcrire-lot')
+@click.argument('entrees', nargs=-1, type=click.Path(exists=True), required=True)
+@click.option(
+    '--batch-size', '-b',
+    type=int,
+    help='Segments envoyés ensemble au modèle (défaut : transcription.batch_size)'
+)
+@click.option(
+    '--detect-speakers',
+    is_flag=True,
+    help='Activer la détection des speakers (nécessite token HuggingFace et pyannote.audio)'
+)
+@click.option(
+    '--recommencer',
+    is_flag=True,
+    help='Ignorer le journal de reprise et tout retranscrire'
+)
+@click.option(
+    '--config', '-c',
+    type=click.Path(exists=True),
+    help='Fichier de configuration personnalisé'
+)
+def transcrire_lot(entrees, batch_size, detect_speakers, recommencer, config):
+    """
+    Transcrit une série de fichiers avec un seul chargement du modèle
+
+    Chaque transcription est écrite à côté de son fichier. Une série
+    interrompue reprend là où elle s'était arrêtée.
+
+    Exemples :
+
+      podcasteur transcrire-lot entretiens/
+
+      podcasteur transcrire-lot entretiens/*.mp3 --batch-size 8
+    """
+    click.echo("\n🎙️ Podcasteur - Transcription par lot\n")
+
+    config_dict = _charger_config(config)
+    if batch_size:
+        config_dict['transcription']['batch_size'] = batch_size
+
+    fichiers = _collecter_fichiers_audio(entrees)
+    if not fichiers:
+        click.echo("❌ Erreur : Aucun fichier audio trouvé")
+        return
+
+    token_hf = os.getenv('HUGGINGFACE_TOKEN') if detect_speakers else None
+    if detect_speakers and not token_hf:
+        click.echo("⚠️  HUGGINGFACE_TOKEN manquant dans .env, la diarisation sera ignorée")
+
+    transcriber = Transcriber(config_dict)
+    try:
+        rapports = transcriber.transcrire_lot(
+            fichiers,
+            detecter_speakers=detect_speakers,
+            token_hf=token_hf,
+            reprendre=not recommencer
+        )
+    except KeyboardInterrupt:
+        click.echo("\n⏸️  Lot interrompu : relancez la même commande pour reprendre")
+        return
+
+    click.echo("\n📊 Bilan :")
+    symboles = {'transcrit': '✅', 'deja_fait': '⏩', 'erreur': '❌'}
+    for rapport in rapports:
+        vitesse = ""
+        if rapport['statut'] == 'transcrit' and rapport['temps'] > 0:
+            vitesse = f"  (x{rapport['duree_audio'] / rapport['temps']:.1f} temps réel)"
+        click.echo(
+            f"   {symboles[rapport['statut']]} {rapport['fichier'].name:<40} "
+            f"{_formater_duree(rapport['duree_audio']):>8} audio  {rapport['temps']:7.1f}s{vitesse}"
+        )
+
+    transcrits = [r for r in rapports if r['statut'] == 'transcrit']
+    erreurs = [r for r in rapports if r['statut'] == 'erreur']
+    temps_total = sum(r['temps'] for r in rapports)
+    click.echo(
+        f"\n   {len(transcrits)} transcrit(s), "
+        f"{len(rapports) - len(transcrits) - len(erreurs)} déjà fait(s), "
+        f"{len(erreurs)} erreur(s) en {_formater_duree(temps_total)}"
+    )
+
+
+@cli.command('calibrer-transcription')
+@click.argument('audio', type=click.Path(exists=True))
+@click.option(
+    '--extrait',
+    type=float,
+    default=60,
+    help='Durée de l\'extrait mesuré en secondes'
+)
+@click.option(
+    '--sortie', '-o',
+    type=click.Path(),
+    help='Configuration à mettre à jour (défaut : celle de --config, sinon config/ma_config.yaml)'
+)
+@click.option(
+    '--config', '-c',
+    type=click.Path(exists=True),
+    help='Fichier de configuration personnalisé'
+)
+def calibrer_transcription(audio, extrait, sortie, config):
+    """
+    Choisit les réglages de transcription les plus rapides pour cette machine
+
+    AUDIO est un enregistrement représentatif ; seul son début est utilisé.
+    Le type de calcul, le nombre de threads et la taille de lot retenus
+    sont enregistrés dans la section transcription de la configuration ;
+    le reste du fichier (commentaires compris) n'est pas modifié.
+
+    Exemple :
+        podcasteur calibrer-transcription entretien.wav --config ma_config.yaml
+    """
+    from .calibration import calibrer
+
+    click.echo("\n🎙️ Podcasteur - Calibration de la transcription\n")
+
+    config_dict = _charger_config(config)
+    click.echo(
+        f"⏱️  Extrait de {extrait:.0f}s de {Path(audio).name}, "
+        f"modèle '{config_dict['transcription']['modele']}'\n"
+    )
+
+    mesures = calibrer(
+        config_dict,
+        Path(audio),
+        extrait,
+        progression=lambda m: click.echo(
+            f"   {m['compute_type']:<13} {m['threads']:3d} threads  lot {m['batch_size']:3d}  "
+            f"{m['temps']:7.2f}s  (x{m['temps_reel']:.1f} temps réel)"
+        )
+    )
+    if not mesures:
+        click.echo("❌ Aucune combinaison n'a pu être mesurée")
+        return
+
+    meilleure = mesures[0]
+    click.echo(
+        f"\n🏆 Plus rapide : {meilleure['compute_type']}, {meilleure['threads']} threads, "
+        f"lot de {meilleure['batch_size']} (x{meilleure['temps_reel']:.1f} temps réel)"
+    )
+
+    chemin_sortie = Path(sortie or config or 'config/ma_config.yaml')
+    _mettre_a_jour_section_yaml(chemin_sortie, 'transcription', {
+        'compute_type': meilleure['compute_type'],
+        'threads': meilleure['threads'],
+        'batch_size': meilleure['batch_size']
+    })
+
+    click.echo(f"\n✅ Réglages enregistrés dans {chemin_sortie}")
+    click.echo(f"   Utilisez-les avec : podcasteur auto ... --config {chemin_sortie}")
+
+
 @cli.command()
 @click.argument('sortie', type=click.Path())
 def exemple(sortie):
@@ -309,6 +475,267 @@ def init_config(sortie):
     click.echo("\nÉditez ce fichier pour personnaliser les paramètres.")
 
 
+@cli.group('cache-rendu')
+def cache_rendu():
+    """
+    Inspecte ou élague le cache des rendus de montage
+    """
+    pass
+
+
+def _ouvrir_cache_rendu(sortie: str, config: Optional[str]) -> CacheRendu:
+    """Cache des rendus d'un dossier de sortie, avec la taille max configurée"""
+    audio_config = _charger_config(config).get('audio', {})
+    return CacheRendu(
+        Path(sortie) / NOM_DOSSIER_CACHE,
+        audio_config.get('cache_rendu_taille_max_mo', 2048)
+    )
+
+
+@cache_rendu.command('lister')
+@click.option(
+    '--sortie', '-o',
+    type=click.Path(),
+    default='sortie',
+    help='Dossier de sortie contenant le cache'
+)
+@click.option(
+    '--config', '-c',
+    type=click.Path(exists=True),
+    help='Fichier de configuration personnalisé'
+)
+def cache_rendu_lister(sortie, config):
+    """
+    Liste les rendus en cache, du plus récent au plus ancien
+
+    Exemple :
+        podcasteur cache-rendu lister --sortie sortie/
+    """
+    from datetime import datetime
+
+    cache = _ouvrir_cache_rendu(sortie, config)
+    entrees = cache.entrees()
+
+    if not entrees:
+        click.echo(f"\n📭 Aucun rendu en cache dans {cache.dossier}")
+        return
+
+    click.echo(f"\n📦 Cache des rendus : {cache.dossier}\n")
+    for entree in entrees:
+        dernier_acces = datetime.fromtimestamp(entree['dernier_acces']).strftime('%Y-%m-%d %H:%M')
+        duree = entree.get('infos', {}).get('duree_finale', 0)
+        click.echo(
+            f"  {entree['cle'][:12]}  {entree['taille'] / (1024 * 1024):8.2f} Mo  "
+            f"{duree / 60:5.1f} min  {len(entree['fichiers'])} fichier(s)  "
+            f"utilisé le {dernier_acces}"
+        )
+
+    total = sum(e['taille'] for e in entrees) / (1024 * 1024)
+    click.echo(
+        f"\n  Total : {len(entrees)} rendu(s), "
+        f"{total:.2f} Mo / {cache.taille_max / (1024 * 1024):.0f} Mo"
+    )
+
+
+@cache_rendu.command('elaguer')
+@click.option(
+    '--sortie', '-o',
+    type=click.Path(),
+    default='sortie',
+    help='Dossier de sortie contenant le cache'
+)
+@click.option(
+    '--taille-max',
+    type=float,
+    help='Taille à respecter en Mo (défaut : cache_rendu_taille_max_mo)'
+)
+@click.option(
+    '--tout',
+    is_flag=True,
+    help='Vider entièrement le cache'
+)
+@click.option(
+    '--config', '-c',
+    type=click.Path(exists=True),
+    help='Fichier de configuration personnalisé'
+)
+def cache_rendu_elaguer(sortie, taille_max, tout, config):
+    """
+    Supprime les rendus les moins récemment utilisés
+
+    Exemple :
+        podcasteur cache-rendu elaguer --taille-max 500
+    """
+    cache = _ouvrir_cache_rendu(sortie, config)
+
+    if tout:
+        nombre = cache.vider()
+    else:
+        limite = int(taille_max * 1024 * 1024) if taille_max is not None else None
+        nombre = len(cache.elaguer(limite))
+
+    click.echo(
+        f"\n🧹 {nombre} rendu(s) supprimé(s), "
+        f"{cache.taille_totale() / (1024 * 1024):.2f} Mo restants"
+    )
+
+
+@cli.group('cache-transcription')
+def cache_transcription():
+    """
+    Inspecte ou vide le cache des transcriptions
+    """
+    pass
+
+
+def _ouvrir_cache_transcription(config: Optional[str]) -> CacheTranscriptions:
+    """Cache des transcriptions, même désactivé dans la configuration"""
+    config_transcription = dict(_charger_config(config).get('transcription', {}))
+    config_transcription['cache'] = True
+    return CacheTranscriptions.depuis_config(config_transcription)
+
+
+@cache_transcription.command('lister')
+@click.option(
+    '--config', '-c',
+    type=click.Path(exists=True),
+    help='Fichier de configuration personnalisé'
+)
+def cache_transcription_lister(config):
+    """
+    Liste les transcriptions en cache, de la plus récente à la plus ancienne
+
+    Exemple :
+        podcasteur cache-transcription lister
+    """
+    from datetime import datetime
+
+    cache = _ouvrir_cache_transcription(config)
+    entrees = cache.entrees()
+
+    if not entrees:
+        click.echo(f"\n📭 Aucune transcription en cache dans {cache.dossier}")
+        return
+
+    click.echo(f"\n📦 Cache des transcriptions : {cache.dossier}\n")
+    for entree in entrees:
+        dernier_acces = datetime.fromtimestamp(entree['dernier_acces']).strftime('%Y-%m-%d %H:%M')
+        reglages = entree.get('reglages', {})
+        options = reglages.get('modele', '?')
+        if reglages.get('diarisation'):
+            options += ', speakers'
+        click.echo(
+            f"  {entree['cle'][:12]}  {entree.get('fichier', '?'):<30}  "
+            f"{_formater_duree(entree.get('duree', 0)):>8}  {entree['nb_segments']:5d} segments  "
+            f"({options})  utilisée le {dernier_acces}"
+        )
+
+    total = sum(e['taille'] for e in entrees) / (1024 * 1024)
+    click.echo(
+        f"\n  Total : {len(entrees)} transcription(s), "
+        f"{total:.2f} Mo / {cache.taille_max / (1024 * 1024):.0f} Mo"
+    )
+
+
+@cache_transcription.command('supprimer')
+@click.argument('cles', nargs=-1)
+@click.option(
+    '--taille-max',
+    type=float,
+    help='Élaguer jusqu\'à cette taille en Mo (les moins récemment utilisées d\'abord)'
+)
+@click.option(
+    '--tout',
+    is_flag=True,
+    help='Vider entièrement le cache'
+)
+@click.option(
+    '--config', '-c',
+    type=click.Path(exists=True),
+    help='Fichier de configuration personnalisé'
+)
+def cache_transcription_supprimer(cles, taille_max, tout, config):
+    """
+    Supprime des transcriptions du cache (par début de clé, voir lister)
+
+    Exemples :
+        podcasteur cache-transcription supprimer 3f2a9c1b
+        podcasteur cache-transcription supprimer --taille-max 50
+    """
+    cache = _ouvrir_cache_transcription(config)
+
+    if tout:
+        nombre = cache.vider()
+    elif cles:
+        nombre = 0
+        connues = [e['cle'] for e in cache.entrees()]
+        for prefixe in cles:
+            correspondantes = [c for c in connues if c.startswith(prefixe)]
+            if len(correspondantes) != 1:
+                click.echo(
+                    f"   ⚠️  {prefixe} : {len(correspondantes)} transcription(s) correspondante(s)",
+                    err=True
+                )
+                continue
+            nombre += cache.supprimer(correspondantes[0])
+    elif taille_max is not None:
+        nombre = len(cache.elaguer(int(taille_max * 1024 * 1024)))
+    else:
+        raise click.UsageError("Indiquez des clés, --taille-max ou --tout")
+
+    click.echo(
+        f"\n🧹 {nombre} transcription(s) supprimée(s), "
+        f"{cache.taille_totale() / (1024 * 1024):.2f} Mo restants"
+    )
+
+
+@cli.group('index-audio')
+def index_audio():
+    """
+    Construit ou nettoie l'index des fichiers audio (durées, formats)
+    """
+    pass
+
+
+@index_audio.command('indexer')
+@click.argument('entrees', nargs=-1, type=click.Path(exists=True), required=True)
+@click.option(
+    '--hachage',
+    is_flag=True,
+    help='Calculer aussi l\'empreinte SHA-256 du contenu'
+)
+def index_audio_indexer(entrees, hachage):
+    """
+    Indexe des fichiers ou dossiers audio à l'avance
+
+    Exemple :
+        podcasteur index-audio indexer archives/ --hachage
+    """
+    fichiers = _collecter_fichiers_audio(entrees)
+    index = index_par_defaut()
+    resultats = index.infos_fichiers(fichiers, hachage=hachage)
+
+    erreurs = [r for r in resultats if 'erreur' in r]
+    for resultat in erreurs:
+        click.echo(f"   ⚠️  {Path(resultat['chemin']).name} : {resultat['erreur']}", err=True)
+
+    duree = sum(r.get('duree', 0) for r in resultats)
+    click.echo(
+        f"\n🗂️  {len(resultats) - len(erreurs)} fichier(s) indexé(s) ({_formater_duree(duree)}), "
+        f"{index.nombre()} dans l'index"
+    )
+
+
+@index_audio.command('purger')
+def index_audio_purger():
+    """
+    Retire de l'index les fichiers supprimés ou déplacés
+    """
+    index = index_par_defaut()
+    nombre = index.purger()
+    click.echo(f"\n🧹 {nombre} fichier(s) retiré(s), {index.nombre()} dans l'index")
+
+
 @cli.command()
 def info():
     """
@@ -327,8 +754,13 @@ les meilleurs découpages de vos enregistrements audio.
 🔧 Commandes disponibles :
   • auto          : Workflow automatique
   • manuel        : Workflow manuel
+  • transcrire-lot : Transcrire une série de fichiers (reprise possible)
+  • calibrer-transcription : Choisir les réglages de transcription les plus rapides
   • exemple       : Créer un fichier de découpage d'exemple
   • init-config   : Créer un fichier de configuration
+  • cache-rendu   : Lister ou élaguer le cache des rendus
+  • cache-transcription : Lister ou vider le cache des transcriptions
+  • index-audio   : Indexer les fichiers audio (durées, formats)
   • info          : Afficher ces informations
 
 📚 Documentation complète :
@@ -364,6 +796,67 @@ les meilleurs découpages de vos enregistrements audio.
 """)
 
 
+def _mettre_a_jour_section_yaml(chemin: Path, section: str, valeurs: dict):
+    """
+    Remplace quelques clés d'une section d'un fichier YAML, ligne par ligne
+
+    Les commentaires et les autres clés sont conservés. Un fichier absent
+    est créé à partir de la configuration par défaut.
+    """
+    if chemin.exists():
+        texte = chemin.read_text(encoding='utf-8')
+    else:
+        config_defaut_path = Path(__file__).parent.parent / 'config' / 'default_config.yaml'
+        texte = ''
+        if config_defaut_path.exists():
+            texte = config_defaut_path.read_text(encoding='utf-8')
+
+    lignes = texte.splitlines(keepends=True)
+    if lignes and not lignes[-1].endswith('\n'):
+        lignes[-1] += '\n'
+
+    entete = re.compile(rf'^{re.escape(section)}:\s*(#.*)?$')
+    debut = next((i for i, ligne in enumerate(lignes) if entete.match(ligne.rstrip('\n'))), None)
+    if debut is None:
+        lignes.append(f"{section}:\n")
+        debut = len(lignes) - 1
+
+    # La section s'arrête à la clé suivante de premier niveau
+    fin = next(
+        (i for i in range(debut + 1, len(lignes)) if re.match(r'^[^\s#]', lignes[i])),
+        len(lignes)
+    )
+    while fin > debut + 1 and not lignes[fin - 1].strip():
+        fin -= 1
+
+    for cle, valeur in valeurs.items():
+        texte_valeur = yaml.safe_dump(valeur, allow_unicode=True).splitlines()[0]
+        motif = re.compile(rf'^(  {re.escape(cle)}:[ \t]*)([^#\n]*?)([ \t]*#.*)?$')
+        for i in range(debut + 1, fin):
+            correspondance = motif.match(lignes[i].rstrip('\n'))
+            if correspondance:
+                ancienne, commentaire = correspondance.group(2), correspondance.group(3) or ''
+                if commentaire:
+                    # Garder le commentaire dans sa colonne quand c'est possible
+                    espaces = len(commentaire) - len(commentaire.lstrip())
+                    espaces = max(espaces + len(ancienne) - len(texte_valeur), 1)
+                    commentaire = ' ' * espaces + commentaire.lstrip()
+                lignes[i] = f"{correspondance.group(1)}{texte_valeur}{commentaire}\n"
+                break
+        else:
+            lignes.insert(fin, f"  {cle}: {texte_valeur}\n")
+            fin += 1
+
+    nouveau = ''.join(lignes)
+    # Ne jamais écrire un fichier que la configuration ne relirait pas à l'identique
+    relu = (yaml.safe_load(nouveau) or {}).get(section) or {}
+    if any(relu.get(cle) != valeur for cle, valeur in valeurs.items()):
+        raise click.ClickException(f"Impossible de mettre à jour la section {section} de {chemin}")
+
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    chemin.write_text(nouveau, encoding='utf-8')
+
+
 def _charger_config(chemin_config: Optional[str]) -> dict:
     """Charge la configuration depuis un fichier ou utilise la config par défaut"""
     if chemin_config:
@@ -6,7 +6,9 @@ Charge, valide et convertit les fichiers de découpage
 import json
 from pathlib import Path
 from typing import List, Dict, Optional
-from pydub import AudioSegment
+
+from . import flux_audio
+from . import index_audio
 
 
 class Decoupage:
@@ -126,11 +128,11 @@ class Decoupage:
                 )
                 continue
             
-            # Obtenir la durée du fichier (cache)
+            # Obtenir la durée du fichier (index persistant, en-têtes seulement)
             if nom_fichier not in durees_fichiers:
                 try:
-                    audio = AudioSegment.from_file(chemin_fichier)
-                    durees_fichiers[nom_fichier] = len(audio) / 1000
+                    infos_fichier = index_audio.index_par_defaut().infos(chemin_fichier)
+                    durees_fichiers[nom_fichier] = infos_fichier['duree']
                 except Exception as e:
                     avertissements.append(
                         f"⚠️  Impossible de lire {nom_fichier} : {e}"
@@ -172,7 +174,9 @@ class Decoupage:
             dossier_source: Dossier contenant les fichiers sources
             
         Returns:
-            Liste de segments avec les AudioSegments chargés
+            Liste de segments ; 'audio' est l'AudioSegment extrait, ou pour
+            un WAV projeté une vue NumPy (frames, canaux) sans copie, lue
+            au moment des fondus ('taux' donne alors sa fréquence)
         """
         print(f"📦 Préparation des segments pour le montage...")
         
@@ -183,25 +187,31 @@ class Decoupage:
             nom_fichier = segment['fichier']
             chemin_fichier = dossier_source / nom_fichier
             
-            # Charger le fichier audio (avec cache)
+            # Ouvrir le fichier audio (avec cache) : un WAV est projeté en
+            # mémoire, seules les plages des segments seront lues
             if nom_fichier not in cache_audio:
                 print(f"   Chargement de {nom_fichier}...")
-                cache_audio[nom_fichier] = AudioSegment.from_file(chemin_fichier)
+                cache_audio[nom_fichier] = flux_audio.ouvrir_audio(chemin_fichier)
             
             audio_source = cache_audio[nom_fichier]
             
             # Extraire le segment
             debut_ms = int(segment['debut'] * 1000)
             fin_ms = int(segment['fin'] * 1000)
-            audio_segment = audio_source[debut_ms:fin_ms]
-
-            segments_prepares.append({
-                'audio': audio_segment,
+            segment_prepare = {
                 'debut': segment['debut'],
                 'fin': segment['fin'],
                 'fichier': nom_fichier,
                 'description': segment.get('description', f'Segment {i}')
-            })
+            }
+            if isinstance(audio_source, flux_audio.WavMappe):
+                # Vue sur le fichier : les frames ne sont copiées qu'aux fondus
+                segment_prepare['audio'] = audio_source.tableau(debut_ms, fin_ms)
+                segment_prepare['taux'] = audio_source.taux_echantillonnage
+            else:
+                segment_prepare['audio'] = audio_source[debut_ms:fin_ms]
+
+            segments_prepares.append(segment_prepare)
         
         print(f"✅ {len(segments_prepares)} segments prêts")
         
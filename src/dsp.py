@@ -0,0 +1,435 @@
+"""
+Module de traitement du signal vectorisé (NumPy)
+Fondus, gain et normalisation appliqués sur place aux échantillons,
+conversions de format (canaux, largeur, fréquence d'échantillonnage)
+"""
+
+import math
+import numpy as np
+from pydub import AudioSegment
+from typing import Optional
+
+try:
+    from scipy.signal import resample_poly
+except ImportError:
+    resample_poly = None
+
+
+# Courbes de fondu disponibles (audio.courbe_fondu)
+COURBES_FONDU = ('lineaire', 'logarithmique', 'puissance_constante')
+
+# Plage couverte par la courbe logarithmique (dB)
+PLAGE_FONDU_LOG_DB = 60.0
+
+# Passages par zéro du sinus cardinal de chaque côté (rééchantillonnage)
+ZEROS_SINC = 16
+
+# Paramètre de la fenêtre de Kaiser du filtre de rééchantillonnage
+BETA_KAISER = 8.6
+
+# Sorties calculées par produit dans le rééchantillonneur NumPy (mémoire bornée)
+TAILLE_BLOC_REECHANTILLONNAGE = 65536
+
+# Types NumPy selon la largeur d'échantillon (représentation pydub, signée)
+_TYPES_ECHANTILLONS = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+def type_echantillons(largeur: int):
+    """Type NumPy des échantillons pydub d'une largeur donnée (octets)"""
+    if largeur not in _TYPES_ECHANTILLONS:
+        raise ValueError(f"Largeur d'échantillon non supportée : {largeur}")
+    return _TYPES_ECHANTILLONS[largeur]
+
+
+def vers_tableau(audio: AudioSegment) -> np.ndarray:
+    """
+    Copie les échantillons d'un AudioSegment dans un tableau modifiable
+
+    Args:
+        audio: Audio source
+
+    Returns:
+        Tableau (frames, canaux) partageant son tampon avec vers_audio()
+    """
+    type_numpy = type_echantillons(audio.sample_width)
+    tampon = bytearray(audio.raw_data)
+    tableau = np.frombuffer(tampon, dtype=type_numpy)
+    return tableau.reshape(-1, audio.channels)
+
+
+def copie_modifiable(tableau: np.ndarray) -> np.ndarray:
+    """
+    Copie un tableau (vue projetée sur un fichier par exemple) dans un
+    tampon que vers_audio() réutilise sans nouvelle copie
+    """
+    tampon = bytearray(tableau.nbytes)
+    copie = np.frombuffer(tampon, dtype=tableau.dtype).reshape(tableau.shape)
+    copie[...] = tableau
+    return copie
+
+
+def vers_audio(tableau: np.ndarray, modele: AudioSegment) -> AudioSegment:
+    """Reconstruit un AudioSegment depuis un tableau, sans copie si possible"""
+    return audio_depuis_tableau(tableau, modele.frame_rate)
+
+
+def audio_depuis_tableau(tableau: np.ndarray, taux: int) -> AudioSegment:
+    """AudioSegment d'un tableau (frames, canaux) entier, sans copie si possible"""
+    tampon = tableau
+    while isinstance(tampon, np.ndarray) and tampon.base is not None:
+        tampon = tampon.base
+    if not isinstance(tampon, bytearray) or len(tampon) != tableau.nbytes:
+        tampon = tableau.tobytes()
+
+    return AudioSegment(
+        data=tampon,
+        sample_width=tableau.dtype.itemsize,
+        frame_rate=taux,
+        channels=tableau.shape[1]
+    )
+
+
+def courbe_fondu(nb_frames: int, courbe: str = 'lineaire', entree: bool = True) -> np.ndarray:
+    """
+    Calcule les gains linéaires d'un fondu
+
+    Args:
+        nb_frames: Longueur du fondu
+        courbe: 'lineaire', 'logarithmique' ou 'puissance_constante'
+        entree: True pour un fondu d'entrée (0 → 1), False pour une sortie
+
+    Returns:
+        Gains (float64, précis même en 32 bits), un par frame
+    """
+    # Même progression que pydub : le gain atteint 1 juste après le fondu
+    t = np.arange(nb_frames, dtype=np.float64) / max(nb_frames, 1)
+    if not entree:
+        t = 1 - t
+
+    if courbe == 'lineaire':
+        gains = t
+    elif courbe == 'logarithmique':
+        gains = np.power(10.0, (t - 1) * (PLAGE_FONDU_LOG_DB / 20))
+        gains[t == 0] = 0
+    elif courbe == 'puissance_constante':
+        gains = np.sin(t * (np.pi / 2))
+    else:
+        raise ValueError(
+            f"Courbe de fondu inconnue : {courbe} (choix : {', '.join(COURBES_FONDU)})"
+        )
+
+    return gains
+
+
+def _multiplier(tableau: np.ndarray, gains) -> None:
+    """Multiplie sur place, avec saturation et arrondi inférieur comme audioop.mul"""
+    if np.issubdtype(tableau.dtype, np.floating):
+        tableau *= gains
+        return
+
+    limites = np.iinfo(tableau.dtype)
+    resultat = np.floor(tableau * gains)
+    np.clip(resultat, limites.min, limites.max, out=resultat)
+    tableau[...] = resultat
+
+
+def appliquer_fondu_entree(tableau: np.ndarray, nb_frames: int, courbe: str = 'lineaire'):
+    """Applique un fondu d'entrée sur place (tableau (frames, canaux))"""
+    nb_frames = min(nb_frames, len(tableau))
+    if nb_frames > 0:
+        _multiplier(tableau[:nb_frames], courbe_fondu(nb_frames, courbe, entree=True)[:, None])
+
+
+def appliquer_fondu_sortie(tableau: np.ndarray, nb_frames: int, courbe: str = 'lineaire'):
+    """Applique un fondu de sortie sur place (tableau (frames, canaux))"""
+    nb_frames = min(nb_frames, len(tableau))
+    if nb_frames > 0:
+        _multiplier(tableau[-nb_frames:], courbe_fondu(nb_frames, courbe, entree=False)[:, None])
+
+
+def appliquer_gain(tableau: np.ndarray, gain_db: float):
+    """Applique un gain en dB sur place"""
+    appliquer_gain_lineaire(tableau, 10 ** (gain_db / 20))
+
+
+def appliquer_gain_lineaire(tableau: np.ndarray, facteur: float):
+    """Applique un gain linéaire sur place"""
+    if facteur != 1.0:
+        _multiplier(tableau, facteur)
+
+
+def pic(tableau: np.ndarray) -> float:
+    """Valeur absolue maximale des échantillons"""
+    if tableau.size == 0:
+        return 0
+    return max(abs(float(tableau.max())), abs(float(tableau.min())))
+
+
+def facteur_normalisation(valeur_pic: float, dtype, marge_db: float = 0.1) -> Optional[float]:
+    """
+    Gain linéaire amenant le pic à marge_db sous la pleine échelle
+
+    Même calcul que pydub.effects.normalize ; None si le signal est nul.
+    """
+    if valeur_pic == 0:
+        return None
+    if np.issubdtype(dtype, np.floating):
+        pleine_echelle = 1.0
+    else:
+        pleine_echelle = float(-np.iinfo(dtype).min)
+    return pleine_echelle * 10 ** (-marge_db / 20) / valeur_pic
+
+
+def normaliser(tableau: np.ndarray, marge_db: float = 0.1):
+    """Normalise le pic sur place (équivalent de pydub.effects.normalize)"""
+    facteur = facteur_normalisation(pic(tableau), tableau.dtype, marge_db)
+    if facteur is not None:
+        appliquer_gain_lineaire(tableau, facteur)
+
+
+def appliquer_fondus(
+    audio: AudioSegment,
+    duree_entree_ms: int = 0,
+    duree_sortie_ms: int = 0,
+    courbe: str = 'lineaire'
+) -> AudioSegment:
+    """
+    Applique fondus d'entrée et de sortie à un AudioSegment
+
+    Remplace audio.fade_in(...).fade_out(...) : une seule copie des
+    échantillons, puis calcul vectorisé sur les seules frames des fondus.
+
+    Args:
+        audio: Audio à traiter
+        duree_entree_ms: Durée du fondu d'entrée (0 = aucun)
+        duree_sortie_ms: Durée du fondu de sortie (0 = aucun)
+        courbe: Courbe des fondus
+
+    Returns:
+        Nouvel AudioSegment
+    """
+    if not duree_entree_ms and not duree_sortie_ms:
+        return audio
+
+    tableau = vers_tableau(audio)
+    appliquer_fondus_tableau(tableau, audio.frame_rate, duree_entree_ms, duree_sortie_ms, courbe)
+    return vers_audio(tableau, audio)
+
+
+def appliquer_fondus_vue(
+    vue: np.ndarray,
+    taux: int,
+    duree_entree_ms: int = 0,
+    duree_sortie_ms: int = 0,
+    courbe: str = 'lineaire'
+) -> AudioSegment:
+    """
+    Applique les fondus à une vue en lecture seule (plage d'un WAV projeté)
+
+    La plage n'est copiée qu'une fois, dans le tampon de l'AudioSegment
+    retourné.
+    """
+    tableau = copie_modifiable(vue)
+    appliquer_fondus_tableau(tableau, taux, duree_entree_ms, duree_sortie_ms, courbe)
+    return audio_depuis_tableau(tableau, taux)
+
+
+def appliquer_fondus_tableau(
+    tableau: np.ndarray,
+    taux: int,
+    duree_entree_ms: int = 0,
+    duree_sortie_ms: int = 0,
+    courbe: str = 'lineaire'
+):
+    """Applique sur place fondus d'entrée et de sortie (durées en ms)"""
+    frames_par_ms = taux / 1000.0
+
+    if duree_entree_ms:
+        appliquer_fondu_entree(tableau, int(duree_entree_ms * frames_par_ms), courbe)
+    if duree_sortie_ms:
+        appliquer_fondu_sortie(tableau, int(duree_sortie_ms * frames_par_ms), courbe)
+
+
+def convertir_canaux(tableau: np.ndarray, canaux: int) -> np.ndarray:
+    """
+    Change le nombre de canaux (mêmes règles que pydub.set_channels)
+
+    Mono → multicanal duplique le signal ; multicanal → mono moyenne les canaux.
+    """
+    if tableau.shape[1] == canaux:
+        return tableau
+    if tableau.shape[1] == 1:
+        return np.repeat(tableau, canaux, axis=1)
+    if canaux == 1:
+        moyenne = np.floor(tableau.mean(axis=1, keepdims=True))
+        if np.issubdtype(tableau.dtype, np.integer):
+            return moyenne.astype(tableau.dtype)
+        return moyenne
+    raise ValueError(f"Conversion de {tableau.shape[1]} vers {canaux} canaux non supportée")
+
+
+def convertir_largeur(tableau: np.ndarray, largeur: int) -> np.ndarray:
+    """Change la largeur d'échantillon par décalage de bits (comme audioop.lin2lin)"""
+    source = tableau.dtype.itemsize
+    if source == largeur:
+        return tableau
+    decalage = 8 * abs(largeur - source)
+    valeurs = tableau.astype(np.int64)
+    valeurs = valeurs << decalage if largeur > source else valeurs >> decalage
+    return valeurs.astype(type_echantillons(largeur))
+
+
+def rapport_reechantillonnage(taux_source: int, taux_cible: int) -> tuple:
+    """Facteurs (montée, descente) irréductibles entre deux fréquences"""
+    pgcd = math.gcd(taux_source, taux_cible)
+    return taux_cible // pgcd, taux_source // pgcd
+
+
+def longueur_reechantillonnee(nb_frames: int, taux_source: int, taux_cible: int) -> int:
+    """Nombre de frames produit par reechantillonner()"""
+    if taux_source == taux_cible:
+        return nb_frames
+    montee, descente = rapport_reechantillonnage(taux_source, taux_cible)
+    return -(-nb_frames * montee // descente)
+
+
+def _filtre_polyphase(montee: int, descente: int) -> tuple:
+    """
+    Coefficients du filtre d'interpolation, une ligne par phase
+
+    Sinus cardinal fenêtré (Kaiser), coupé à la plus basse des deux
+    fréquences de Nyquist ; chaque phase est ramenée à un gain unitaire.
+
+    Returns:
+        Tuple (coefficients (montee, taps), nombre de taps avant l'échantillon)
+    """
+    coupure = min(1.0, montee / descente)
+    demi_largeur = int(math.ceil(ZEROS_SINC / coupure))
+    k = np.arange(-demi_largeur + 1, demi_largeur + 1)
+
+    # Position fractionnaire de chaque phase entre deux échantillons d'entrée
+    fractions = np.arange(montee)[:, None] / montee
+    t = fractions - k[None, :]
+    fenetre = np.kaiser(2 * demi_largeur + 1, BETA_KAISER)
+    coefficients = coupure * np.sinc(coupure * t) * np.interp(
+        t, np.arange(-demi_largeur, demi_largeur + 1), fenetre
+    )
+    coefficients /= coefficients.sum(axis=1, keepdims=True)
+    return coefficients, demi_largeur - 1
+
+
+def _reechantillonner_numpy(
+    signal: np.ndarray,
+    montee: int,
+    descente: int,
+    nb_sortie: int
+) -> np.ndarray:
+    """
+    Interpolation polyphase, une phase à la fois
+
+    Les sorties d'une même phase lisent l'entrée avec un pas constant
+    (descente) : leurs fenêtres forment une vue à pas sur le canal, sans
+    copie, réduite par un produit matrice-vecteur.
+    """
+    coefficients, avance = _filtre_polyphase(montee, descente)
+    nb_taps = coefficients.shape[1]
+
+    longueur_utile = (nb_sortie - 1) * descente // montee + nb_taps
+    sortie = np.empty((nb_sortie, signal.shape[1]))
+
+    for canal in range(signal.shape[1]):
+        entree = np.zeros(longueur_utile)
+        fin = min(len(signal), longueur_utile - avance)
+        entree[avance:avance + fin] = signal[:fin, canal]
+        pas = entree.strides[0]
+
+        for phase in range(min(montee, nb_sortie)):
+            decalage = phase * descente // montee
+            coefficients_phase = coefficients[(phase * descente) % montee]
+            nb = len(range(phase, nb_sortie, montee))
+
+            # Par tranches pour borner la copie faite par le produit
+            for debut in range(0, nb, TAILLE_BLOC_REECHANTILLONNAGE):
+                nb_bloc = min(TAILLE_BLOC_REECHANTILLONNAGE, nb - debut)
+                fenetres = np.lib.stride_tricks.as_strided(
+                    entree[decalage + debut * descente:],
+                    shape=(nb_bloc, nb_taps),
+                    strides=(descente * pas, pas),
+                    writeable=False
+                )
+                premiere = phase + debut * montee
+                derniere = premiere + nb_bloc * montee
+                sortie[premiere:derniere:montee, canal] = fenetres @ coefficients_phase
+
+    return sortie
+
+
+def reechantillonner(tableau: np.ndarray, taux_source: int, taux_cible: int) -> np.ndarray:
+    """
+    Change la fréquence d'échantillonnage (filtre polyphase à sinus fenêtré)
+
+    Utilise scipy.signal.resample_poly s'il est installé, sinon une
+    implémentation NumPy équivalente ; les deux produisent
+    longueur_reechantillonnee() frames.
+
+    Args:
+        tableau: Échantillons (frames, canaux), entiers ou flottants
+        taux_source: Fréquence du tableau (Hz)
+        taux_cible: Fréquence voulue (Hz)
+
+    Returns:
+        Nouveau tableau, du même type que l'entrée
+    """
+    if taux_source == taux_cible:
+        return tableau
+
+    montee, descente = rapport_reechantillonnage(taux_source, taux_cible)
+    nb_sortie = longueur_reechantillonnee(len(tableau), taux_source, taux_cible)
+    if nb_sortie == 0:
+        return np.zeros((0, tableau.shape[1]), dtype=tableau.dtype)
+
+    signal = tableau.astype(np.float64)
+    if resample_poly is not None:
+        sortie = resample_poly(signal, montee, descente, axis=0)[:nb_sortie]
+    else:
+        sortie = _reechantillonner_numpy(signal, montee, descente, nb_sortie)
+
+    if np.issubdtype(tableau.dtype, np.integer):
+        limites = np.iinfo(tableau.dtype)
+        np.rint(sortie, out=sortie)
+        np.clip(sortie, limites.min, limites.max, out=sortie)
+    return sortie.astype(tableau.dtype)
+
+
+def convertir_format(audio: AudioSegment, format_sortie: dict) -> AudioSegment:
+    """
+    Convertit un AudioSegment au format demandé en une seule passe
+
+    Args:
+        audio: Audio source
+        format_sortie: {'canaux', 'taux_echantillonnage', 'largeur_echantillon'}
+
+    Returns:
+        Audio au format demandé (l'audio source s'il y est déjà)
+    """
+    canaux = format_sortie['canaux']
+    taux = format_sortie['taux_echantillonnage']
+    largeur = format_sortie['largeur_echantillon']
+    if (audio.channels, audio.frame_rate, audio.sample_width) == (canaux, taux, largeur):
+        return audio
+
+    tableau = np.frombuffer(audio.raw_data, dtype=type_echantillons(audio.sample_width))
+    tableau = tableau.reshape(-1, audio.channels)
+    tableau = convertir_canaux(tableau, canaux)
+    # Largeur élargie avant le rééchantillonnage pour garder la précision
+    if largeur > audio.sample_width:
+        tableau = convertir_largeur(tableau, largeur)
+    tableau = reechantillonner(tableau, audio.frame_rate, taux)
+    tableau = convertir_largeur(tableau, largeur)
+
+    return AudioSegment(
+        data=np.ascontiguousarray(tableau).tobytes(),
+        sample_width=largeur,
+        frame_rate=taux,
+        channels=canaux
+    )
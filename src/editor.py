@@ -11,6 +11,10 @@ from .audio_processor import AudioProcessor
 from .transcriber import Transcriber
 from .ai_analyzer import AIAnalyzer
 from .decoupage import Decoupage
+from . import assemblage
+from . import dsp
+from . import flux_audio
+from . import sonie
 
 
 class PodcastEditor:
@@ -108,12 +112,27 @@ class PodcastEditor:
                     print("   Obtenez un token sur : https://huggingface.co/settings/tokens")
 
             chemin_transcription = dossier_sortie / "transcription.txt"
-            transcription = self.transcriber.transcrire(
-                fichier_mix_final,
-                chemin_transcription,
-                detecter_speakers=detecter_speakers,
-                token_hf=token_hf
-            )
+            if self.config['transcription'].get('par_fichier', False) and not fichier_mix:
+                # Chaque enregistrement transcrit (ou repris du cache) séparément
+                transcription = self.transcriber.transcrire_fichiers(
+                    self.audio_processor.trier_fichiers(
+                        fichiers_entree,
+                        self.config['tri_fichiers']['methode'],
+                        self.config['tri_fichiers']['ordre']
+                    ),
+                    chemin_transcription,
+                    detecter_speakers=detecter_speakers,
+                    token_hf=token_hf,
+                    chemin_mix=fichier_mix_final,
+                    durees=self.audio_processor.durees_concatenees
+                )
+            else:
+                transcription = self.transcriber.transcrire(
+                    fichier_mix_final,
+                    chemin_transcription,
+                    detecter_speakers=detecter_speakers,
+                    token_hf=token_hf
+                )
 
         # Étape 3 : Analyse IA
         print("\n📁 ÉTAPE 3/4 : Analyse IA et génération de suggestions")
@@ -138,17 +157,19 @@ class PodcastEditor:
         suggestions_choisies = self._demander_selection_suggestion(suggestions)
 
         # Montage final - peut générer plusieurs fichiers
-        fichiers_finaux = []
-        for i, suggestion_choisie in enumerate(suggestions_choisies, 1):
-            if len(suggestions_choisies) > 1:
-                print(f"\n🎬 Montage {i}/{len(suggestions_choisies)} : {suggestion_choisie['titre']}")
-
-            fichier_final = self._monter_depuis_suggestion(
+        if len(suggestions_choisies) > 1:
+            print(f"\n🎬 {len(suggestions_choisies)} montages en parallèle")
+            fichiers_finaux = self._monter_depuis_suggestions(
                 fichier_mix_final,
-                suggestion_choisie,
+                suggestions_choisies,
                 dossier_sortie
             )
-            fichiers_finaux.append(fichier_final)
+        else:
+            fichiers_finaux = [self._monter_depuis_suggestion(
+                fichier_mix_final,
+                suggestions_choisies[0],
+                dossier_sortie
+            )]
 
         print("\n" + "="*60)
         print("✅ WORKFLOW TERMINÉ")
@@ -548,7 +569,46 @@ Garde le même format JSON que précédemment."""
         Returns:
             Chemin du fichier final
         """
-        # Convertir les segments de suggestion en format pour audio_processor
+        segments = self._segments_depuis_suggestion(fichier_source, suggestion)
+
+        # Monter
+        _, fichier_final = self.audio_processor.creer_montage(
+            fichier_source,
+            segments,
+            self._chemin_sortie_suggestion(suggestion, dossier_sortie)
+        )
+
+        return fichier_final
+
+    def _monter_depuis_suggestions(
+            self,
+            fichier_source: Path,
+            suggestions: List[Dict],
+            dossier_sortie: Path
+    ) -> List[Path]:
+        """
+        Monte plusieurs suggestions en parallèle (source chargée une fois)
+
+        Args:
+            fichier_source: Fichier audio source (mix complet)
+            suggestions: Suggestions choisies
+            dossier_sortie: Dossier de sortie
+
+        Returns:
+            Chemins des fichiers finaux, dans l'ordre des suggestions
+        """
+        montages = [
+            {
+                'titre': suggestion['titre'],
+                'segments': self._segments_depuis_suggestion(fichier_source, suggestion),
+                'chemin_sortie': self._chemin_sortie_suggestion(suggestion, dossier_sortie)
+            }
+            for suggestion in suggestions
+        ]
+        return self.audio_processor.creer_montages(montages)
+
+    def _segments_depuis_suggestion(self, fichier_source: Path, suggestion: Dict) -> List[Dict]:
+        """Convertit les segments d'une suggestion au format d'audio_processor"""
         segments = []
         for seg in suggestion['segments']:
             # Utiliser le fichier source réel (celui fourni par l'utilisateur)
@@ -565,20 +625,13 @@ Garde le même format JSON que précédemment."""
                 'fichier': fichier,
                 'description': seg['description']
             })
+        return segments
 
-        # Créer nom de fichier basé sur le titre
+    def _chemin_sortie_suggestion(self, suggestion: Dict, dossier_sortie: Path) -> Path:
+        """Nom de fichier basé sur le titre de la suggestion"""
         nom_fichier = self._nettoyer_nom_fichier(suggestion['titre'])
         format_export = self.config['audio']['format_export']
-        fichier_sortie = dossier_sortie / f"{nom_fichier}.{format_export}"
-
-        # Monter
-        _, fichier_final = self.audio_processor.creer_montage(
-            fichier_source,
-            segments,
-            fichier_sortie
-        )
-
-        return fichier_final
+        return dossier_sortie / f"{nom_fichier}.{format_export}"
 
     def _monter_depuis_segments(
         self,
@@ -597,14 +650,6 @@ Garde le même format JSON que précédemment."""
         Returns:
             Chemin du fichier final
         """
-        # Préparer les segments pour creer_montage
-        # On doit extraire l'audio et créer la structure attendue
-        from pydub import AudioSegment
-
-        # Créer un fichier temporaire avec tous les audios concaténés
-        # pour pouvoir utiliser creer_montage qui attend un fichier source unique
-
-        # Alternative: reconstruire directement ici mais en générant les métadonnées
         duree_fondu = decoupage.get('parametres', {}).get(
             'duree_fondu',
             self.config['audio']['duree_fondu']
@@ -615,52 +660,58 @@ Garde le même format JSON que précédemment."""
             self.config['audio']['silence_entre_segments']
         )
 
+        courbe = self.config['audio'].get('courbe_fondu', 'lineaire')
+
         print(f"🎚️  Application des fondus ({duree_fondu}ms)...")
 
-        # Préparer métadonnées
-        metadonnees_segments = []
-        position_output = 0.0
+        # Préparer les informations de chaque segment
+        infos_segments = []
 
         for i, seg in enumerate(segments, 1):
-            seg['audio'] = seg['audio'].fade_in(duree_fondu).fade_out(duree_fondu)
-            duree = len(seg['audio']) / 1000
+            if 'taux' in seg:
+                # Vue sur un WAV projeté : copiée une seule fois, par les fondus
+                seg['audio'] = dsp.appliquer_fondus_vue(
+                    seg['audio'], seg['taux'], duree_fondu, duree_fondu, courbe
+                )
+            else:
+                seg['audio'] = dsp.appliquer_fondus(seg['audio'], duree_fondu, duree_fondu, courbe)
 
             # Collecter métadonnées (Suggestion 2: préserver description)
-            metadonnees_segments.append({
+            infos_segments.append({
                 'index': i,
                 'description': seg.get('description', f'Segment {i}'),
                 'debut_source': seg['debut'],
                 'fin_source': seg['fin'],
-                'debut_output': position_output,
-                'fin_output': position_output + duree,
-                'duree': duree,
                 'fichier_source': seg.get('fichier', 'unknown')
             })
 
-            silence_sec = silence_duree / 1000
-            position_output += duree + silence_sec
-
             print(f"  ✓ Segment {i}/{len(segments)}")
 
-        # Assembler
-        silence = AudioSegment.silent(duration=silence_duree)
-
+        # Assembler en une seule passe à partir du plan du montage
         print(f"🔧 Assemblage avec {silence_duree}ms de silence entre segments...")
-        final = segments[0]['audio']
-
-        for segment in segments[1:]:
-            final = final + silence + segment['audio']
+        audios = [seg['audio'] for seg in segments]
+        plan = assemblage.planifier_montage(
+            audios,
+            silence_duree,
+            infos_segments,
+            format_sortie=assemblage.choisir_format(
+                audios,
+                self.config['audio'].get('format_montage', 'majoritaire')
+            )
+        )
+        audios.clear()
+        for seg in segments:
+            seg['audio'] = None
 
-        # Normaliser si configuré
-        if self.config['audio']['normaliser']:
-            from pydub.effects import normalize
-            print("📊 Normalisation de l'audio...")
-            final = normalize(final)
+        metadonnees_segments = assemblage.metadonnees_segments(plan)
 
         # Exporter avec timestamp et métadonnées dans un dossier dédié
         from datetime import datetime
 
-        format_export = self.config['audio']['format_export']
+        cibles_export = flux_audio.cibles_export(self.config['audio'])
+        formats = ', '.join(cible['format'].upper() for cible in cibles_export)
+        normaliser = self.config['audio']['normaliser']
+        parametres_sonie = sonie.parametres_sonie(self.config['audio'])
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         nom_podcast = f"podcast_final_{timestamp}"
 
@@ -668,24 +719,45 @@ Garde le même format JSON que précédemment."""
         dossier_podcast = dossier_sortie / nom_podcast
         dossier_podcast.mkdir(parents=True, exist_ok=True)
 
-        fichier_sortie = dossier_podcast / f"{nom_podcast}.{format_export}"
+        chemins_export = flux_audio.chemins_export(
+            dossier_podcast / f"{nom_podcast}.{cibles_export[0]['format']}",
+            cibles_export
+        )
+        destinations = list(zip(chemins_export, cibles_export))
+        fichier_sortie = chemins_export[0]
 
-        print(f"💾 Export en {format_export.upper()}...")
-        print(f"📁 Dossier de sortie : {dossier_podcast.name}/")
+        # Normaliser si configuré
+        if normaliser and parametres_sonie:
+            print(f"📊 Normalisation en sonie ({parametres_sonie['cible_lufs']} LUFS)...")
+        elif normaliser:
+            print("📊 Normalisation de l'audio...")
 
-        params_export = {'format': format_export}
-        if format_export == 'mp3':
-            params_export['bitrate'] = self.config['audio']['debit']
-            params_export['parameters'] = ["-q:a", "2"]
+        print(f"💾 Export en {formats}...")
+        print(f"📁 Dossier de sortie : {dossier_podcast.name}/")
 
-        final.export(fichier_sortie, **params_export)
+        if self.config['audio'].get('export_flux', True):
+            # Assemblage et encodage simultanés
+            assemblage.exporter_en_flux(
+                plan,
+                destinations,
+                self.config['audio'],
+                normaliser=normaliser,
+                parametres_sonie=parametres_sonie
+            )
+        else:
+            final = assemblage.assembler(
+                plan, normaliser=normaliser, parametres_sonie=parametres_sonie
+            )
+            assemblage.exporter_audio(final, destinations, self.config['audio'])
 
-        duree_finale = len(final) / 1000
-        taille_fichier = fichier_sortie.stat().st_size / (1024 * 1024)
+        duree_finale = plan.duree
 
         print(f"✅ Montage terminé : {duree_finale:.1f}s ({duree_finale/60:.1f}min)")
-        print(f"📁 Taille : {taille_fichier:.2f} Mo")
-        print(f"📄 Fichier : {fichier_sortie.name}")
+        for chemin in chemins_export:
+            taille_fichier = chemin.stat().st_size / (1024 * 1024)
+            print(f"📄 Fichier : {chemin.name} ({taille_fichier:.2f} Mo)")
+        if plan.mesure_sonie:
+            print(f"🔊 {sonie.resume(plan.mesure_sonie)}")
 
         # Feature 4: Générer les métadonnées pour workflow manuel
         fichier_meta = fichier_sortie.with_suffix('.json')
@@ -693,7 +765,9 @@ Garde le même format JSON que précédemment."""
             fichier_meta,
             fichier_sortie.name,
             duree_finale,
-            metadonnees_segments
+            metadonnees_segments,
+            plan.mesure_sonie,
+            [{'fichier': chemin.name, **cible} for chemin, cible in destinations]
         )
 
         # Générer aussi les labels Audacity
@@ -710,7 +784,9 @@ Garde le même format JSON que précédemment."""
         chemin_fichier: Path,
         nom_podcast: str,
         duree_totale: float,
-        segments: List[dict]
+        segments: List[dict],
+        mesure_sonie: Optional[dict] = None,
+        exports: Optional[List[dict]] = None
     ):
         """Génère un fichier JSON avec les métadonnées du podcast"""
         from datetime import datetime
@@ -726,11 +802,17 @@ Garde le même format JSON que précédemment."""
                 'duree_fondu_ms': self.config['audio']['duree_fondu'],
                 'silence_entre_segments_ms': self.config['audio']['silence_entre_segments'],
                 'normalisation': self.config['audio']['normaliser'],
+                'mode_normalisation': self.config['audio'].get('mode_normalisation', 'crete'),
                 'format_export': self.config['audio']['format_export'],
                 'debit': self.config['audio'].get('debit', 'N/A')
             }
         }
 
+        if exports and len(exports) > 1:
+            metadonnees['exports'] = exports
+        if mesure_sonie:
+            metadonnees['sonie'] = mesure_sonie
+
         with open(chemin_fichier, 'w', encoding='utf-8') as f:
             json.dump(metadonnees, f, indent=2, ensure_ascii=False)
 
@@ -0,0 +1,184 @@
+"""
+Module des éléments sonores (génériques d'intro et d'outro)
+Les génériques décodés, fondus et convertis au format du montage sont
+conservés en mémoire pour le processus et sur disque d'une exécution à
+l'autre ; toute modification du fichier ou des réglages change leur clé
+"""
+
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+from pydub import AudioSegment
+
+from . import cache_rendu
+from . import dsp
+from .assemblage import harmoniser
+
+
+# Nombre de versions gardées en mémoire (sources et conversions)
+TAILLE_CACHE_MEMOIRE = 16
+
+# Taille maximale du cache disque par défaut (Mo)
+TAILLE_MAX_DISQUE_MO = 512
+
+# Versions déjà préparées dans ce processus, partagées entre montages
+_memoire = OrderedDict()
+
+
+def dossier_cache_defaut() -> Path:
+    """Dossier du cache disque des génériques (cache utilisateur)"""
+    return cache_rendu.dossier_cache_utilisateur() / 'elements_sonores'
+
+
+def _format_audio(audio: AudioSegment) -> dict:
+    return {
+        'canaux': audio.channels,
+        'taux_echantillonnage': audio.frame_rate,
+        'largeur_echantillon': audio.sample_width
+    }
+
+
+class CacheElementsSonores:
+    """Cache à deux niveaux (mémoire puis disque) des génériques préparés"""
+
+    def __init__(self, dossier: Optional[Path] = None, taille_max_mo: float = TAILLE_MAX_DISQUE_MO):
+        """
+        Initialise le cache
+
+        Args:
+            dossier: Dossier du cache disque (None = mémoire uniquement)
+            taille_max_mo: Taille maximale du cache disque
+        """
+        self.dossier = Path(dossier) if dossier else None
+        self.taille_max = int(taille_max_mo * 1024 * 1024)
+
+    @classmethod
+    def depuis_config(cls, config_elements: dict) -> 'CacheElementsSonores':
+        """Cache décrit par la section elements_sonores de la configuration"""
+        if not config_elements.get('cache_disque', True):
+            return cls(None)
+        dossier = config_elements.get('dossier_cache') or dossier_cache_defaut()
+        return cls(Path(dossier), config_elements.get('cache_taille_max_mo', TAILLE_MAX_DISQUE_MO))
+
+    def obtenir(self, cle: str, preparer: Callable[[], AudioSegment]) -> AudioSegment:
+        """
+        Version d'un élément, préparée une seule fois
+
+        Args:
+            cle: Identité de la version (source, réglages, format)
+            preparer: Fonction produisant la version si elle est absente
+
+        Returns:
+            AudioSegment prêt à l'emploi
+        """
+        audio = _memoire.get(cle)
+        if audio is not None:
+            _memoire.move_to_end(cle)
+            return audio
+
+        audio = self._lire_disque(cle)
+        if audio is None:
+            audio = preparer()
+            self._ecrire_disque(cle, audio)
+
+        _memoire[cle] = audio
+        while len(_memoire) > TAILLE_CACHE_MEMOIRE:
+            _memoire.popitem(last=False)
+        return audio
+
+    def _lire_disque(self, cle: str) -> Optional[AudioSegment]:
+        if self.dossier is None:
+            return None
+        try:
+            with open(self.dossier / f"{cle}.json", 'r', encoding='utf-8') as f:
+                format_pcm = json.load(f)
+            donnees = (self.dossier / f"{cle}.pcm").read_bytes()
+            os.utime(self.dossier / f"{cle}.pcm")
+        except (OSError, ValueError):
+            return None
+
+        return AudioSegment(
+            data=donnees,
+            sample_width=format_pcm['largeur_echantillon'],
+            frame_rate=format_pcm['taux_echantillonnage'],
+            channels=format_pcm['canaux']
+        )
+
+    def _ecrire_disque(self, cle: str, audio: AudioSegment):
+        if self.dossier is None:
+            return
+        try:
+            self.dossier.mkdir(parents=True, exist_ok=True)
+            temporaire = self.dossier / f"{cle}.{os.getpid()}.tmp"
+            temporaire.write_bytes(audio.raw_data)
+            with open(self.dossier / f"{cle}.json", 'w', encoding='utf-8') as f:
+                json.dump(_format_audio(audio), f)
+            os.replace(temporaire, self.dossier / f"{cle}.pcm")
+            self._elaguer()
+        except OSError as e:
+            # Le cache disque est une optimisation : ne jamais bloquer le montage
+            print(f"   ⚠️  Cache des éléments sonores indisponible : {e}")
+
+    def _elaguer(self):
+        """Supprime les versions les moins récemment utilisées au-delà de la taille max"""
+        fichiers = sorted(self.dossier.glob('*.pcm'), key=lambda f: f.stat().st_mtime)
+        total = sum(f.stat().st_size for f in fichiers)
+        while fichiers and total > self.taille_max:
+            fichier = fichiers.pop(0)
+            total -= fichier.stat().st_size
+            fichier.unlink(missing_ok=True)
+            fichier.with_suffix('.json').unlink(missing_ok=True)
+
+
+class ElementSonore:
+    """Générique configuré (intro ou outro), préparé à la demande via le cache"""
+
+    def __init__(
+        self,
+        chemin: Path,
+        cache: CacheElementsSonores,
+        fondu_entree: int = 0,
+        fondu_sortie: int = 0,
+        courbe: str = 'lineaire'
+    ):
+        """
+        Args:
+            chemin: Fichier audio du générique
+            cache: Cache partagé des versions préparées
+            fondu_entree: Fondu d'entrée en ms (0 = aucun)
+            fondu_sortie: Fondu de sortie en ms (0 = aucun)
+            courbe: Courbe des fondus
+        """
+        self.chemin = Path(chemin)
+        self.cache = cache
+        self.fondu_entree = fondu_entree
+        self.fondu_sortie = fondu_sortie
+        self.courbe = courbe
+        self._cle = cache_rendu.calculer_cle({
+            'source': cache_rendu.empreinte_fichier(self.chemin),
+            'chemin': str(self.chemin.resolve()),
+            'fondu_entree': fondu_entree,
+            'fondu_sortie': fondu_sortie,
+            'courbe': courbe
+        })
+
+    @property
+    def audio(self) -> AudioSegment:
+        """Générique décodé et fondu, au format de son fichier"""
+        return self.cache.obtenir(self._cle, self._preparer)
+
+    def au_format(self, format_sortie: dict) -> AudioSegment:
+        """Générique fondu et converti au format du montage"""
+        cle = cache_rendu.calculer_cle({
+            'element': self._cle,
+            'format': [format_sortie['canaux'], format_sortie['taux_echantillonnage'],
+                       format_sortie['largeur_echantillon']]
+        })
+        return self.cache.obtenir(cle, lambda: harmoniser(self.audio, format_sortie))
+
+    def _preparer(self) -> AudioSegment:
+        audio = AudioSegment.from_file(self.chemin)
+        return dsp.appliquer_fondus(audio, self.fondu_entree, self.fondu_sortie, self.courbe)
@@ -0,0 +1,1077 @@
+"""
+Module de lecture et d'écriture audio en flux
+Décode, convertit et écrit du PCM par blocs sans charger les fichiers entiers
+"""
+
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+import wave
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.exceptions import CouldntDecodeError
+from pydub.utils import mediainfo_json
+
+try:
+    import audioop
+except ImportError:
+    import pyaudioop as audioop
+
+
+# Nombre de frames traitées par bloc (~1,5 s à 44,1 kHz)
+TAILLE_BLOC_FRAMES = 65536
+
+# Taille des blocs de copie quand os.sendfile n'est pas disponible
+TAILLE_BLOC_COPIE = 1024 * 1024
+
+# Codes de format WAV
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Types NumPy des WAV projetables en mémoire (représentation pydub identique au disque)
+_TYPES_WAV_MAPPE = {2: '<i2', 4: '<i4'}
+
+# Table de conversion octet de poids fort → octet de signe (24 → 32 bits)
+_TABLE_SIGNE_24 = bytes(0xFF if b > 0x7F else 0x00 for b in range(256))
+
+
+def lire_format(chemin_fichier: Path) -> dict:
+    """
+    Lit le format PCM d'un fichier audio sans le décoder
+
+    Le format retourné est celui que pydub utiliserait en mémoire
+    (les fichiers 24 bits sont élargis en 32 bits).
+
+    Args:
+        chemin_fichier: Chemin du fichier audio
+
+    Returns:
+        Dictionnaire avec 'canaux', 'taux_echantillonnage',
+        'largeur_echantillon', 'nb_frames', 'codec' et 'wav_natif'
+    """
+    try:
+        with wave.open(str(chemin_fichier), 'rb') as wav:
+            largeur = wav.getsampwidth()
+            return {
+                'canaux': wav.getnchannels(),
+                'taux_echantillonnage': wav.getframerate(),
+                'largeur_echantillon': 4 if largeur == 3 else largeur,
+                'largeur_source': largeur,
+                'nb_frames': wav.getnframes(),
+                'codec': 'pcm_u8' if largeur == 1 else f'pcm_s{8 * largeur}le',
+                'wav_natif': True
+            }
+    except (wave.Error, EOFError):
+        pass
+
+    # Format compressé (ou WAV non PCM) : une seule sonde ffprobe
+    info = mediainfo_json(str(chemin_fichier))
+    flux = [s for s in info.get('streams', []) if s.get('codec_type') == 'audio']
+    if not flux:
+        raise CouldntDecodeError(f"Aucun flux audio dans {chemin_fichier}")
+
+    codec_pcm = _codec_pcm(flux[0])
+    largeur = 1 if codec_pcm == 'pcm_u8' else int(codec_pcm[5:-2]) // 8
+    duree = float(flux[0].get('duration') or info.get('format', {}).get('duration') or 0)
+    taux = int(flux[0]['sample_rate'])
+
+    return {
+        'canaux': int(flux[0]['channels']),
+        'taux_echantillonnage': taux,
+        'largeur_echantillon': 4 if largeur == 3 else largeur,
+        'largeur_source': largeur,
+        'nb_frames': int(duree * taux),
+        'codec': flux[0].get('codec_name'),
+        'wav_natif': False,
+        'codec_pcm': codec_pcm
+    }
+
+
+def _codec_pcm(flux: dict) -> str:
+    """Choisit le codec PCM de décodage comme le fait pydub"""
+    codec = flux.get('codec_name')
+    # Contournement pydub : certains ffprobe annoncent toujours du fltp
+    if flux.get('sample_fmt') == 'fltp' and codec in ['mp3', 'mp4', 'aac', 'webm', 'ogg']:
+        bits = 16
+    else:
+        bits = int(flux['bits_per_sample'])
+
+    return 'pcm_u8' if bits == 8 else f'pcm_s{bits}le'
+
+
+def iterer_blocs_pcm(
+    chemin_fichier: Path,
+    format_source: dict,
+    taille_bloc: int = TAILLE_BLOC_FRAMES
+) -> Iterator[bytes]:
+    """
+    Décode un fichier audio par blocs
+
+    Les blocs sont alignés sur les frames et dans la représentation
+    interne de pydub (échantillons signés, 24 bits élargis en 32 bits).
+
+    Args:
+        chemin_fichier: Chemin du fichier audio
+        format_source: Format retourné par lire_format()
+        taille_bloc: Nombre de frames par bloc
+
+    Yields:
+        Blocs de données PCM
+    """
+    largeur_source = format_source['largeur_source']
+
+    if format_source['wav_natif']:
+        with wave.open(str(chemin_fichier), 'rb') as wav:
+            while True:
+                bloc = wav.readframes(taille_bloc)
+                if not bloc:
+                    break
+                yield _vers_representation_pydub(bloc, largeur_source)
+        return
+
+    taille_octets = taille_bloc * format_source['canaux'] * largeur_source
+    commande = [
+        AudioSegment.converter,
+        '-nostdin',
+        '-i', str(chemin_fichier),
+        '-vn',
+        '-acodec', format_source['codec_pcm'],
+        '-f', format_source['codec_pcm'][4:],
+        '-'
+    ]
+
+    processus = subprocess.Popen(
+        commande,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            bloc = processus.stdout.read(taille_octets)
+            if not bloc:
+                break
+            yield _vers_representation_pydub(bloc, largeur_source)
+    finally:
+        processus.stdout.close()
+        code_retour = processus.wait()
+
+    if code_retour != 0:
+        raise CouldntDecodeError(
+            f"Décodage impossible de {chemin_fichier} (ffmpeg code {code_retour})"
+        )
+
+
+def duree_decodee(chemin_fichier: Path) -> float:
+    """
+    Durée exacte du fichier une fois décodé (secondes)
+
+    Un WAV est lu dans son en-tête ; un fichier compressé est décodé en
+    entier, car la durée annoncée par le conteneur ignore le délai et le
+    remplissage de l'encodeur (et n'est qu'une estimation en MP3 VBR).
+    """
+    format_source = lire_format(chemin_fichier)
+    if format_source['wav_natif']:
+        return format_source['nb_frames'] / format_source['taux_echantillonnage']
+
+    largeur_frame = format_source['canaux'] * format_source['largeur_echantillon']
+    nb_octets = sum(len(bloc) for bloc in iterer_blocs_pcm(chemin_fichier, format_source))
+    return nb_octets // largeur_frame / format_source['taux_echantillonnage']
+
+
+def _vers_representation_pydub(bloc: bytes, largeur: int) -> bytes:
+    """Convertit un bloc PCM brut dans la représentation interne de pydub"""
+    if largeur == 1:
+        # WAV 8 bits : non signé sur disque, signé en mémoire
+        return audioop.bias(bloc, 1, -128)
+
+    if largeur == 3:
+        # Même élargissement 24 → 32 bits que pydub (octet de signe en tête)
+        nb = len(bloc) // 3
+        sortie = bytearray(nb * 4)
+        sortie[0::4] = bloc[2::3].translate(_TABLE_SIGNE_24)
+        sortie[1::4] = bloc[0::3]
+        sortie[2::4] = bloc[1::3]
+        sortie[3::4] = bloc[2::3]
+        return bytes(sortie)
+
+    return bloc
+
+
+class ConvertisseurPCM:
+    """Convertit des blocs PCM d'un format vers un autre, en flux"""
+
+    def __init__(self, format_source: dict, format_cible: dict):
+        """
+        Initialise le convertisseur
+
+        Args:
+            format_source: Format des blocs en entrée
+            format_cible: Format des blocs en sortie
+        """
+        self.source = format_source
+        self.cible = format_cible
+        self._etat_ratecv = None
+
+    def convertir(self, bloc: bytes) -> bytes:
+        """
+        Convertit un bloc dans le même ordre que pydub :
+        canaux, puis fréquence, puis largeur d'échantillon
+        """
+        canaux = self.source['canaux']
+        largeur = self.source['largeur_echantillon']
+
+        if canaux != self.cible['canaux']:
+            # Conversion sans état : pydub peut travailler bloc par bloc
+            bloc = AudioSegment(
+                data=bloc,
+                sample_width=largeur,
+                frame_rate=self.source['taux_echantillonnage'],
+                channels=canaux
+            ).set_channels(self.cible['canaux']).raw_data
+            canaux = self.cible['canaux']
+
+        if self.source['taux_echantillonnage'] != self.cible['taux_echantillonnage']:
+            # L'état de ratecv est conservé d'un bloc à l'autre
+            bloc, self._etat_ratecv = audioop.ratecv(
+                bloc,
+                largeur,
+                canaux,
+                self.source['taux_echantillonnage'],
+                self.cible['taux_echantillonnage'],
+                self._etat_ratecv
+            )
+
+        if largeur != self.cible['largeur_echantillon']:
+            bloc = audioop.lin2lin(bloc, largeur, self.cible['largeur_echantillon'])
+
+        return bloc
+
+
+class PromotionsPCM:
+    """
+    Reproduit les conversions de pydub lors d'une concaténation (combine += audio)
+
+    À chaque ajout, pydub convertit le fichier ajouté au format maximal de
+    l'accumulateur et du fichier ; si ce maximum change, tout l'accumulateur
+    est reconverti d'un seul tenant. Chaque reconversion est ici un seul
+    ConvertisseurPCM que traversent, dans l'ordre, les blocs de tous les
+    fichiers qui la précèdent : ratecv gardant son état d'un bloc à l'autre,
+    le résultat est identique octet pour octet.
+    """
+
+    def __init__(self, formats: List[dict]):
+        """
+        Initialise les conversions
+
+        Args:
+            formats: Formats des fichiers dans l'ordre de concaténation
+        """
+        cles = ('canaux', 'taux_echantillonnage', 'largeur_echantillon')
+        self.formats_ajout = []
+        courant = None
+        for format_fichier in formats:
+            format_fichier = {k: format_fichier[k] for k in cles}
+            if courant is not None:
+                format_fichier = {k: max(courant[k], format_fichier[k]) for k in cles}
+            courant = format_fichier
+            self.formats_ajout.append(courant)
+
+        self._reconversions = [
+            (i, ConvertisseurPCM(self.formats_ajout[i - 1], self.formats_ajout[i]))
+            for i in range(1, len(self.formats_ajout))
+            if self.formats_ajout[i] != self.formats_ajout[i - 1]
+        ]
+
+    @property
+    def format_sortie(self) -> dict:
+        """Format final de la concaténation (maximum de chaque paramètre)"""
+        return self.formats_ajout[-1]
+
+    def convertisseur_ajout(self, indice: int, format_source: dict) -> ConvertisseurPCM:
+        """Conversion du fichier `indice` au format de l'accumulateur après son ajout"""
+        return ConvertisseurPCM(format_source, self.formats_ajout[indice])
+
+    def reconvertir(self, indice: int, bloc: bytes) -> bytes:
+        """Applique à un bloc du fichier `indice` les reconversions des ajouts suivants"""
+        for position, convertisseur in self._reconversions:
+            if position > indice:
+                bloc = convertisseur.convertir(bloc)
+        return bloc
+
+
+def plage_frames(nb_frames: int, taux: int, debut_ms: int, fin_ms: int) -> Tuple[int, int]:
+    """
+    Frames de début et de fin de audio[debut_ms:fin_ms], mêmes règles que pydub
+
+    Les bornes sont limitées à la durée arrondie au millième ; une
+    position négative se compte depuis la fin, sans remonter avant le
+    début du fichier.
+    """
+    duree_ms = round(1000 * (nb_frames / taux))
+    bornes = []
+    for position in (debut_ms, fin_ms):
+        position = min(position, duree_ms)
+        if position < 0:
+            position = max(0, duree_ms + position)
+        bornes.append(int(position * (taux / 1000.0)))
+
+    debut, fin = bornes
+    return debut, max(debut, fin)
+
+
+class WavMappe:
+    """
+    Fichier WAV projeté en mémoire (numpy.memmap sur le chunk de données)
+
+    L'ouverture ne lit que les en-têtes ; une plage n'est qu'une vue sur
+    le fichier, lue par le système au moment où ses frames sont touchées.
+    Se découpe comme un AudioSegment (len() en ms, wav[debut:fin]).
+    """
+
+    def __init__(self, chemin_fichier: Path, chunks: dict):
+        """
+        Args:
+            chemin_fichier: Fichier WAV
+            chunks: Résultat de lire_chunks_wav() (PCM 16 ou 32 bits)
+        """
+        self.chemin = Path(chemin_fichier)
+        self.canaux = chunks['canaux']
+        self.taux_echantillonnage = chunks['taux_echantillonnage']
+        self.largeur_echantillon = chunks['largeur_echantillon']
+        self.nb_frames = chunks['taille_donnees'] // (self.canaux * self.largeur_echantillon)
+
+        if self.nb_frames:
+            self._donnees = np.memmap(
+                self.chemin,
+                dtype=_TYPES_WAV_MAPPE[self.largeur_echantillon],
+                mode='r',
+                offset=chunks['offset_donnees'],
+                shape=(self.nb_frames, self.canaux)
+            )
+        else:
+            # mmap refuse les projections vides
+            self._donnees = np.zeros(
+                (0, self.canaux), dtype=_TYPES_WAV_MAPPE[self.largeur_echantillon]
+            )
+
+    @classmethod
+    def ouvrir(cls, chemin_fichier: Path) -> Optional['WavMappe']:
+        """Projette un WAV, ou None s'il ne peut pas l'être (compressé, 8 ou 24 bits)"""
+        chunks = lire_chunks_wav(chemin_fichier)
+        if chunks is None or chunks['largeur_echantillon'] not in _TYPES_WAV_MAPPE:
+            return None
+        return cls(chemin_fichier, chunks)
+
+    @property
+    def format(self) -> dict:
+        """Format PCM du fichier"""
+        return {
+            'canaux': self.canaux,
+            'taux_echantillonnage': self.taux_echantillonnage,
+            'largeur_echantillon': self.largeur_echantillon
+        }
+
+    def __len__(self) -> int:
+        """Durée en millisecondes, arrondie comme pydub"""
+        return round(1000 * (self.nb_frames / self.taux_echantillonnage))
+
+    def plage(self, debut_ms: int, fin_ms: int) -> Tuple[int, int]:
+        """Frames de début et de fin d'une plage, mêmes arrondis que pydub"""
+        return plage_frames(self.nb_frames, self.taux_echantillonnage, debut_ms, fin_ms)
+
+    def tableau(self, debut_ms: int, fin_ms: int) -> np.ndarray:
+        """
+        Échantillons d'une plage (frames, canaux)
+
+        Vue en lecture seule sur le fichier, sans copie ; seule une plage
+        que l'arrondi fait dépasser la fin du fichier est copiée pour être
+        complétée par du silence, comme le fait pydub.
+        """
+        debut, fin = self.plage(debut_ms, fin_ms)
+        vue = self._donnees[min(debut, self.nb_frames):min(fin, self.nb_frames)]
+        manquant = (fin - debut) - len(vue)
+        if manquant > 0:
+            vue = np.concatenate([vue, np.zeros((manquant, self.canaux), dtype=vue.dtype)])
+        return vue
+
+    def extraire(self, debut_ms: int, fin_ms: int) -> AudioSegment:
+        """Plage sous forme d'AudioSegment (une seule copie des frames)"""
+        return AudioSegment(
+            data=self.tableau(debut_ms, fin_ms).tobytes(),
+            sample_width=self.largeur_echantillon,
+            frame_rate=self.taux_echantillonnage,
+            channels=self.canaux
+        )
+
+    def __getitem__(self, plage: slice) -> AudioSegment:
+        """wav[debut_ms:fin_ms], comme pour un AudioSegment"""
+        if not isinstance(plage, slice) or plage.step is not None:
+            raise TypeError("WavMappe se découpe uniquement par plage en millisecondes")
+        debut = 0 if plage.start is None else plage.start
+        fin = len(self) if plage.stop is None else plage.stop
+        return self.extraire(debut, fin)
+
+
+def ouvrir_audio(chemin_fichier: Path):
+    """
+    Ouvre un fichier audio pour en extraire des plages
+
+    Returns:
+        WavMappe pour un WAV 16/32 bits (ouverture immédiate), sinon
+        l'AudioSegment décodé ; les deux se découpent en millisecondes
+    """
+    wav = WavMappe.ouvrir(chemin_fichier)
+    if wav is not None:
+        return wav
+    return AudioSegment.from_file(chemin_fichier)
+
+
+class LecteurSegments:
+    """Extrait des plages de fichiers audio sans charger les fichiers entiers"""
+
+    def __init__(self):
+        """Initialise le lecteur (les formats sont lus une fois par fichier)"""
+        self._formats = {}
+        self._wavs = {}
+
+    def format(self, chemin_fichier: Path) -> dict:
+        """Retourne le format d'un fichier (avec cache)"""
+        cle = str(chemin_fichier)
+        if cle not in self._formats:
+            self._formats[cle] = lire_format(chemin_fichier)
+        return self._formats[cle]
+
+    def wav_mappe(self, chemin_fichier: Path) -> Optional[WavMappe]:
+        """Projection mémoire d'un WAV source (avec cache), None si impossible"""
+        cle = str(chemin_fichier)
+        if cle not in self._wavs:
+            wav_natif = self.format(chemin_fichier)['wav_natif']
+            self._wavs[cle] = WavMappe.ouvrir(chemin_fichier) if wav_natif else None
+        return self._wavs[cle]
+
+    def tableau(self, chemin_fichier: Path, debut_ms: int, fin_ms: int) -> Optional[np.ndarray]:
+        """Vue sans copie sur une plage d'un WAV projeté, None pour les autres fichiers"""
+        wav = self.wav_mappe(chemin_fichier)
+        return wav.tableau(debut_ms, fin_ms) if wav is not None else None
+
+    def nb_frames_plage(self, chemin_fichier: Path, debut_ms: int, fin_ms: int) -> int:
+        """
+        Nombre de frames que retournera extraire(), sans rien lire
+
+        Exact pour un WAV ; estimé d'après la durée annoncée sinon.
+        """
+        format_source = self.format(chemin_fichier)
+        taux = format_source['taux_echantillonnage']
+
+        if not format_source['wav_natif']:
+            return int((fin_ms - debut_ms) * (taux / 1000.0))
+
+        debut, fin = plage_frames(format_source['nb_frames'], taux, debut_ms, fin_ms)
+        return fin - debut
+
+    def extraire(self, chemin_fichier: Path, debut_ms: int, fin_ms: int) -> AudioSegment:
+        """
+        Extrait une plage d'un fichier audio
+
+        Pour un WAV, seules les frames de la plage sont lues (projection
+        mémoire, ou positionnement direct dans le chunk de données en 8 et
+        24 bits). Pour un format compressé, ffmpeg décode uniquement la
+        plage demandée (-ss/-t).
+
+        Args:
+            chemin_fichier: Fichier source
+            debut_ms: Début de la plage en millisecondes
+            fin_ms: Fin de la plage en millisecondes
+
+        Returns:
+            AudioSegment identique à audio[debut_ms:fin_ms]
+        """
+        format_source = self.format(chemin_fichier)
+
+        wav = self.wav_mappe(chemin_fichier)
+        if wav is not None:
+            return wav.extraire(debut_ms, fin_ms)
+
+        if not format_source['wav_natif']:
+            return AudioSegment.from_file(
+                chemin_fichier,
+                start_second=debut_ms / 1000,
+                duration=(fin_ms - debut_ms) / 1000
+            )
+
+        with wave.open(str(chemin_fichier), 'rb') as wav:
+            # Mêmes arrondis que le découpage par millisecondes de pydub
+            nb_frames = wav.getnframes()
+            debut, fin = plage_frames(nb_frames, wav.getframerate(), debut_ms, fin_ms)
+
+            wav.setpos(min(debut, nb_frames))
+            donnees = wav.readframes(max(0, min(fin, nb_frames) - debut))
+
+        donnees = _vers_representation_pydub(donnees, format_source['largeur_source'])
+
+        # pydub complète par du silence quand l'arrondi dépasse la fin du fichier
+        largeur_frame = format_source['canaux'] * format_source['largeur_echantillon']
+        manquant = (fin - debut) * largeur_frame - len(donnees)
+        if manquant > 0:
+            donnees += b'\0' * manquant
+
+        return AudioSegment(
+            data=donnees,
+            sample_width=format_source['largeur_echantillon'],
+            frame_rate=format_source['taux_echantillonnage'],
+            channels=format_source['canaux']
+        )
+
+
+def decoder_vers_fichier(
+    chemin_fichier: Path,
+    format_source: dict,
+    format_cible: dict,
+    chemin_pcm: Path
+) -> int:
+    """
+    Décode un fichier vers un fichier PCM brut au format cible
+
+    Fonction de module pour pouvoir être exécutée dans un processus
+    séparé (ProcessPoolExecutor).
+
+    Args:
+        chemin_fichier: Fichier audio à décoder
+        format_source: Format retourné par lire_format()
+        format_cible: Format PCM de sortie
+        chemin_pcm: Fichier PCM brut à créer
+
+    Returns:
+        Nombre d'octets écrits
+    """
+    convertisseur = ConvertisseurPCM(format_source, format_cible)
+    taille = 0
+
+    with open(chemin_pcm, 'wb') as sortie:
+        for bloc in iterer_blocs_pcm(chemin_fichier, format_source):
+            bloc = convertisseur.convertir(bloc)
+            sortie.write(bloc)
+            taille += len(bloc)
+
+    return taille
+
+
+def decoder_vers_wav(chemin_fichier: Path, format_source: dict, chemin_wav: Path) -> Path:
+    """
+    Décode un fichier vers un WAV à son propre format, lisible par plages
+
+    Fonction de module pour pouvoir être exécutée dans un processus
+    séparé (ProcessPoolExecutor).
+
+    Returns:
+        Chemin du WAV créé
+    """
+    with EcrivainWav(chemin_wav, format_source, format_source['nb_frames']) as sortie:
+        for bloc in iterer_blocs_pcm(chemin_fichier, format_source):
+            sortie.ecrire(bloc)
+    return chemin_wav
+
+
+class EcrivainWav:
+    """Écrit un fichier WAV bloc par bloc (en-tête identique à pydub)"""
+
+    def __init__(self, chemin_sortie: Path, format_sortie: dict, nb_frames: int = 0):
+        """
+        Ouvre le fichier WAV de sortie
+
+        Args:
+            chemin_sortie: Chemin du fichier à créer
+            format_sortie: Format PCM de sortie
+            nb_frames: Nombre de frames attendu (l'en-tête est corrigé sinon)
+        """
+        self.format = format_sortie
+        self.nb_frames = 0
+        self._largeur_frame = format_sortie['canaux'] * format_sortie['largeur_echantillon']
+
+        self._wav = wave.open(str(chemin_sortie), 'wb')
+        self._wav.setnchannels(format_sortie['canaux'])
+        self._wav.setsampwidth(format_sortie['largeur_echantillon'])
+        self._wav.setframerate(format_sortie['taux_echantillonnage'])
+        self._wav.setnframes(nb_frames)
+
+    def ecrire(self, bloc: bytes):
+        """Ajoute un bloc PCM (représentation pydub) au fichier"""
+        if not bloc:
+            return
+        if self.format['largeur_echantillon'] == 1:
+            bloc = audioop.bias(bloc, 1, 128)
+        self._wav.writeframesraw(bloc)
+        self.nb_frames += len(bloc) // self._largeur_frame
+
+    def ecrire_fichier_pcm(
+        self,
+        chemin_pcm: Path,
+        format_pcm: Optional[dict] = None,
+        convertir=None
+    ):
+        """
+        Ajoute le contenu d'un fichier PCM brut (représentation pydub)
+
+        Args:
+            chemin_pcm: Fichier PCM brut
+            format_pcm: Format du fichier (par défaut celui de la sortie)
+            convertir: Conversion appliquée à chaque bloc avant écriture
+        """
+        format_pcm = format_pcm or self.format
+        taille_bloc = (
+            TAILLE_BLOC_FRAMES * format_pcm['canaux'] * format_pcm['largeur_echantillon']
+        )
+        with open(chemin_pcm, 'rb') as source:
+            while True:
+                bloc = source.read(taille_bloc)
+                if not bloc:
+                    break
+                self.ecrire(convertir(bloc) if convertir else bloc)
+
+    @property
+    def duree(self) -> float:
+        """Durée écrite en secondes"""
+        return self.nb_frames / self.format['taux_echantillonnage']
+
+    def fermer(self):
+        """Finalise l'en-tête et ferme le fichier"""
+        self._wav.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fermer()
+
+
+def lire_chunks_wav(chemin_fichier: Path) -> Optional[dict]:
+    """
+    Localise les données PCM d'un fichier WAV en lisant uniquement les en-têtes
+
+    Args:
+        chemin_fichier: Chemin du fichier
+
+    Returns:
+        Dictionnaire avec le format, 'offset_donnees' et 'taille_donnees',
+        ou None si le fichier n'est pas un WAV PCM entier
+    """
+    taille_fichier = os.path.getsize(chemin_fichier)
+
+    with open(chemin_fichier, 'rb') as f:
+        entete = f.read(12)
+        if len(entete) < 12 or entete[0:4] != b'RIFF' or entete[8:12] != b'WAVE':
+            return None
+
+        format_wav = None
+        while True:
+            entete_chunk = f.read(8)
+            if len(entete_chunk) < 8:
+                return None
+
+            identifiant, taille = struct.unpack('<4sL', entete_chunk)
+
+            if identifiant == b'fmt ':
+                donnees_fmt = f.read(taille)
+                if len(donnees_fmt) < 16:
+                    return None
+                code, canaux, taux, _, _, bits = struct.unpack('<HHLLHH', donnees_fmt[:16])
+                if code == _WAVE_FORMAT_EXTENSIBLE and len(donnees_fmt) >= 26:
+                    code = struct.unpack('<H', donnees_fmt[24:26])[0]
+                if code != _WAVE_FORMAT_PCM:
+                    return None
+                format_wav = {
+                    'canaux': canaux,
+                    'taux_echantillonnage': taux,
+                    'largeur_echantillon': bits // 8
+                }
+                f.seek(taille & 1, 1)
+
+            elif identifiant == b'data':
+                if format_wav is None:
+                    return None
+                offset = f.tell()
+                # Certains enregistreurs laissent une taille fausse (0xFFFFFFFF)
+                taille = min(taille, taille_fichier - offset)
+                largeur_frame = format_wav['canaux'] * format_wav['largeur_echantillon']
+                format_wav['offset_donnees'] = offset
+                format_wav['taille_donnees'] = taille - taille % largeur_frame
+                return format_wav
+
+            else:
+                f.seek(taille + (taille & 1), 1)
+
+
+def ecrire_entete_wav(sortie, format_sortie: dict, taille_donnees: int):
+    """Écrit un en-tête WAV PCM de 44 octets identique à celui du module wave"""
+    canaux = format_sortie['canaux']
+    taux = format_sortie['taux_echantillonnage']
+    largeur = format_sortie['largeur_echantillon']
+
+    sortie.write(b'RIFF')
+    sortie.write(struct.pack(
+        '<L4s4sLHHLLHH4s',
+        36 + taille_donnees, b'WAVE', b'fmt ', 16,
+        _WAVE_FORMAT_PCM, canaux, taux,
+        canaux * taux * largeur,
+        canaux * largeur,
+        largeur * 8, b'data'
+    ))
+    sortie.write(struct.pack('<L', taille_donnees))
+
+
+def copier_plage(source, sortie, debut: int, taille: int):
+    """
+    Copie une plage d'octets d'un fichier vers un autre sans passer par Python
+
+    Utilise os.sendfile quand le système le permet, sinon shutil.copyfileobj.
+    La sortie doit être ouverte sans tampon (buffering=0).
+    """
+    copie = 0
+
+    if hasattr(os, 'sendfile'):
+        try:
+            while copie < taille:
+                envoye = os.sendfile(
+                    sortie.fileno(), source.fileno(), debut + copie, taille - copie
+                )
+                if envoye == 0:
+                    break
+                copie += envoye
+        except OSError:
+            # sendfile fichier → fichier non supporté : on termine en Python
+            pass
+
+    if copie < taille:
+        source.seek(debut + copie)
+        restant = _LecturePlage(source, taille - copie)
+        shutil.copyfileobj(restant, sortie, TAILLE_BLOC_COPIE)
+
+
+class _LecturePlage:
+    """Limite la lecture d'un fichier à un nombre d'octets (pour copyfileobj)"""
+
+    def __init__(self, fichier, taille: int):
+        self._fichier = fichier
+        self._restant = taille
+
+    def read(self, taille: int = -1) -> bytes:
+        if self._restant <= 0:
+            return b''
+        if taille < 0 or taille > self._restant:
+            taille = self._restant
+        donnees = self._fichier.read(taille)
+        self._restant -= len(donnees)
+        return donnees
+
+
+# Format brut ffmpeg selon la largeur d'échantillon (représentation pydub, signée)
+_FORMATS_BRUTS = {1: 's8', 2: 's16le', 4: 's32le'}
+
+
+def parametres_encodage(audio_config: dict, format_export: str) -> List[str]:
+    """
+    Options ffmpeg d'encodage issues de la section audio de la config
+
+    Args:
+        audio_config: Section 'audio' de la configuration
+        format_export: Format de sortie (mp3, ogg...)
+
+    Returns:
+        Liste d'options ffmpeg
+    """
+    if format_export == 'mp3':
+        return [
+            '-b:a', audio_config['debit'],
+            '-q:a', str(audio_config.get('qualite_mp3', 2))
+        ]
+    if format_export == 'ogg':
+        # Comme pydub : sans codec imposé, certains ffmpeg muxent du FLAC en ogg
+        options = ['-acodec', 'libvorbis']
+        if 'qualite_ogg' in audio_config:
+            options += ['-q:a', str(audio_config['qualite_ogg'])]
+        return options
+    return []
+
+
+def cibles_export(audio_config: dict) -> List[dict]:
+    """
+    Cibles d'export configurées
+
+    'audio.exports' liste les cibles (format et options propres, par ex.
+    {'format': 'mp3', 'debit': '128k'}) ; à défaut, seul format_export
+    est produit.
+
+    Returns:
+        Liste de dicts ayant au moins la clé 'format'
+    """
+    exports = audio_config.get('exports')
+    if not exports:
+        return [{'format': audio_config['format_export']}]
+    return [dict(cible) if isinstance(cible, dict) else {'format': cible} for cible in exports]
+
+
+def chemins_export(chemin_base: Path, cibles: List[dict]) -> List[Path]:
+    """
+    Fichiers de sortie des cibles, à côté de chemin_base
+
+    Une cible unique garde chemin_base ; sinon chaque cible prend
+    l'extension de son format. Son 'suffixe' éventuel est ajouté au nom,
+    ainsi que son débit (ou son rang) si le format est déjà pris.
+    """
+    if len(cibles) == 1:
+        return [chemin_base]
+
+    formats = [cible['format'] for cible in cibles]
+    chemins = []
+    for i, cible in enumerate(cibles):
+        suffixe = cible.get('suffixe')
+        if suffixe is None and formats.index(cible['format']) != i:
+            suffixe = cible.get('debit') or i
+        nom = f"{chemin_base.stem}_{suffixe}" if suffixe is not None else chemin_base.stem
+        chemins.append(chemin_base.with_name(f"{nom}.{cible['format']}"))
+    return chemins
+
+
+class EncodeurFlux:
+    """Encode du PCM envoyé bloc par bloc à un processus ffmpeg (stdin)"""
+
+    def __init__(
+        self,
+        chemin_sortie: Path,
+        format_pcm: dict,
+        format_export: str,
+        parametres: Optional[List[str]] = None
+    ):
+        """
+        Démarre l'encodeur
+
+        Args:
+            chemin_sortie: Fichier à créer
+            format_pcm: Format des blocs PCM envoyés
+            format_export: Format de sortie (mp3, ogg...)
+            parametres: Options ffmpeg d'encodage
+        """
+        self.format = format_pcm
+        self.nb_frames = 0
+        self.chemin_sortie = chemin_sortie
+        self._largeur_frame = format_pcm['canaux'] * format_pcm['largeur_echantillon']
+
+        commande = [
+            AudioSegment.converter,
+            '-y',
+            '-loglevel', 'error',
+            '-f', _FORMATS_BRUTS[format_pcm['largeur_echantillon']],
+            '-ar', str(format_pcm['taux_echantillonnage']),
+            '-ac', str(format_pcm['canaux']),
+            '-i', 'pipe:0',
+            *(parametres or []),
+            '-f', format_export,
+            str(chemin_sortie)
+        ]
+
+        # stderr dans un fichier : un tube plein bloquerait ffmpeg
+        self._erreurs = tempfile.TemporaryFile()
+        self._processus = subprocess.Popen(
+            commande,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=self._erreurs
+        )
+
+    def ecrire(self, bloc: bytes):
+        """Envoie un bloc PCM à l'encodeur"""
+        if not bloc:
+            return
+        try:
+            self._processus.stdin.write(bloc)
+        except BrokenPipeError:
+            self._processus.wait()
+            raise RuntimeError(f"Échec de l'encodage ffmpeg : {self._message_erreur()}")
+        self.nb_frames += len(bloc) // self._largeur_frame
+
+    @property
+    def duree(self) -> float:
+        """Durée envoyée en secondes"""
+        return self.nb_frames / self.format['taux_echantillonnage']
+
+    def fermer(self):
+        """Termine l'encodage et vérifie le code retour de ffmpeg"""
+        try:
+            self._processus.stdin.close()
+        except BrokenPipeError:
+            pass
+        code_retour = self._processus.wait()
+        message = self._message_erreur()
+        self._erreurs.close()
+
+        if code_retour != 0:
+            raise RuntimeError(f"Échec de l'encodage ffmpeg (code {code_retour}) : {message}")
+
+    def _message_erreur(self) -> str:
+        """Lit la sortie d'erreur de ffmpeg"""
+        self._erreurs.seek(0)
+        return self._erreurs.read().decode('utf-8', errors='replace').strip()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_exc, *args):
+        if type_exc is None:
+            self.fermer()
+        else:
+            # Erreur pendant l'assemblage : arrêter ffmpeg sans masquer l'exception
+            self._processus.kill()
+            self._processus.wait()
+            self._erreurs.close()
+
+
+def ouvrir_sortie(chemin_sortie: Path, format_pcm: dict, format_export: str, audio_config: dict):
+    """
+    Ouvre la destination d'un export en flux
+
+    WAV : écriture directe ; autres formats : encodeur ffmpeg.
+    """
+    if format_export == 'wav':
+        return EcrivainWav(chemin_sortie, format_pcm)
+    return EncodeurFlux(
+        chemin_sortie,
+        format_pcm,
+        format_export,
+        parametres_encodage(audio_config, format_export)
+    )
+
+
+def ouvrir_sorties(destinations: List[Tuple[Path, dict]], format_pcm: dict, audio_config: dict):
+    """
+    Ouvre les destinations d'un export en flux
+
+    Args:
+        destinations: Couples (fichier, cible) ; les options de la cible
+                      complètent la section audio
+        format_pcm: Format des blocs PCM envoyés
+        audio_config: Section 'audio' de la configuration
+
+    Returns:
+        Sortie unique, ou SortieMultiple alimentant chaque destination
+    """
+    sorties = []
+    try:
+        for chemin, cible in destinations:
+            sorties.append(
+                ouvrir_sortie(chemin, format_pcm, cible['format'], {**audio_config, **cible})
+            )
+    except Exception:
+        for sortie in sorties:
+            sortie.__exit__(RuntimeError, None, None)
+        raise
+
+    if len(sorties) == 1:
+        return sorties[0]
+    return SortieMultiple(sorties)
+
+
+class _Alimentation(threading.Thread):
+    """Fil d'écriture vers une sortie, découplé des autres par une file"""
+
+    # Blocs en attente par sortie : borne la mémoire si un encodeur traîne
+    TAILLE_FILE = 8
+
+    def __init__(self, sortie):
+        super().__init__(daemon=True)
+        self.sortie = sortie
+        self.file = queue.Queue(maxsize=self.TAILLE_FILE)
+        self.erreur = None
+        self.start()
+
+    def run(self):
+        while True:
+            bloc = self.file.get()
+            if bloc is None:
+                return
+            if self.erreur is not None:
+                # Continuer à vider la file pour ne pas bloquer l'assemblage
+                continue
+            try:
+                self.sortie.ecrire(bloc)
+            except Exception as e:
+                self.erreur = e
+
+
+class SortieMultiple:
+    """
+    Diffuse un flux PCM vers plusieurs sorties simultanément
+
+    Chaque sortie est alimentée par son propre fil : les encodeurs ffmpeg
+    travaillent en parallèle et la durée totale reste proche de celle de
+    l'encodeur le plus lent.
+    """
+
+    def __init__(self, sorties: list):
+        """
+        Args:
+            sorties: Sorties ouvertes (EcrivainWav, EncodeurFlux)
+        """
+        self.sorties = sorties
+        self.format = sorties[0].format
+        self.nb_frames = 0
+        self._largeur_frame = self.format['canaux'] * self.format['largeur_echantillon']
+        self._alimentations = [_Alimentation(sortie) for sortie in sorties]
+
+    def ecrire(self, bloc: bytes):
+        """Envoie un bloc PCM à toutes les sorties"""
+        if not bloc:
+            return
+        # Copie figée : le bloc est lu par plusieurs fils après notre retour
+        bloc = bytes(bloc)
+        for alimentation in self._alimentations:
+            if alimentation.erreur is not None:
+                raise alimentation.erreur
+            alimentation.file.put(bloc)
+        self.nb_frames += len(bloc) // self._largeur_frame
+
+    @property
+    def duree(self) -> float:
+        """Durée envoyée en secondes"""
+        return self.nb_frames / self.format['taux_echantillonnage']
+
+    def _terminer_alimentations(self):
+        """Vide les files et attend la fin des fils"""
+        for alimentation in self._alimentations:
+            alimentation.file.put(None)
+        for alimentation in self._alimentations:
+            alimentation.join()
+
+    def fermer(self):
+        """Termine toutes les sorties ; la première erreur rencontrée est levée"""
+        self._terminer_alimentations()
+
+        erreurs = [a.erreur for a in self._alimentations if a.erreur is not None]
+        for sortie in self.sorties:
+            try:
+                if erreurs:
+                    sortie.__exit__(RuntimeError, None, None)
+                else:
+                    sortie.fermer()
+            except Exception as e:
+                erreurs.append(e)
+
+        if erreurs:
+            raise erreurs[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_exc, *args):
+        if type_exc is None:
+            self.fermer()
+        else:
+            self._terminer_alimentations()
+            for sortie in self.sorties:
+                sortie.__exit__(type_exc, None, None)
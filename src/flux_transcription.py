@@ -0,0 +1,227 @@
+"""
+Module de lecture par blocs pour la transcription
+Décode l'audio en flux (mono 16 kHz, comme whisperx.load_audio) et le
+découpe en fenêtres chevauchantes coupées dans les silences : la mémoire
+reste bornée quelle que soit la durée du fichier
+"""
+
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Iterator, List
+
+import numpy as np
+from pydub import AudioSegment
+
+
+# Fréquence attendue par Whisper (whisperx.audio.SAMPLE_RATE)
+TAUX_WHISPER = 16000
+
+# Taille des trames d'énergie pour chercher les silences (secondes)
+DUREE_TRAME = 0.03
+
+# Octets lus par appel sur la sortie de ffmpeg (s16le)
+TAILLE_LECTURE = 1024 * 1024
+
+# Dernières lignes de ffmpeg reprises dans le message d'un échec de décodage
+LIGNES_ERREUR = 5
+
+
+def iterer_audio_16k(chemin_fichier: Path) -> Iterator[np.ndarray]:
+    """
+    Décode un fichier en blocs float32 mono 16 kHz
+
+    Même commande et même mise à l'échelle que whisperx.load_audio,
+    sans jamais garder le fichier entier en mémoire. Un échec de
+    décodage reprend le message de ffmpeg, comme load_audio.
+
+    Yields:
+        Blocs d'échantillons float32 dans [-1, 1]
+    """
+    commande = [
+        AudioSegment.converter,
+        '-nostdin',
+        '-hide_banner',
+        '-threads', '0',
+        '-i', str(chemin_fichier),
+        '-f', 's16le',
+        '-ac', '1',
+        '-acodec', 'pcm_s16le',
+        '-ar', str(TAUX_WHISPER),
+        '-'
+    ]
+
+    # stderr dans un fichier : un tube plein bloquerait ffmpeg
+    erreurs = tempfile.TemporaryFile()
+    processus = subprocess.Popen(commande, stdout=subprocess.PIPE, stderr=erreurs)
+    reste = b''
+    try:
+        while True:
+            donnees = processus.stdout.read(TAILLE_LECTURE)
+            if not donnees:
+                break
+            donnees = reste + donnees
+            utile = len(donnees) - len(donnees) % 2
+            reste = donnees[utile:]
+            yield np.frombuffer(donnees[:utile], np.int16).astype(np.float32) / 32768.0
+    finally:
+        processus.stdout.close()
+        code_retour = processus.wait()
+        erreurs.seek(0)
+        message = erreurs.read().decode('utf-8', errors='replace').strip()
+        erreurs.close()
+
+    if code_retour != 0:
+        # La cause est à la fin, après la description des flux
+        message = '\n'.join(message.splitlines()[-LIGNES_ERREUR:])
+        raise RuntimeError(
+            f"Décodage impossible de {chemin_fichier} (ffmpeg code {code_retour}) : {message}"
+        )
+
+
+def energie_trames(audio: np.ndarray, taille_trame: int) -> np.ndarray:
+    """Énergie moyenne de chaque trame complète (vectorisé)"""
+    nb_trames = len(audio) // taille_trame
+    trames = audio[:nb_trames * taille_trame].reshape(nb_trames, taille_trame)
+    return np.einsum('ij,ij->i', trames, trames) / taille_trame
+
+
+def chercher_coupure(audio: np.ndarray, debut: int, fin: int) -> int:
+    """
+    Point de coupe le plus silencieux d'une zone
+
+    Args:
+        audio: Échantillons 16 kHz
+        debut, fin: Zone de recherche (indices d'échantillons)
+
+    Returns:
+        Indice du milieu de la trame de plus faible énergie
+    """
+    taille_trame = int(DUREE_TRAME * TAUX_WHISPER)
+    zone = audio[debut:fin]
+    if len(zone) < taille_trame:
+        return fin
+
+    trame = int(np.argmin(energie_trames(zone, taille_trame)))
+    return debut + trame * taille_trame + taille_trame // 2
+
+
+def fenetres(
+    chemin_fichier: Path,
+    duree_bloc: float = 600,
+    recherche_silence: float = 30,
+    chevauchement: float = 2
+) -> Iterator[dict]:
+    """
+    Découpe un fichier en fenêtres de transcription
+
+    Chaque fenêtre « possède » la plage [debut, fin[ : la coupe est placée
+    dans le silence le plus net des `recherche_silence` dernières secondes
+    du bloc, et la fenêtre déborde de `chevauchement` secondes de chaque
+    côté pour que Whisper garde le contexte autour de la coupe.
+
+    Args:
+        chemin_fichier: Fichier audio
+        duree_bloc: Durée visée d'une fenêtre (secondes)
+        recherche_silence: Zone de recherche de la coupe (secondes)
+        chevauchement: Débordement de chaque côté (secondes)
+
+    Yields:
+        {'index', 'audio' (float32 16 kHz), 'decalage' (position de
+        audio[0] en secondes), 'debut', 'fin' (plage possédée, secondes),
+        'derniere'}
+    """
+    taille_bloc = int(duree_bloc * TAUX_WHISPER)
+    taille_recherche = min(int(recherche_silence * TAUX_WHISPER), taille_bloc // 2)
+    marge = int(chevauchement * TAUX_WHISPER)
+
+    tampon = np.zeros(0, np.float32)
+    origine = 0        # Position de tampon[0] dans le fichier
+    debut = 0          # Début de la plage possédée par la prochaine fenêtre
+    index = 0
+    blocs = iterer_audio_16k(chemin_fichier)
+    termine = False
+
+    while True:
+        # Remplir jusqu'à un bloc complet plus la marge de droite
+        morceaux = [tampon]
+        disponible = len(tampon)
+        while not termine and origine + disponible < debut + taille_bloc + marge:
+            bloc = next(blocs, None)
+            if bloc is None:
+                termine = True
+            else:
+                morceaux.append(bloc)
+                disponible += len(bloc)
+        tampon = np.concatenate(morceaux) if len(morceaux) > 1 else tampon
+        fin_fichier = origine + len(tampon)
+
+        if fin_fichier <= debut:
+            break
+
+        if termine and fin_fichier <= debut + taille_bloc + taille_recherche:
+            # Dernière fenêtre : tout le reste (au plus un bloc et demi de recherche)
+            coupe = fin_fichier
+        else:
+            coupe = origine + chercher_coupure(
+                tampon,
+                debut + taille_bloc - taille_recherche - origine,
+                debut + taille_bloc - origine
+            )
+
+        gauche = max(debut - marge, origine)
+        droite = min(coupe + marge, fin_fichier)
+        yield {
+            'index': index,
+            'audio': tampon[gauche - origine:droite - origine],
+            'decalage': gauche / TAUX_WHISPER,
+            'debut': debut / TAUX_WHISPER,
+            'fin': coupe / TAUX_WHISPER,
+            'derniere': coupe >= fin_fichier
+        }
+
+        if coupe >= fin_fichier:
+            break
+
+        # Ne garder que la marge de gauche de la fenêtre suivante
+        conserve = max(coupe - marge, origine)
+        tampon = tampon[conserve - origine:].copy()
+        origine = conserve
+        debut = coupe
+        index += 1
+
+
+def decaler_segments(segments: List[dict], decalage: float) -> List[dict]:
+    """Replace des segments WhisperX (et leurs mots) sur la ligne de temps du fichier"""
+    resultat = []
+    for seg in segments:
+        seg = dict(seg)
+        for cle in ('start', 'end'):
+            if seg.get(cle) is not None:
+                seg[cle] += decalage
+        if 'words' in seg:
+            seg['words'] = decaler_mots(seg['words'], decalage)
+        resultat.append(seg)
+    return resultat
+
+
+def decaler_mots(mots: List[dict], decalage: float) -> List[dict]:
+    """Décale les horodatages de mots (certains mots n'en ont pas)"""
+    resultat = []
+    for mot in mots:
+        mot = dict(mot)
+        for cle in ('start', 'end'):
+            if mot.get(cle) is not None:
+                mot[cle] += decalage
+        resultat.append(mot)
+    return resultat
+
+
+def garder_plage(segments: List[dict], debut: float, fin: float) -> List[dict]:
+    """
+    Segments dont le milieu tombe dans la plage possédée [debut, fin[
+
+    Un segment transcrit dans le chevauchement de deux fenêtres n'est
+    ainsi gardé qu'une seule fois.
+    """
+    return [seg for seg in segments if debut <= (seg['start'] + seg['end']) / 2 < fin]
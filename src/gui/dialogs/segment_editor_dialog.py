@@ -22,11 +22,12 @@ from src.gui.widgets import (
 from PyQt6.QtCore import Qt, QTime, QUrl, QTimer
 from PyQt6.QtGui import QColor
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-from pydub import AudioSegment
 from pathlib import Path
 import tempfile
 import os
 
+from src import flux_audio
+
 
 class SegmentEditorDialog(QDialog):
     """Éditeur de segments avec ajout/suppression/modification"""
@@ -438,7 +439,8 @@ class SegmentEditorDialog(QDialog):
             # Extraire le segment avec pydub
             self.status_bar.showMessage(f"📀 Extraction du segment {row + 1}...", 2000)
 
-            audio = AudioSegment.from_file(str(fichier_path))
+            # WAV projeté en mémoire : seule la plage du segment est lue
+            audio = flux_audio.ouvrir_audio(fichier_path)
             debut_ms = int(segment['debut'] * 1000)
             fin_ms = int(segment['fin'] * 1000)
             segment_audio = audio[debut_ms:fin_ms]
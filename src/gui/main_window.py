@@ -26,6 +26,8 @@ import json
 import os
 import sys
 
+from src.index_audio import lister_dossier
+
 
 class MainWindow(QMainWindow):
     """Fenêtre principale de Podcasteur GUI"""
@@ -40,6 +42,7 @@ class MainWindow(QMainWindow):
         self.transcription_worker = None
         self.ai_worker = None
         self.montage_worker = None
+        self.index_workers = []
 
         self.fichier_mix = None
         self.transcription = None
@@ -957,25 +960,47 @@ class MainWindow(QMainWindow):
             self, "Sélectionner des fichiers audio", "",
             "Fichiers audio (*.wav *.mp3 *.ogg *.flac *.m4a)"
         )
-        for file in files:
-            if file not in self.fichiers_audio:
-                self.fichiers_audio.append(file)
-                self.files_list.addItem(Path(file).name)
-        self._update_status()
+        self._ajouter_fichiers_audio(files)
 
     def _add_folder(self):
         """Ajoute tous les fichiers audio d'un dossier"""
         folder = QFileDialog.getExistingDirectory(self, "Sélectionner un dossier")
         if folder:
-            extensions = ['.wav', '.mp3', '.ogg', '.flac', '.m4a']
-            for ext in extensions:
-                for file in Path(folder).glob(f'*{ext}'):
-                    file_str = str(file)
-                    if file_str not in self.fichiers_audio:
-                        self.fichiers_audio.append(file_str)
-                        self.files_list.addItem(file.name)
+            self._ajouter_fichiers_audio([str(f) for f in lister_dossier(Path(folder))])
+        else:
+            self._update_status()
+
+    def _ajouter_fichiers_audio(self, files):
+        """Ajoute des fichiers à la liste (durées lues dans l'index audio en arrière-plan)"""
+        from src.gui.workers.index_worker import IndexWorker
+
+        nouveaux = [f for f in dict.fromkeys(files) if f not in self.fichiers_audio]
+        for file in nouveaux:
+            self.fichiers_audio.append(file)
+            self.files_list.addItem(Path(file).name)
         self._update_status()
 
+        if not nouveaux:
+            return
+
+        # Le sondage (ffprobe) des fichiers compressés ne doit pas bloquer la fenêtre
+        worker = IndexWorker(nouveaux)
+        worker.finished.connect(self._on_durees_lues)
+        worker.error.connect(self._log)
+        worker.finished.connect(lambda _: self.index_workers.remove(worker))
+        worker.error.connect(lambda _: self.index_workers.remove(worker))
+        self.index_workers.append(worker)
+        worker.start()
+
+    def _on_durees_lues(self, resultats):
+        """Affiche la durée des fichiers sondés (encore présents dans la liste)"""
+        for file, infos in resultats:
+            if 'duree' not in infos or file not in self.fichiers_audio:
+                continue
+            minutes, secondes = divmod(int(round(infos['duree'])), 60)
+            item = self.files_list.item(self.fichiers_audio.index(file))
+            item.setText(f"{Path(file).name} ({minutes}:{secondes:02d})")
+
     def _clear_files(self):
         """Efface tous les fichiers"""
         self.fichiers_audio.clear()
@@ -0,0 +1,27 @@
+"""
+Worker pour la lecture des durées dans l'index audio dans un thread séparé
+"""
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from src.index_audio import index_par_defaut
+
+
+class IndexWorker(QThread):
+    """Worker qui sonde les fichiers ajoutés (ffprobe pour les formats compressés)"""
+
+    # Signaux
+    finished = pyqtSignal(list)  # [(fichier, infos)] dans l'ordre des fichiers
+    error = pyqtSignal(str)  # message d'erreur
+
+    def __init__(self, fichiers):
+        super().__init__()
+        self.fichiers = list(fichiers)
+
+    def run(self):
+        """Lit les infos de chaque fichier (index SQLite, sonde si absent ou modifié)"""
+        try:
+            infos = index_par_defaut().infos_fichiers(self.fichiers)
+            self.finished.emit(list(zip(self.fichiers, infos)))
+        except Exception as e:
+            self.error.emit(f"Erreur lors de la lecture des durées : {str(e)}")
@@ -32,11 +32,19 @@ class TranscriptionWorker(QThread):
                 Path(self.fichier_audio),
                 chemin_sortie=None,
                 detecter_speakers=self.detecter_speakers,
-                token_hf=self.token_hf
+                token_hf=self.token_hf,
+                progression=self._on_bloc
             )
 
             self.progress.emit(100, "✅ Transcription terminée")
             self.finished.emit(transcription)
 
         except Exception as e:
-            self.error.emit(f"Erreur lors de la transcription : {str(e)}")
\ No newline at end of file
+            self.error.emit(f"Erreur lors de la transcription : {str(e)}")
+
+    def _on_bloc(self, fraction, segments):
+        """Progression de la transcription par blocs"""
+        self.progress.emit(
+            int(fraction * 100),
+            f"🎤 Transcription : {int(fraction * 100)}% (+{len(segments)} segments)"
+        )
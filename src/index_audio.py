@@ -0,0 +1,239 @@
+"""
+Module d'index des fichiers audio
+Durée, format, taille, dates et empreinte de chaque fichier déjà vu,
+conservés dans une base SQLite du cache utilisateur : un fichier inchangé
+n'est ni décodé ni sondé une seconde fois, d'une exécution à l'autre
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from . import cache_rendu
+from . import sonde_audio
+
+
+NOM_BASE = 'index_audio.sqlite'
+
+# Extensions reconnues comme fichiers audio
+EXTENSIONS_AUDIO = ('.wav', '.mp3', '.ogg', '.flac', '.m4a', '.aac', '.wma', '.opus')
+
+# Taille lue par itération pour l'empreinte de contenu
+TAILLE_BLOC_HACHAGE = 1024 * 1024
+
+# Nombre de chemins par requête (limite des paramètres SQLite)
+TAILLE_LOT_REQUETE = 500
+
+_COLONNES = (
+    'chemin', 'taille', 'mtime_ns', 'ctime', 'duree', 'nb_frames',
+    'taux_echantillonnage', 'canaux', 'largeur_echantillon', 'codec',
+    'sha256', 'vu_le'
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fichiers (
+    chemin TEXT PRIMARY KEY,
+    taille INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime REAL NOT NULL,
+    duree REAL NOT NULL,
+    nb_frames INTEGER NOT NULL,
+    taux_echantillonnage INTEGER NOT NULL,
+    canaux INTEGER NOT NULL,
+    largeur_echantillon INTEGER NOT NULL,
+    codec TEXT,
+    sha256 TEXT,
+    vu_le REAL NOT NULL
+)
+"""
+
+_index_defaut = None
+
+
+def index_par_defaut() -> 'IndexAudio':
+    """Index partagé du processus, dans le dossier de cache utilisateur"""
+    global _index_defaut
+    if _index_defaut is None:
+        _index_defaut = IndexAudio(cache_rendu.dossier_cache_utilisateur() / NOM_BASE)
+    return _index_defaut
+
+
+def lister_dossier(dossier: Path, extensions: Iterable[str] = EXTENSIONS_AUDIO) -> List[Path]:
+    """Fichiers audio d'un dossier (non récursif), triés par nom"""
+    extensions = {e.lower() for e in extensions}
+    with os.scandir(dossier) as entrees:
+        fichiers = [
+            Path(entree.path) for entree in entrees
+            if entree.is_file() and os.path.splitext(entree.name)[1].lower() in extensions
+        ]
+    return sorted(fichiers)
+
+
+def _hacher(chemin_fichier: Path) -> str:
+    hachage = hashlib.sha256()
+    with open(chemin_fichier, 'rb') as f:
+        for bloc in iter(lambda: f.read(TAILLE_BLOC_HACHAGE), b''):
+            hachage.update(bloc)
+    return hachage.hexdigest()
+
+
+class IndexAudio:
+    """Index persistant des fichiers audio, invalidé par taille et date de modification"""
+
+    def __init__(self, chemin_base: Optional[Path] = None):
+        """
+        Ouvre (ou crée) l'index
+
+        Args:
+            chemin_base: Fichier SQLite (None = index en mémoire, non conservé)
+        """
+        self.chemin_base = Path(chemin_base) if chemin_base else None
+        self._verrou = threading.Lock()
+        self._connexion = self._ouvrir()
+
+    def _ouvrir(self) -> sqlite3.Connection:
+        if self.chemin_base is not None:
+            try:
+                self.chemin_base.parent.mkdir(parents=True, exist_ok=True)
+                connexion = sqlite3.connect(
+                    str(self.chemin_base), timeout=10, check_same_thread=False
+                )
+                connexion.execute('PRAGMA journal_mode=WAL')
+                connexion.execute(_SCHEMA)
+                connexion.commit()
+                return connexion
+            except (OSError, sqlite3.Error) as e:
+                # L'index est une optimisation : ne jamais bloquer le traitement
+                print(f"⚠️  Index audio indisponible ({e}), index en mémoire")
+                self.chemin_base = None
+
+        connexion = sqlite3.connect(':memory:', check_same_thread=False)
+        connexion.execute(_SCHEMA)
+        return connexion
+
+    def infos(self, chemin_fichier: Path, hachage: bool = False) -> dict:
+        """
+        Informations d'un fichier, sondé seulement s'il a changé
+
+        Args:
+            chemin_fichier: Fichier audio
+            hachage: Calculer aussi l'empreinte SHA-256 si elle manque
+
+        Returns:
+            Dictionnaire avec chemin, taille, mtime_ns, ctime, duree,
+            nb_frames, taux_echantillonnage, canaux, largeur_echantillon,
+            codec, sha256 (None si non calculée) et vu_le
+
+        Raises:
+            OSError, CouldntDecodeError: Fichier absent ou illisible
+        """
+        resultat = self.infos_fichiers([chemin_fichier], hachage)[0]
+        if 'erreur' in resultat:
+            raise resultat['erreur']
+        return resultat
+
+    def infos_fichiers(self, chemins: Iterable[Path], hachage: bool = False) -> List[dict]:
+        """
+        Informations de plusieurs fichiers en une requête et une transaction
+
+        Un fichier illisible ne bloque pas les autres : son dictionnaire
+        contient alors seulement 'chemin' et 'erreur' (l'exception).
+
+        Returns:
+            Une entrée par chemin, dans le même ordre
+        """
+        chemins = [str(Path(c).resolve()) for c in chemins]
+        connus = self._lire(chemins)
+
+        resultats = []
+        a_enregistrer = []
+        maintenant = time.time()
+
+        for chemin in chemins:
+            try:
+                stat = os.stat(chemin)
+                ligne = connus.get(chemin)
+                modifiee = ligne is None or (
+                    (ligne['taille'], ligne['mtime_ns']) != (stat.st_size, stat.st_mtime_ns)
+                )
+                if modifiee:
+                    infos = sonde_audio.sonder(Path(chemin))
+                    ligne = {
+                        'chemin': chemin,
+                        'taille': stat.st_size,
+                        'mtime_ns': stat.st_mtime_ns,
+                        'ctime': stat.st_ctime,
+                        'duree': infos['duree'],
+                        'nb_frames': infos['nb_frames'],
+                        'taux_echantillonnage': infos['taux_echantillonnage'],
+                        'canaux': infos['canaux'],
+                        'largeur_echantillon': infos['largeur_echantillon'],
+                        'codec': infos.get('codec'),
+                        'sha256': None
+                    }
+
+                if hachage and ligne['sha256'] is None:
+                    ligne['sha256'] = _hacher(Path(chemin))
+                    modifiee = True
+
+                ligne['vu_le'] = maintenant
+                if modifiee:
+                    a_enregistrer.append(ligne)
+                resultats.append(ligne)
+            except Exception as e:
+                resultats.append({'chemin': chemin, 'erreur': e})
+
+        if a_enregistrer:
+            self._ecrire(a_enregistrer)
+        return resultats
+
+    def _lire(self, chemins: List[str]) -> dict:
+        connus = {}
+        with self._verrou:
+            for debut in range(0, len(chemins), TAILLE_LOT_REQUETE):
+                lot = chemins[debut:debut + TAILLE_LOT_REQUETE]
+                requete = (
+                    f"SELECT {', '.join(_COLONNES)} FROM fichiers "
+                    f"WHERE chemin IN ({', '.join('?' * len(lot))})"
+                )
+                for valeurs in self._connexion.execute(requete, lot):
+                    connus[valeurs[0]] = dict(zip(_COLONNES, valeurs))
+        return connus
+
+    def _ecrire(self, lignes: List[dict]):
+        requete = (
+            f"INSERT OR REPLACE INTO fichiers ({', '.join(_COLONNES)}) "
+            f"VALUES ({', '.join('?' * len(_COLONNES))})"
+        )
+        try:
+            with self._verrou, self._connexion:
+                self._connexion.executemany(
+                    requete, [[ligne[c] for c in _COLONNES] for ligne in lignes]
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️  Index audio non mis à jour : {e}")
+
+    def infos_dossier(self, dossier: Path, hachage: bool = False) -> List[dict]:
+        """Informations de tous les fichiers audio d'un dossier, triés par nom"""
+        return self.infos_fichiers(lister_dossier(dossier), hachage)
+
+    def nombre(self) -> int:
+        """Nombre de fichiers indexés"""
+        with self._verrou:
+            return self._connexion.execute('SELECT COUNT(*) FROM fichiers').fetchone()[0]
+
+    def purger(self) -> int:
+        """Retire de l'index les fichiers qui n'existent plus ; retourne leur nombre"""
+        with self._verrou:
+            chemins = [c for (c,) in self._connexion.execute('SELECT chemin FROM fichiers')]
+        disparus = [c for c in chemins if not os.path.exists(c)]
+        if disparus:
+            with self._verrou, self._connexion:
+                self._connexion.executemany(
+                    'DELETE FROM fichiers WHERE chemin = ?', [(c,) for c in disparus]
+                )
+        return len(disparus)
@@ -0,0 +1,232 @@
+"""
+Module de registre des modèles
+Garde les modèles chargés (WhisperX, alignement, diarisation) pour tout
+le processus : une deuxième transcription dans la même session ne les
+recharge pas. Les modèles inutilisés sont libérés après un délai
+d'inactivité, les moins récemment utilisés quand le budget RAM est dépassé ;
+un modèle réservé par une transcription en cours n'est jamais libéré
+"""
+
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+# Délai d'inactivité par défaut avant libération (secondes)
+DELAI_INACTIVITE = 600
+
+# Budget mémoire par défaut des modèles gardés (Mo)
+BUDGET_RAM_MO = 6144
+
+# Intervalle maximal entre deux vérifications d'inactivité (secondes)
+INTERVALLE_SURVEILLANCE = 30
+
+_registre_defaut = None
+
+
+def memoire_processus() -> Optional[int]:
+    """Mémoire résidente du processus en octets, None si inconnue"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def registre_par_defaut(config_transcription: Optional[dict] = None) -> 'RegistreModeles':
+    """
+    Registre partagé du processus
+
+    Args:
+        config_transcription: Section transcription ; ses réglages
+                              (modeles_en_memoire, delai_inactivite_modeles,
+                              budget_ram_modeles_mo) sont appliqués au registre
+    """
+    global _registre_defaut
+    if _registre_defaut is None:
+        _registre_defaut = RegistreModeles()
+    if config_transcription is not None:
+        _registre_defaut.configurer(
+            config_transcription.get('modeles_en_memoire', True),
+            config_transcription.get('delai_inactivite_modeles', DELAI_INACTIVITE),
+            config_transcription.get('budget_ram_modeles_mo', BUDGET_RAM_MO)
+        )
+    return _registre_defaut
+
+
+class RegistreModeles:
+    """Modèles chargés, indexés par (nature, modèle, device, compute_type)"""
+
+    def __init__(
+        self,
+        actif: bool = True,
+        delai_inactivite: float = DELAI_INACTIVITE,
+        budget_ram_mo: float = BUDGET_RAM_MO
+    ):
+        """
+        Args:
+            actif: False = aucun modèle gardé (chargé à chaque demande)
+            delai_inactivite: Libérer un modèle inutilisé depuis ce délai (0 = jamais)
+            budget_ram_mo: Taille cumulée maximale des modèles gardés
+        """
+        self._modeles = OrderedDict()
+        self._verrou = threading.RLock()
+        self._surveillance = None
+        self.configurer(actif, delai_inactivite, budget_ram_mo)
+
+    def configurer(self, actif: bool, delai_inactivite: float, budget_ram_mo: float):
+        """Applique de nouveaux réglages (libère ce qui ne les respecte plus)"""
+        with self._verrou:
+            self.actif = actif
+            self.delai_inactivite = delai_inactivite
+            self.budget_ram = int(budget_ram_mo * 1024 * 1024)
+            if not actif:
+                self.vider()
+            else:
+                self._respecter_budget()
+
+    def obtenir(
+        self,
+        cle: tuple,
+        charger: Callable[[], Any],
+        liberer: Optional[Callable[[], None]] = None,
+        reserver: bool = False
+    ) -> Any:
+        """
+        Modèle de la clé, chargé seulement s'il n'est pas déjà en mémoire
+
+        Args:
+            cle: Identité du modèle, par ex. ('whisperx', 'base', 'cpu', 'int8')
+            charger: Fonction qui charge le modèle
+            liberer: Fonction appelée après éviction (par ex. vider le cache CUDA)
+            reserver: Le modèle ne peut pas être libéré avant l'appel à rendre()
+
+        Returns:
+            Le modèle
+        """
+        with self._verrou:
+            entree = self._modeles.get(cle)
+            if entree is not None:
+                self._modeles.move_to_end(cle)
+                entree['dernier_acces'] = time.monotonic()
+                entree['utilisateurs'] += reserver
+                return entree['modele']
+
+            memoire_avant = memoire_processus()
+            modele = charger()
+            if not self.actif:
+                return modele
+
+            memoire_apres = memoire_processus()
+            taille = 0
+            if memoire_avant is not None and memoire_apres is not None:
+                taille = max(0, memoire_apres - memoire_avant)
+
+            self._modeles[cle] = {
+                'modele': modele,
+                'taille': taille,
+                'liberer': liberer,
+                'dernier_acces': time.monotonic(),
+                'utilisateurs': int(reserver)
+            }
+            self._respecter_budget(garder=cle)
+            self._demarrer_surveillance()
+            return modele
+
+    def rendre(self, cle: tuple):
+        """Fin d'utilisation d'un modèle réservé : l'inactivité compte à partir de maintenant"""
+        with self._verrou:
+            entree = self._modeles.get(cle)
+            if entree is not None and entree['utilisateurs']:
+                entree['utilisateurs'] -= 1
+                entree['dernier_acces'] = time.monotonic()
+
+    def contient(self, cle: tuple) -> bool:
+        """Indique si un modèle est déjà chargé"""
+        with self._verrou:
+            return cle in self._modeles
+
+    def entrees(self) -> list:
+        """Modèles chargés, du moins au plus récemment utilisé"""
+        maintenant = time.monotonic()
+        with self._verrou:
+            return [
+                {
+                    'cle': cle,
+                    'taille': e['taille'],
+                    'utilisateurs': e['utilisateurs'],
+                    'inactif_depuis': 0.0 if e['utilisateurs'] else maintenant - e['dernier_acces']
+                }
+                for cle, e in self._modeles.items()
+            ]
+
+    def liberer(self, cle: tuple) -> bool:
+        """Libère un modèle ; retourne False s'il n'était pas chargé"""
+        with self._verrou:
+            entree = self._modeles.pop(cle, None)
+        if entree is None:
+            return False
+
+        liberer = entree['liberer']
+        del entree
+        gc.collect()
+        if liberer is not None:
+            liberer()
+        print(f"   🧹 Modèle libéré : {' / '.join(str(c) for c in cle)}")
+        return True
+
+    def liberer_inactifs(self) -> int:
+        """Libère les modèles inutilisés depuis le délai d'inactivité ; retourne leur nombre"""
+        if not self.delai_inactivite:
+            return 0
+        limite = time.monotonic() - self.delai_inactivite
+        nombre = 0
+        with self._verrou:
+            # Vérifié et libéré sous le verrou : une réservation ne peut pas s'intercaler
+            for cle, e in list(self._modeles.items()):
+                if not e['utilisateurs'] and e['dernier_acces'] < limite:
+                    nombre += self.liberer(cle)
+        return nombre
+
+    def vider(self) -> int:
+        """Libère tous les modèles ; retourne leur nombre"""
+        with self._verrou:
+            cles = list(self._modeles)
+        return sum(self.liberer(cle) for cle in cles)
+
+    def _respecter_budget(self, garder: Optional[tuple] = None):
+        """Libère les modèles les moins récemment utilisés au-delà du budget"""
+        with self._verrou:
+            total = sum(e['taille'] for e in self._modeles.values())
+            for cle in list(self._modeles):
+                if total <= self.budget_ram:
+                    break
+                if cle == garder or self._modeles[cle]['utilisateurs']:
+                    continue
+                total -= self._modeles[cle]['taille']
+                self.liberer(cle)
+
+    def _demarrer_surveillance(self):
+        """Lance (une fois) le fil qui libère les modèles inactifs"""
+        if self._surveillance is not None or not self.delai_inactivite:
+            return
+        self._surveillance = threading.Thread(
+            target=self._surveiller, name='registre-modeles', daemon=True
+        )
+        self._surveillance.start()
+
+    def _surveiller(self):
+        while True:
+            intervalle = INTERVALLE_SURVEILLANCE
+            if self.delai_inactivite:
+                intervalle = min(self.delai_inactivite / 4, INTERVALLE_SURVEILLANCE)
+            time.sleep(intervalle)
+            self.liberer_inactifs()
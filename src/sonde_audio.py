@@ -0,0 +1,132 @@
+"""
+Module de sonde des fichiers audio
+Durée et format lus dans les en-têtes (WAV, FLAC) ou par un seul appel
+à ffprobe, sans décoder le fichier ; résultats mémorisés par fichier
+"""
+
+import struct
+from pathlib import Path
+from typing import Optional
+
+from . import flux_audio
+
+
+# Type du bloc de métadonnées STREAMINFO d'un FLAC
+_FLAC_STREAMINFO = 0
+
+# Sondes déjà faites : (chemin, taille, mtime) → informations
+_sondes = {}
+
+
+def sonder(chemin_fichier: Path) -> dict:
+    """
+    Informations d'un fichier audio sans le décoder
+
+    Le résultat est mémorisé tant que la taille et la date de
+    modification du fichier ne changent pas.
+
+    Args:
+        chemin_fichier: Fichier à sonder
+
+    Returns:
+        Dictionnaire avec 'duree' (secondes, arrondie à la milliseconde
+        comme len() de pydub), 'nb_frames', 'canaux', 'taux_echantillonnage',
+        'largeur_echantillon' (représentation pydub), 'codec' et
+        'methode' ('wav', 'flac' ou 'ffprobe')
+
+    Raises:
+        OSError: Fichier illisible
+        CouldntDecodeError: Aucun flux audio trouvé par ffprobe
+    """
+    chemin_fichier = Path(chemin_fichier)
+    stat = chemin_fichier.stat()
+    cle = (str(chemin_fichier.resolve()), stat.st_size, stat.st_mtime_ns)
+
+    if cle not in _sondes:
+        infos = (
+            _sonder_wav(chemin_fichier)
+            or _sonder_flac(chemin_fichier)
+            or _sonder_ffprobe(chemin_fichier)
+        )
+        infos['duree'] = round(1000 * infos['nb_frames'] / infos['taux_echantillonnage']) / 1000
+        _sondes[cle] = infos
+
+    return dict(_sondes[cle])
+
+
+def _sonder_wav(chemin_fichier: Path) -> Optional[dict]:
+    """En-têtes d'un WAV PCM entier, None pour tout autre fichier"""
+    chunks = flux_audio.lire_chunks_wav(chemin_fichier)
+    if chunks is None:
+        return None
+
+    largeur = chunks['largeur_echantillon']
+    return {
+        'nb_frames': chunks['taille_donnees'] // (chunks['canaux'] * largeur),
+        'canaux': chunks['canaux'],
+        'taux_echantillonnage': chunks['taux_echantillonnage'],
+        'largeur_echantillon': 4 if largeur == 3 else largeur,
+        'codec': 'pcm_u8' if largeur == 1 else f'pcm_s{8 * largeur}le',
+        'methode': 'wav'
+    }
+
+
+def _sonder_flac(chemin_fichier: Path) -> Optional[dict]:
+    """
+    Bloc STREAMINFO d'un FLAC, None si absent ou sans nombre d'échantillons
+
+    Un éventuel tag ID3v2 placé devant le flux est ignoré.
+    """
+    with open(chemin_fichier, 'rb') as f:
+        entete = f.read(10)
+        if entete[:3] == b'ID3' and len(entete) == 10:
+            # Taille du tag en entiers « synchsafe » de 7 bits
+            taille_tag = (entete[6] << 21) | (entete[7] << 14) | (entete[8] << 7) | entete[9]
+            f.seek(10 + taille_tag)
+            entete = f.read(4)
+        else:
+            f.seek(4)
+            entete = entete[:4]
+
+        if entete != b'fLaC':
+            return None
+
+        bloc = f.read(4)
+        if len(bloc) < 4 or bloc[0] & 0x7F != _FLAC_STREAMINFO:
+            return None
+        streaminfo = f.read(34)
+        if len(streaminfo) < 34:
+            return None
+
+    # 20 bits de fréquence, 3 de canaux, 5 de bits par échantillon, 36 d'échantillons
+    valeur = struct.unpack('>Q', streaminfo[10:18])[0]
+    taux = valeur >> 44
+    canaux = ((valeur >> 41) & 0x07) + 1
+    bits = ((valeur >> 36) & 0x1F) + 1
+    nb_frames = valeur & 0xFFFFFFFFF
+
+    if not taux or not nb_frames:
+        return None
+
+    # ffmpeg décode un FLAC en 16 ou 32 bits (s32 pour 24 bits)
+    return {
+        'nb_frames': nb_frames,
+        'canaux': canaux,
+        'taux_echantillonnage': taux,
+        'largeur_echantillon': 2 if bits <= 16 else 4,
+        'codec': 'flac',
+        'methode': 'flac'
+    }
+
+
+def _sonder_ffprobe(chemin_fichier: Path) -> dict:
+    """Formats compressés : un seul appel à ffprobe"""
+    format_source = flux_audio.lire_format(chemin_fichier)
+    return {
+        'nb_frames': format_source['nb_frames'],
+        'canaux': format_source['canaux'],
+        'taux_echantillonnage': format_source['taux_echantillonnage'],
+        'largeur_echantillon': format_source['largeur_echantillon'],
+        'codec': format_source['codec'],
+        'methode': 'wav' if format_source['wav_natif'] else 'ffprobe'
+    }
@@ -0,0 +1,321 @@
+"""
+Module de mesure de sonie (ITU-R BS.1770 / EBU R128)
+Sonie intégrée (LUFS) et true-peak calculés bloc par bloc, sans
+matérialiser l'épisode
+"""
+
+import math
+import numpy as np
+from typing import Optional
+
+
+# Durée d'un quart de bloc de mesure (100 ms) ; un bloc couvre 4 quarts
+DUREE_QUART_S = 0.1
+
+# Seuils de la mesure intégrée
+PORTE_ABSOLUE_LUFS = -70.0
+PORTE_RELATIVE_LU = -10.0
+
+# Sur-échantillonnage utilisé pour le true-peak
+FACTEUR_SURECHANTILLONNAGE = 4
+TAPS_PAR_PHASE = 12
+
+# Taille minimale des FFT de la pondération K (puissance de 2)
+TAILLE_FFT_MIN = 1 << 17
+
+
+def _coefficients_filtre_k(taux: int) -> tuple:
+    """
+    Coefficients des deux biquads de la pondération K
+
+    Paramètres analogiques de libebur128 : ils redonnent exactement les
+    coefficients de la norme à 48 kHz et s'adaptent aux autres taux.
+    """
+    f0 = 1681.974450955533
+    gain_db = 3.999843853973347
+    q = 0.7071752369554196
+    k = math.tan(math.pi * f0 / taux)
+    vh = 10 ** (gain_db / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    etage_1 = (
+        ((vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0),
+        (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0)
+    )
+
+    f0 = 38.13547087602444
+    q = 0.5003270373238773
+    k = math.tan(math.pi * f0 / taux)
+    a0 = 1 + k / q + k * k
+    etage_2 = (
+        (1.0, -2.0, 1.0),
+        (1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0)
+    )
+
+    return etage_1, etage_2
+
+
+def _reponse_impulsionnelle_k(taux: int) -> np.ndarray:
+    """
+    Réponse impulsionnelle tronquée de la pondération K
+
+    Le passe-haut à 38 Hz est la partie la plus lente ; 100 ms suffisent
+    pour que la troncature reste très en dessous de la précision utile.
+    """
+    longueur = max(taux // 10, 64)
+    signal = np.zeros(longueur)
+    signal[0] = 1.0
+
+    for b, a in _coefficients_filtre_k(taux):
+        sortie = np.empty(longueur)
+        x1 = x2 = y1 = y2 = 0.0
+        for n, x in enumerate(signal.tolist()):
+            y = b[0] * x + b[1] * x1 + b[2] * x2 - a[1] * y1 - a[2] * y2
+            sortie[n] = y
+            x2, x1 = x1, x
+            y2, y1 = y1, y
+        signal = sortie
+
+    return signal
+
+
+def _filtre_surechantillonnage() -> np.ndarray:
+    """Filtre d'interpolation polyphase (phases × taps) pour le true-peak"""
+    nb_taps = FACTEUR_SURECHANTILLONNAGE * TAPS_PAR_PHASE
+    n = np.arange(nb_taps) - (nb_taps - 1) / 2
+    filtre = np.sinc(n / FACTEUR_SURECHANTILLONNAGE) * np.hanning(nb_taps)
+    phases = filtre.reshape(TAPS_PAR_PHASE, FACTEUR_SURECHANTILLONNAGE).T
+    # Gain unitaire en continu pour chaque phase
+    return phases / phases.sum(axis=1, keepdims=True)
+
+
+def lufs_vers_db(valeur: Optional[float]) -> Optional[float]:
+    """Arrondit une valeur en LUFS/dB pour l'affichage (None si silence)"""
+    if valeur is None or math.isinf(valeur):
+        return None
+    return round(valeur, 2)
+
+
+class AnalyseurSonie:
+    """Mesure incrémentale de la sonie intégrée et du true-peak"""
+
+    def __init__(self, taux: int, canaux: int):
+        """
+        Initialise l'analyseur
+
+        Args:
+            taux: Taux d'échantillonnage (Hz)
+            canaux: Nombre de canaux (tous pondérés à 1, cas mono/stéréo)
+        """
+        self.taux = taux
+        self.canaux = canaux
+
+        reponse = _reponse_impulsionnelle_k(taux)
+        self._historique_k = np.zeros((len(reponse) - 1, canaux))
+        # Blocs dimensionnés pour remplir exactement une FFT avec l'historique
+        self._taille_fft = max(TAILLE_FFT_MIN, 1 << (4 * len(reponse)).bit_length())
+        self._taille_bloc = self._taille_fft - len(self._historique_k)
+        self._spectre_k = np.fft.rfft(reponse, self._taille_fft)[:, None]
+        self._en_attente = []
+        self._frames_en_attente = 0
+
+        self._taille_quart = int(round(taux * DUREE_QUART_S))
+        self._quart_en_cours = np.zeros(canaux)
+        self._frames_quart = 0
+        self._quarts = []
+
+        self._phases = _filtre_surechantillonnage()
+        self._historique_tp = np.zeros((TAPS_PAR_PHASE - 1, canaux))
+        self._true_peak = 0.0
+
+    def ajouter(self, echantillons: np.ndarray):
+        """
+        Ajoute des échantillons à la mesure
+
+        Args:
+            echantillons: Tableau (frames, canaux), entier (pleine échelle
+                          du type) ou flottant dans [-1, 1]
+        """
+        if np.issubdtype(echantillons.dtype, np.integer):
+            echelle = 1.0 / -np.iinfo(echantillons.dtype).min
+        else:
+            echelle = 1.0
+
+        for debut in range(0, len(echantillons), self._taille_bloc):
+            bloc = echantillons[debut:debut + self._taille_bloc].astype(np.float64) * echelle
+            self._en_attente.append(bloc)
+            self._frames_en_attente += len(bloc)
+            if self._frames_en_attente >= self._taille_bloc:
+                self._traiter_en_attente()
+
+    def ajouter_silence(self, nb_frames: int):
+        """Ajoute des frames de silence sans les allouer d'un bloc"""
+        while nb_frames > 0:
+            nb = min(nb_frames, self._taille_bloc)
+            self.ajouter(np.zeros((nb, self.canaux)))
+            nb_frames -= nb
+
+    def _traiter_en_attente(self):
+        """Analyse les échantillons accumulés, par blocs d'une FFT"""
+        if not self._en_attente:
+            return
+
+        donnees = np.concatenate(self._en_attente)
+        self._en_attente = []
+        self._frames_en_attente = 0
+
+        fin_complete = len(donnees) - len(donnees) % self._taille_bloc
+        for debut in range(0, fin_complete, self._taille_bloc):
+            bloc = donnees[debut:debut + self._taille_bloc]
+            self._mesurer_true_peak(bloc)
+            self._accumuler_energie(self._filtrer_k(bloc))
+
+        if fin_complete < len(donnees):
+            self._en_attente.append(donnees[fin_complete:])
+            self._frames_en_attente = len(donnees) - fin_complete
+
+    def _terminer(self):
+        """Analyse le reliquat avant de lire les résultats"""
+        self._traiter_en_attente()
+        if self._en_attente:
+            bloc = self._en_attente.pop()
+            self._frames_en_attente = 0
+            self._mesurer_true_peak(bloc)
+            self._accumuler_energie(self._filtrer_k(bloc))
+
+    def _filtrer_k(self, bloc: np.ndarray) -> np.ndarray:
+        """Pondération K par convolution FFT (overlap-save)"""
+        taille_historique = len(self._historique_k)
+        entree = np.concatenate([self._historique_k, bloc])
+        self._historique_k = entree[len(entree) - taille_historique:]
+
+        spectre = np.fft.rfft(entree, self._taille_fft, axis=0) * self._spectre_k
+        filtre = np.fft.irfft(spectre, self._taille_fft, axis=0)
+        return filtre[taille_historique:len(entree)]
+
+    def _accumuler_energie(self, filtre: np.ndarray):
+        """Cumule l'énergie par quarts de bloc de 100 ms"""
+        carres = filtre * filtre
+        position = 0
+        while position < len(carres):
+            nb = min(self._taille_quart - self._frames_quart, len(carres) - position)
+            self._quart_en_cours += carres[position:position + nb].sum(axis=0)
+            self._frames_quart += nb
+            position += nb
+            if self._frames_quart == self._taille_quart:
+                self._quarts.append(self._quart_en_cours.sum())
+                self._quart_en_cours = np.zeros(self.canaux)
+                self._frames_quart = 0
+
+    def _mesurer_true_peak(self, bloc: np.ndarray):
+        """Pic inter-échantillons, par interpolation ×4"""
+        entree = np.concatenate([self._historique_tp, bloc])
+        self._historique_tp = entree[len(entree) - len(self._historique_tp):]
+
+        pic = float(np.abs(bloc).max()) if len(bloc) else 0.0
+        for canal in range(self.canaux):
+            for phase in self._phases:
+                interpole = np.convolve(entree[:, canal], phase, mode='valid')
+                if len(interpole):
+                    pic = max(pic, float(np.abs(interpole).max()))
+        self._true_peak = max(self._true_peak, pic)
+
+    @property
+    def lufs_integre(self) -> float:
+        """Sonie intégrée (LUFS), -inf si le signal est silencieux ou trop court"""
+        self._terminer()
+        if len(self._quarts) < 4:
+            return -math.inf
+
+        quarts = np.asarray(self._quarts)
+        # Blocs de 400 ms avec recouvrement de 75 % : 4 quarts consécutifs
+        somme = quarts[:-3] + quarts[1:-2] + quarts[2:-1] + quarts[3:]
+        energies = somme / (4 * self._taille_quart)
+
+        with np.errstate(divide='ignore'):
+            sonies = -0.691 + 10 * np.log10(energies)
+
+        retenus = energies[sonies > PORTE_ABSOLUE_LUFS]
+        if not len(retenus):
+            return -math.inf
+
+        porte_relative = -0.691 + 10 * math.log10(retenus.mean()) + PORTE_RELATIVE_LU
+        retenus = energies[sonies > porte_relative]
+        if not len(retenus):
+            return -math.inf
+
+        return -0.691 + 10 * math.log10(retenus.mean())
+
+    @property
+    def true_peak_dbtp(self) -> float:
+        """True-peak (dBTP), -inf pour un signal nul"""
+        self._terminer()
+        if self._true_peak == 0:
+            return -math.inf
+        return 20 * math.log10(self._true_peak)
+
+    def resultat(self) -> dict:
+        """Valeurs mesurées, arrondies pour les métadonnées"""
+        return {
+            'lufs_integre': lufs_vers_db(self.lufs_integre),
+            'true_peak_dbtp': lufs_vers_db(self.true_peak_dbtp)
+        }
+
+
+def gain_normalisation(
+    lufs_integre: float,
+    true_peak_dbtp: float,
+    cible_lufs: float,
+    plafond_true_peak: float
+) -> float:
+    """
+    Gain unique (dB) amenant le contenu à la sonie cible
+
+    Le gain est réduit si le true-peak résultant dépasserait le plafond ;
+    aucun gain n'est appliqué à un contenu silencieux.
+
+    Args:
+        lufs_integre: Sonie mesurée (LUFS)
+        true_peak_dbtp: True-peak mesuré (dBTP)
+        cible_lufs: Sonie visée (LUFS)
+        plafond_true_peak: True-peak maximal autorisé (dBTP)
+
+    Returns:
+        Gain en dB
+    """
+    if math.isinf(lufs_integre):
+        return 0.0
+
+    gain = cible_lufs - lufs_integre
+    if not math.isinf(true_peak_dbtp):
+        gain = min(gain, plafond_true_peak - true_peak_dbtp)
+    return gain
+
+
+def parametres_sonie(audio_config: dict) -> Optional[dict]:
+    """
+    Paramètres de normalisation en sonie lus dans la section 'audio'
+
+    Returns:
+        {'cible_lufs', 'plafond_true_peak'} en mode 'lufs', None en mode
+        'crete' (normalisation du pic, comportement historique)
+    """
+    if audio_config.get('mode_normalisation', 'crete') != 'lufs':
+        return None
+    return {
+        'cible_lufs': float(audio_config.get('cible_lufs', -16.0)),
+        'plafond_true_peak': float(audio_config.get('plafond_true_peak', -1.0))
+    }
+
+
+def resume(mesure: dict) -> str:
+    """Résumé lisible d'une mesure enregistrée par l'assemblage"""
+    contenu = mesure['contenu']
+    texte = (
+        f"Sonie du contenu : {contenu['lufs_integre']} LUFS "
+        f"(true-peak {contenu['true_peak_dbtp']} dBTP), gain {mesure['gain_db']:+.2f} dB"
+    )
+    episode = mesure.get('episode')
+    if episode:
+        texte += f" → épisode {episode['lufs_integre']} LUFS, {episode['true_peak_dbtp']} dBTP"
+    return texte
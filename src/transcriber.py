@@ -4,12 +4,22 @@ Module de transcription utilisant WhisperX avec diarisation intégrée
 
 import whisperx
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional
 import torch
 import gc
+import json
+import time
 import warnings
 import os
 
+from . import attribution_speakers
+from . import flux_audio
+from . import flux_transcription
+from . import index_audio
+from . import vad
+from .cache_transcription import CacheTranscriptions, calculer_cle
+from .registre_modeles import registre_par_defaut
+
 # Supprimer les warnings verbeux de torchaudio et pyannote
 warnings.filterwarnings("ignore", category=UserWarning, module="torchaudio")
 warnings.filterwarnings("ignore", category=UserWarning, module="pyannote")
@@ -20,6 +30,27 @@ warnings.filterwarnings("ignore", message=".*TorchCodec.*")
 os.environ['HF_HUB_DISABLE_SYMLINKS_WARNING'] = '1'
 
 
+# Journal de reprise d'un lot, créé à côté des fichiers
+NOM_JOURNAL_LOT = '.transcription_lot.json'
+
+
+def _lire_journal(chemin_journal: Path) -> dict:
+    """Fichiers déjà transcrits d'un lot ({chemin: infos}), vide si absent"""
+    try:
+        with open(chemin_journal, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _ecrire_journal(chemin_journal: Path, journal: dict):
+    """Enregistre le journal (remplacement atomique : jamais à moitié écrit)"""
+    temporaire = chemin_journal.with_name(f"{chemin_journal.name}.tmp")
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(journal, f, indent=2, ensure_ascii=False)
+    os.replace(temporaire, chemin_journal)
+
+
 class Transcriber:
     """Gère la transcription audio avec WhisperX et diarisation"""
 
@@ -33,28 +64,81 @@ class Transcriber:
         self.config = config['transcription']
         self.model = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.compute_type = "float16" if self.device == "cuda" else "int8"
+        self.compute_type = self.config.get('compute_type', 'auto')
+        if self.compute_type == 'auto':
+            self.compute_type = "float16" if self.device == "cuda" else "int8"
+        self.batch_size = self.config.get('batch_size', 16)
+        self.threads = self.config.get('threads', 0)
+        self.workers = self.config.get('workers', 1)
+        if self.threads:
+            # Alignement et diarisation (PyTorch) sur le même nombre de cœurs
+            torch.set_num_threads(self.threads)
+        self.cache = CacheTranscriptions.depuis_config(self.config)
+        # Étapes demandées mais échouées pendant la dernière transcription
+        self._etapes_echouees = set()
+        # Modèles partagés par tous les transcripteurs du processus
+        self.registre = registre_par_defaut(self.config)
+        # Clés réservées dans le registre pendant la transcription en cours
+        self._reservations = []
+
+    def _cle_modele(self) -> tuple:
+        return (
+            'whisperx', self.config['modele'], self.device,
+            self.compute_type, self.threads, self.workers
+        )
 
     def charger_modele(self):
-        """Charge le modèle WhisperX"""
+        """Charge le modèle WhisperX (repris du registre s'il est déjà en mémoire)"""
         nom_modele = self.config['modele']
-        print(f"🤖 Chargement du modèle WhisperX '{nom_modele}'...")
-        print(f"   🖥️  Device : {self.device.upper()}")
-        print("   (Cela peut prendre du temps au premier lancement)")
-
-        self.model = whisperx.load_model(
-            nom_modele,
-            self.device,
-            compute_type=self.compute_type
-        )
-        print("✅ Modèle chargé")
+        charge = []
+
+        def charger():
+            print(f"🤖 Chargement du modèle WhisperX '{nom_modele}'...")
+            print(f"   🖥️  Device : {self.device.upper()}")
+            print("   (Cela peut prendre du temps au premier lancement)")
+            charge.append(True)
+            return self._charger_whisperx()
+
+        # Vérification et chargement en un seul appel, sous le verrou du registre
+        self.model = self.registre.obtenir(self._cle_modele(), charger, self._liberer_memoire)
+        print("✅ Modèle chargé" if charge else f"♻️  Modèle WhisperX '{nom_modele}' déjà chargé")
+
+    def _reserver(self, cle: tuple, charger: Callable):
+        """Modèle du registre protégé de l'éviction jusqu'à _rendre_modeles()"""
+        modele = self.registre.obtenir(cle, charger, self._liberer_memoire, reserver=True)
+        self._reservations.append(cle)
+        return modele
+
+    def _rendre_modeles(self):
+        """Rend au registre les modèles réservés par la transcription terminée"""
+        while self._reservations:
+            self.registre.rendre(self._reservations.pop())
+
+    def _charger_whisperx(self):
+        """Charge le modèle WhisperX avec les réglages d'inférence (hors registre)"""
+        nom_modele = self.config['modele']
+        options = {'compute_type': self.compute_type}
+        if self.threads:
+            options['threads'] = self.threads
+        if self.workers > 1:
+            # Plusieurs transcriptions simultanées sur le même modèle ctranslate2
+            from whisperx.asr import WhisperModel
+            options['model'] = WhisperModel(
+                nom_modele,
+                device=self.device,
+                compute_type=self.compute_type,
+                cpu_threads=self.threads,
+                num_workers=self.workers
+            )
+        return whisperx.load_model(nom_modele, self.device, **options)
 
     def transcrire(
         self,
         chemin_audio: Path,
         chemin_sortie: Optional[Path] = None,
         detecter_speakers: bool = False,
-        token_hf: Optional[str] = None
+        token_hf: Optional[str] = None,
+        progression: Optional[Callable[[float, List[dict]], None]] = None
     ) -> dict:
         """
         Transcrit un fichier audio avec option de diarisation
@@ -64,82 +148,499 @@ class Transcriber:
             chemin_sortie: Chemin optionnel pour sauvegarder la transcription
             detecter_speakers: Si True, active la détection des speakers
             token_hf: Token HuggingFace (requis si detecter_speakers=True)
+            progression: Fonction appelée après chaque bloc (mode par blocs)
+                         avec (fraction traitée, segments formatés du bloc)
 
         Returns:
             Dictionnaire de résultat avec 'texte', 'segments', 'langue'
         """
+        # Une transcription identique (même audio, mêmes réglages) est reprise du cache
+        diarisation = bool(detecter_speakers and token_hf)
+        cle_cache = self._cle_cache(chemin_audio, diarisation)
+        if cle_cache is not None:
+            entree = self.cache.chercher(cle_cache)
+            if entree is not None:
+                print(
+                    f"♻️  Transcription de {chemin_audio.name} trouvée dans le cache, "
+                    "WhisperX non relancé"
+                )
+                transcription = entree['transcription']
+                print(f"   📊 {len(transcription['segments'])} segments")
+                if progression is not None:
+                    progression(1.0, transcription['segments'])
+                if chemin_sortie:
+                    self._sauvegarder_transcription(transcription, chemin_sortie)
+                return transcription
+
         if self.model is None:
             self.charger_modele()
 
         print(f"🎤 Transcription de {chemin_audio.name}...")
+        self._etapes_echouees = set()
+
+        try:
+            # Le modèle tenu ici est remis au registre s'il en a été évincé entre-temps
+            modele = self.model
+            self.model = self._reserver(self._cle_modele(), lambda: modele)
 
+            if self.config.get('par_blocs', False):
+                resultat = self._transcrire_par_blocs(chemin_audio, chemin_sortie, progression)
+            else:
+                resultat = self._transcrire_entier(chemin_audio)
+
+            if self.registre.actif:
+                # Le registre garde le modèle : sans référence ici, son éviction libère la mémoire
+                self.model = modele = None
+
+            # Étape 3 : Diarisation si demandée
+            if detecter_speakers:
+                if not token_hf:
+                    print("   ⚠️  Token HuggingFace manquant, diarisation ignorée")
+                    print("      Définissez HUGGINGFACE_TOKEN dans .env")
+                else:
+                    resultat = self._ajouter_speakers(
+                        str(chemin_audio),  # Passer le chemin du fichier
+                        resultat,
+                        token_hf
+                    )
+        finally:
+            self._rendre_modeles()
+
+        langue_detectee = "fr"
+
+        # Formater le résultat
+        transcription = self._formater_resultat(resultat, langue_detectee)
+
+        print(f"✅ Transcription complète : {len(transcription['texte'])} caractères")
+        print(f"   📊 {len(transcription['segments'])} segments")
+
+        if cle_cache is not None and self._etapes_echouees:
+            # Un résultat dégradé ne doit pas masquer la transcription complète d'une relance
+            print(f"   ⚠️  Non mis en cache ({', '.join(sorted(self._etapes_echouees))} en échec)")
+        elif cle_cache is not None:
+            self.cache.enregistrer(cle_cache, transcription, {
+                'fichier': chemin_audio.name,
+                'duree': index_audio.index_par_defaut().infos(chemin_audio)['duree'],
+                'reglages': self._reglages_cache(diarisation)
+            })
+
+        # Sauvegarder si chemin fourni
+        if chemin_sortie:
+            self._sauvegarder_transcription(transcription, chemin_sortie)
+
+        return transcription
+
+    def transcrire_fichiers(
+        self,
+        fichiers: List[Path],
+        chemin_sortie: Optional[Path] = None,
+        detecter_speakers: bool = False,
+        token_hf: Optional[str] = None,
+        chemin_mix: Optional[Path] = None,
+        durees: Optional[List[float]] = None
+    ) -> dict:
+        """
+        Transcrit chaque fichier séparément puis fusionne sur la ligne de temps du mix
+
+        Chaque fichier passe par le cache : ajouter un enregistrement à une
+        série ne transcrit que celui-ci. Les segments sont décalés de la
+        durée cumulée des fichiers qui le précèdent dans la concaténation.
+
+        Args:
+            fichiers: Fichiers dans l'ordre de concaténation (trier_fichiers)
+            chemin_sortie: Chemin optionnel pour sauvegarder la transcription fusionnée
+            detecter_speakers: Si True, diarisation sur le mix (speakers
+                               cohérents d'un fichier à l'autre)
+            token_hf: Token HuggingFace (requis si detecter_speakers=True)
+            chemin_mix: Mix concaténé, requis pour la diarisation
+            durees: Durée de chaque fichier dans le mix
+                    (AudioProcessor.durees_concatenees) ; à défaut, les
+                    fichiers compressés sont décodés pour la mesurer
+
+        Returns:
+            Dictionnaire de résultat avec 'texte', 'segments', 'langue'
+        """
+        print(f"🎤 Transcription par fichier ({len(fichiers)} fichiers)...")
+
+        if durees is None:
+            # La durée du conteneur n'est qu'une estimation : l'erreur s'accumulerait
+            durees = [flux_audio.duree_decodee(fichier) for fichier in fichiers]
+
+        segments = []
+        decalage = 0.0
+        for i, (fichier, duree) in enumerate(zip(fichiers, durees), 1):
+            print(
+                f"\n   📄 [{i}/{len(fichiers)}] {fichier.name} "
+                f"(à {self._formater_temps(decalage)} dans le mix)"
+            )
+            transcription = self.transcrire(fichier)
+            for seg in transcription['segments']:
+                segments.append({
+                    'start': seg['debut'] + decalage,
+                    'end': seg['fin'] + decalage,
+                    'text': seg['texte']
+                })
+            decalage += duree
+
+        resultat = {"segments": segments}
+
+        if detecter_speakers:
+            if not token_hf:
+                print("   ⚠️  Token HuggingFace manquant, diarisation ignorée")
+                print("      Définissez HUGGINGFACE_TOKEN dans .env")
+            elif chemin_mix is None:
+                print("   ⚠️  Mix concaténé manquant, diarisation ignorée")
+            else:
+                try:
+                    resultat = self._ajouter_speakers(str(chemin_mix), resultat, token_hf)
+                finally:
+                    self._rendre_modeles()
+
+        transcription = self._formater_resultat(resultat, "fr")
+
+        print(f"\n✅ Transcription fusionnée : {len(transcription['texte'])} caractères")
+        print(
+            f"   📊 {len(transcription['segments'])} segments "
+            f"sur {self._formater_temps(decalage)}"
+        )
+
+        if chemin_sortie:
+            self._sauvegarder_transcription(transcription, chemin_sortie)
+
+        return transcription
+
+    def transcrire_lot(
+        self,
+        fichiers: List[Path],
+        detecter_speakers: bool = False,
+        token_hf: Optional[str] = None,
+        chemin_journal: Optional[Path] = None,
+        reprendre: bool = True
+    ) -> List[dict]:
+        """
+        Transcrit une file de fichiers avec un seul chargement de modèle
+
+        Chaque transcription est écrite à côté de son fichier
+        (<nom>_transcription.txt et _timestamps.txt). Le journal note les
+        fichiers terminés au fur et à mesure, avec les réglages utilisés :
+        relancer le même lot après une interruption reprend au premier
+        fichier non traité, et changer de réglages (modèle, diarisation...)
+        retranscrit tout.
+
+        Args:
+            fichiers: Fichiers à transcrire, dans l'ordre de la file
+            detecter_speakers: Si True, active la détection des speakers
+            token_hf: Token HuggingFace (requis si detecter_speakers=True)
+            chemin_journal: Journal de reprise (défaut : .transcription_lot.json
+                            dans le dossier du premier fichier)
+            reprendre: False = ignorer le journal et tout retranscrire
+
+        Returns:
+            Un rapport par fichier : 'fichier', 'statut' ('transcrit',
+            'deja_fait' ou 'erreur'), 'sortie', 'duree_audio', 'temps'
+            (secondes) et 'erreur' le cas échéant
+        """
+        if not fichiers:
+            return []
+
+        if chemin_journal is None:
+            chemin_journal = Path(fichiers[0]).parent / NOM_JOURNAL_LOT
+        journal = _lire_journal(chemin_journal) if reprendre else {}
+
+        print(f"📚 Lot de {len(fichiers)} fichier(s), batch_size={self.batch_size}")
+        # Réglages notés par fichier (JSON : comparés sous la forme relue du journal)
+        diarisation = bool(detecter_speakers and token_hf)
+        reglages = json.loads(json.dumps(self._reglages_cache(diarisation)))
+
+        rapports = []
+        for i, fichier in enumerate(fichiers, 1):
+            fichier = Path(fichier)
+            chemin_sortie = fichier.with_name(f"{fichier.stem}_transcription.txt")
+            stat = fichier.stat()
+            identite = str(fichier.resolve())
+            rapport = {'fichier': fichier, 'sortie': chemin_sortie}
+
+            deja_fait = journal.get(identite)
+            if (deja_fait and chemin_sortie.exists()
+                    and deja_fait['taille'] == stat.st_size
+                    and deja_fait['mtime_ns'] == stat.st_mtime_ns
+                    and deja_fait.get('reglages') == reglages):
+                print(f"\n⏩ [{i}/{len(fichiers)}] {fichier.name} : déjà transcrit")
+                rapports.append({**rapport, 'statut': 'deja_fait',
+                                 'duree_audio': deja_fait['duree_audio'], 'temps': 0.0})
+                continue
+
+            print(f"\n📄 [{i}/{len(fichiers)}] {fichier.name}")
+            debut = time.perf_counter()
+            try:
+                duree_audio = index_audio.index_par_defaut().infos(fichier)['duree']
+                self.transcrire(fichier, chemin_sortie, detecter_speakers, token_hf)
+            except Exception as e:
+                print(f"   ❌ {fichier.name} : {e}")
+                rapports.append({**rapport, 'statut': 'erreur', 'erreur': e,
+                                 'duree_audio': 0.0, 'temps': time.perf_counter() - debut})
+                continue
+
+            temps = time.perf_counter() - debut
+            rapports.append({
+                **rapport, 'statut': 'transcrit', 'duree_audio': duree_audio, 'temps': temps
+            })
+
+            if self._etapes_echouees:
+                # Résultat dégradé (alignement ou diarisation) : à refaire à la relance
+                continue
+
+            journal[identite] = {
+                'taille': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'reglages': reglages,
+                'duree_audio': duree_audio,
+                'temps': temps
+            }
+            _ecrire_journal(chemin_journal, journal)
+
+        return rapports
+
+    def _reglages_cache(self, diarisation: bool) -> dict:
+        """Réglages qui changent le résultat d'une transcription"""
+        reglages = {
+            'modele': self.config['modele'],
+            'compute_type': self.compute_type,
+            'langue': 'fr',
+            'alignement': True,
+            'diarisation': diarisation,
+            'par_blocs': self.config.get('par_blocs', False)
+        }
+        if self.config.get('pre_vad', False):
+            reglages['pre_vad'] = [
+                self.config.get('vad_marge', 0.3),
+                self.config.get('vad_silence_min', 1.0)
+            ]
+        if reglages['par_blocs']:
+            reglages['blocs'] = [
+                self.config.get('duree_bloc', 600),
+                self.config.get('recherche_silence', 30),
+                self.config.get('chevauchement_bloc', 2)
+            ]
+        return reglages
+
+    def _cle_cache(self, chemin_audio: Path, diarisation: bool) -> Optional[str]:
+        """Clé de cache (empreinte du contenu via l'index audio), None sans cache"""
+        if self.cache is None:
+            return None
+        try:
+            sha256 = index_audio.index_par_defaut().infos(chemin_audio, hachage=True)['sha256']
+        except Exception as e:
+            print(f"   ⚠️  Cache des transcriptions ignoré : {e}")
+            return None
+        return calculer_cle(sha256, self._reglages_cache(diarisation))
+
+    def _transcrire_entier(self, chemin_audio: Path) -> dict:
+        """Transcrit et aligne le fichier d'un seul tenant (forme d'onde entière en mémoire)"""
         # Charger l'audio
         audio = whisperx.load_audio(str(chemin_audio))
+        audio, plan_vad = self._retirer_silences(audio)
 
         # Étape 1 : Transcription (optimisée pour le français)
         print("   📝 Transcription en cours (français)...")
 
-        resultat = self.model.transcribe(
-            audio,
-            language="fr",  # Toujours français
-            batch_size=16
-        )
+        resultat = self._transcrire_forme_onde(audio)
 
-        langue_detectee = "fr"
-        print(f"   ✅ Transcription terminée (langue: {langue_detectee})")
+        print("   ✅ Transcription terminée (langue: fr)")
 
         # Étape 2 : Alignment pour de meilleurs timestamps (français)
         print("   🎯 Alignement des timestamps...")
-        try:
-            model_a, metadata = whisperx.load_align_model(
-                language_code="fr",
-                device=self.device
-            )
-
-            resultat = whisperx.align(
-                resultat["segments"],
-                model_a,
-                metadata,
-                audio,
-                self.device,
-                return_char_alignments=False
-            )
-
-            # Libérer la mémoire
-            del model_a
-            gc.collect()
-            if self.device == "cuda":
-                torch.cuda.empty_cache()
+        alignement = self._charger_alignement()
+        if alignement is None:
+            # Continuer sans alignment
+            self._etapes_echouees.add('alignement')
+            return self._replacer_silences({"segments": resultat["segments"]}, plan_vad)
 
+        try:
+            resultat = self._aligner(resultat["segments"], alignement, audio)
             print("   ✅ Alignement terminé")
         except Exception as e:
             print(f"   ⚠️  Alignement ignoré : {e}")
-            # Continuer sans alignment
+            self._etapes_echouees.add('alignement')
             resultat = {"segments": resultat["segments"]}
+        finally:
+            # Libérer la mémoire
+            del alignement
+            self._liberer_memoire()
 
-        # Étape 3 : Diarisation si demandée
-        if detecter_speakers:
-            if not token_hf:
-                print("   ⚠️  Token HuggingFace manquant, diarisation ignorée")
-                print("      Définissez HUGGINGFACE_TOKEN dans .env")
-            else:
-                resultat = self._ajouter_speakers(
-                    str(chemin_audio),  # Passer le chemin du fichier
-                    resultat,
-                    token_hf
-                )
+        return self._replacer_silences(resultat, plan_vad)
 
-        # Formater le résultat
-        transcription = self._formater_resultat(resultat, langue_detectee)
+    def _transcrire_par_blocs(
+        self,
+        chemin_audio: Path,
+        chemin_sortie: Optional[Path],
+        progression: Optional[Callable[[float, List[dict]], None]]
+    ) -> dict:
+        """
+        Transcrit le fichier par fenêtres coupées dans les silences
 
-        print(f"✅ Transcription complète : {len(transcription['texte'])} caractères")
-        print(f"   📊 {len(transcription['segments'])} segments")
+        L'audio est décodé en flux : seule la fenêtre en cours est en
+        mémoire. Les segments de chaque fenêtre sont replacés sur la ligne
+        de temps du fichier, affichés et, si chemin_sortie est fourni,
+        ajoutés au fichier _timestamps.txt au fil de l'eau.
+        """
+        duree_bloc = self.config.get('duree_bloc', 600)
+        try:
+            duree_totale = index_audio.index_par_defaut().infos(chemin_audio)['duree']
+        except Exception:
+            duree_totale = None
 
-        # Sauvegarder si chemin fourni
+        print(f"   📝 Transcription par blocs de {duree_bloc / 60:.0f} min (français)...")
+        print("   🎯 Alignement des timestamps à chaque bloc...")
+        alignement = self._charger_alignement()
+        if alignement is None:
+            self._etapes_echouees.add('alignement')
+
+        fichier_partiel = None
         if chemin_sortie:
-            self._sauvegarder_transcription(transcription, chemin_sortie)
+            chemin_sortie.parent.mkdir(parents=True, exist_ok=True)
+            fichier_partiel = open(
+                chemin_sortie.with_name(f"{chemin_sortie.stem}_timestamps.txt"),
+                'w',
+                encoding='utf-8'
+            )
 
-        return transcription
+        aligne = alignement is not None
+        segments = []
+        try:
+            for fenetre in flux_transcription.fenetres(
+                chemin_audio,
+                duree_bloc,
+                self.config.get('recherche_silence', 30),
+                self.config.get('chevauchement_bloc', 2)
+            ):
+                audio, plan_vad = self._retirer_silences(fenetre['audio'], afficher=False)
+                resultat = self._transcrire_forme_onde(audio)
+
+                if alignement is not None and resultat["segments"]:
+                    try:
+                        resultat = self._aligner(resultat["segments"], alignement, audio)
+                    except Exception as e:
+                        print(f"   ⚠️  Alignement ignoré pour ce bloc : {e}")
+                        self._etapes_echouees.add('alignement')
+                resultat = self._replacer_silences(resultat, plan_vad)
+
+                # Segments du chevauchement gardés par une seule fenêtre
+                bloc = flux_transcription.decaler_segments(
+                    resultat["segments"], fenetre['decalage']
+                )
+                fin = float('inf') if fenetre['derniere'] else fenetre['fin']
+                bloc = flux_transcription.garder_plage(bloc, fenetre['debut'], fin)
+                segments.extend(bloc)
+
+                silence = f", {plan_vad['silence']:.0%} de silence retiré" if plan_vad else ""
+                print(
+                    f"   🧩 Bloc {fenetre['index'] + 1} "
+                    f"[{self._formater_temps(fenetre['debut'])} → "
+                    f"{self._formater_temps(fenetre['fin'])}] : "
+                    f"{len(bloc)} segments{silence}"
+                )
+
+                segments_formates = self._formater_resultat({"segments": bloc}, "fr")['segments']
+                if fichier_partiel is not None:
+                    self._ecrire_timestamps(fichier_partiel, segments_formates)
+                    fichier_partiel.flush()
+                if progression is not None:
+                    fraction = min(fenetre['fin'] / duree_totale, 1.0) if duree_totale else 0.0
+                    progression(1.0 if fenetre['derniere'] else fraction, segments_formates)
+        finally:
+            if fichier_partiel is not None:
+                fichier_partiel.close()
+            del alignement
+            self._liberer_memoire()
+
+        print("   ✅ Transcription terminée (langue: fr)")
+
+        resultat = {"segments": segments}
+        if aligne:
+            resultat["word_segments"] = [mot for seg in segments for mot in seg.get("words", [])]
+        return resultat
+
+    def _transcrire_forme_onde(self, audio) -> dict:
+        """Passe une forme d'onde 16 kHz au modèle (rien à transcrire si elle est vide)"""
+        if not len(audio):
+            return {"segments": []}
+        return self.model.transcribe(
+            audio,
+            language="fr",  # Toujours français
+            batch_size=self.batch_size
+        )
+
+    def _retirer_silences(self, audio, afficher: bool = True) -> tuple:
+        """
+        Pré-passe VAD par énergie (transcription.pre_vad, désactivée par défaut)
+
+        Returns:
+            Tuple (audio réduit aux zones de parole, plan pour
+            _replacer_silences), ou (audio, None) si désactivée
+        """
+        if not self.config.get('pre_vad', False):
+            return audio, None
+
+        zones = vad.detecter_parole(
+            audio,
+            self.config.get('vad_marge', 0.3),
+            self.config.get('vad_silence_min', 1.0)
+        )
+        compact, plan = vad.compacter(audio, zones)
+        plan['silence'] = vad.proportion_silence(audio, zones)
+        if afficher:
+            print(
+                f"   🔇 Pré-VAD : {plan['silence']:.0%} de silence retiré "
+                f"({len(zones)} zones de parole)"
+            )
+        return compact, plan
+
+    @staticmethod
+    def _replacer_silences(resultat: dict, plan_vad: Optional[dict]) -> dict:
+        """Replace les horodatages obtenus sur l'audio compacté sur la ligne de temps d'origine"""
+        if plan_vad is None:
+            return resultat
+        segments = vad.replacer_segments(resultat["segments"], plan_vad)
+        if "word_segments" not in resultat:
+            return {**resultat, "segments": segments}
+        return {
+            **resultat,
+            "segments": segments,
+            "word_segments": [mot for seg in segments for mot in seg.get("words", [])]
+        }
+
+    def _charger_alignement(self) -> Optional[tuple]:
+        """Modèle d'alignement français (modèle, métadonnées), None s'il est indisponible"""
+        try:
+            return self._reserver(
+                ('alignement', 'fr', self.device),
+                lambda: whisperx.load_align_model(
+                    language_code="fr",
+                    device=self.device
+                )
+            )
+        except Exception as e:
+            print(f"   ⚠️  Alignement ignoré : {e}")
+            return None
+
+    def _aligner(self, segments: List[dict], alignement: tuple, audio) -> dict:
+        """Aligne des segments sur l'audio transcrit"""
+        model_a, metadata = alignement
+        return whisperx.align(
+            segments,
+            model_a,
+            metadata,
+            audio,
+            self.device,
+            return_char_alignments=False
+        )
+
+    def _liberer_memoire(self):
+        """Libère la mémoire des modèles dont les références ont été supprimées"""
+        gc.collect()
+        if self.device == "cuda":
+            torch.cuda.empty_cache()
 
     def _ajouter_speakers(
         self,
@@ -164,13 +665,20 @@ class Transcriber:
             # Utiliser directement pyannote.audio
             from pyannote.audio import Pipeline
 
-            # Charger le pipeline de diarisation
-            print("   📦 Chargement du modèle de diarisation...")
-            diarize_model = Pipeline.from_pretrained(
-                "pyannote/speaker-diarization-3.1",
-                use_auth_token=token_hf
+            # Charger le pipeline de diarisation (gardé par le registre)
+            cle = ('diarisation', 'pyannote/speaker-diarization-3.1', self.device)
+            deja_charge = self.registre.contient(cle)
+            if not deja_charge:
+                print("   📦 Chargement du modèle de diarisation...")
+            diarize_model = self._reserver(
+                cle,
+                lambda: Pipeline.from_pretrained(
+                    "pyannote/speaker-diarization-3.1",
+                    use_auth_token=token_hf
+                )
             )
-            print("   ✅ Modèle chargé")
+            if not deja_charge:
+                print("   ✅ Modèle chargé")
 
             # Appliquer la diarisation (prend un chemin de fichier)
             print("   🔄 Analyse audio (1/2) : identification des intervenants...")
@@ -221,12 +729,14 @@ class Transcriber:
             return resultat_diarize
 
         except ImportError as e:
+            self._etapes_echouees.add('diarisation')
             print("\n   ⚠️  pyannote.audio n'est pas installé")
             print("   💡 Installez avec : pip install pyannote.audio\n")
             return resultat
 
         except Exception as e:
             import traceback
+            self._etapes_echouees.add('diarisation')
             error_msg = str(e)
             print(f"\n   ⚠️  Erreur lors de la diarisation : {error_msg}\n")
 
@@ -254,47 +764,16 @@ class Transcriber:
         resultat: dict
     ) -> dict:
         """
-        Attribution manuelle des speakers aux segments (fallback)
+        Attribution manuelle des speakers aux segments et aux mots (fallback)
 
         Args:
             diarize_segments: Résultat de pyannote
             resultat: Transcription alignée
 
         Returns:
-            Résultat avec speakers attribués
+            Résultat avec speakers (et 'confiance_speaker') attribués
         """
-        # Convertir diarize_segments en liste de (start, end, speaker)
-        speaker_intervals = []
-        for turn, _, speaker in diarize_segments.itertracks(yield_label=True):
-            speaker_intervals.append({
-                'start': turn.start,
-                'end': turn.end,
-                'speaker': speaker
-            })
-
-        # Attribuer chaque segment au speaker majoritaire
-        for segment in resultat['segments']:
-            seg_start = segment['start']
-            seg_end = segment['end']
-            seg_mid = (seg_start + seg_end) / 2
-
-            # Trouver le speaker au milieu du segment
-            speaker = None
-            max_overlap = 0
-
-            for interval in speaker_intervals:
-                # Calculer l'overlap entre le segment et l'intervalle speaker
-                overlap_start = max(seg_start, interval['start'])
-                overlap_end = min(seg_end, interval['end'])
-                overlap = max(0, overlap_end - overlap_start)
-
-                if overlap > max_overlap:
-                    max_overlap = overlap
-                    speaker = interval['speaker']
-
-            segment['speaker'] = speaker if speaker else "SPEAKER_UNKNOWN"
-
-        return resultat
+        return attribution_speakers.attribuer_speakers(diarize_segments, resultat)
 
     def _formater_resultat(self, resultat: dict, langue: str) -> dict:
         """Formate le résultat WhisperX au format attendu"""
@@ -311,6 +790,8 @@ class Transcriber:
             # Ajouter le speaker si présent
             if 'speaker' in seg:
                 segment['speaker'] = seg['speaker']
+            if 'confiance_speaker' in seg:
+                segment['confiance_speaker'] = seg['confiance_speaker']
 
             segments_formates.append(segment)
             texte_complet.append(seg['text'].strip())
@@ -335,20 +816,24 @@ class Transcriber:
             f"{chemin_sortie.stem}_timestamps.txt"
         )
         with open(fichier_timestamps, 'w', encoding='utf-8') as f:
-            for seg in transcription['segments']:
-                temps_debut = self._formater_temps(seg['debut'])
-                temps_fin = self._formater_temps(seg['fin'])
-
-                # Ajouter speaker si disponible
-                speaker = seg.get('speaker', '')
-                prefix = f"[{speaker}] " if speaker else ""
-
-                f.write(f"[{temps_debut} - {temps_fin}] {prefix}{seg['texte']}\n")
+            self._ecrire_timestamps(f, transcription['segments'])
 
         print(f"💾 Transcription sauvegardée :")
         print(f"   📄 Texte : {fichier_texte.name}")
         print(f"   ⏱️  Avec timestamps : {fichier_timestamps.name}")
 
+    def _ecrire_timestamps(self, fichier, segments: List[dict]):
+        """Écrit une ligne horodatée par segment (et speaker si disponible)"""
+        for seg in segments:
+            temps_debut = self._formater_temps(seg['debut'])
+            temps_fin = self._formater_temps(seg['fin'])
+
+            # Ajouter speaker si disponible
+            speaker = seg.get('speaker', '')
+            prefix = f"[{speaker}] " if speaker else ""
+
+            fichier.write(f"[{temps_debut} - {temps_fin}] {prefix}{seg['texte']}\n")
+
     @staticmethod
     def _formater_temps(secondes: float) -> str:
         """Formate les secondes en MM:SS"""
@@ -0,0 +1,139 @@
+"""
+Module de détection d'activité vocale (VAD) par énergie
+Repère les zones de parole d'une forme d'onde 16 kHz en un seul passage
+vectorisé, pour n'envoyer au modèle que ces zones ; les horodatages
+obtenus sur l'audio compacté sont ensuite replacés sur l'original
+"""
+
+from typing import List
+
+import numpy as np
+
+from .flux_transcription import DUREE_TRAME, TAUX_WHISPER, energie_trames
+
+
+# Une trame est parlée si elle dépasse le bruit de fond (10e centile) de cet écart
+ECART_BRUIT_DB = 12
+
+# Plafond du seuil : un passage entièrement parlé reste entier
+SEUIL_MAX_DB = -40
+
+# Silence inséré entre deux zones de parole dans l'audio compacté (secondes)
+DUREE_JONCTION = 0.2
+
+
+def detecter_parole(
+    audio: np.ndarray,
+    marge: float = 0.3,
+    silence_min: float = 1.0,
+    taux: int = TAUX_WHISPER
+) -> np.ndarray:
+    """
+    Zones de parole d'une forme d'onde
+
+    Args:
+        audio: Échantillons float32 mono
+        marge: Contexte gardé avant et après chaque zone (secondes)
+        silence_min: Les silences plus courts ne coupent pas (secondes)
+        taux: Fréquence d'échantillonnage
+
+    Returns:
+        Tableau (n, 2) de plages [debut, fin[ en indices d'échantillons
+    """
+    taille_trame = int(DUREE_TRAME * taux)
+    energie = energie_trames(audio, taille_trame)
+    if not len(energie):
+        return np.array([[0, len(audio)]]) if len(audio) else np.zeros((0, 2), np.int64)
+
+    db = 10 * np.log10(energie + 1e-10)
+    seuil = min(np.percentile(db, 10) + ECART_BRUIT_DB, SEUIL_MAX_DB)
+    actif = db > seuil
+
+    bords = np.diff(np.concatenate(([0], actif.astype(np.int8), [0])))
+    debuts = np.flatnonzero(bords == 1)
+    fins = np.flatnonzero(bords == -1)
+    if not len(debuts):
+        return np.zeros((0, 2), np.int64)
+
+    # Marges, puis fusion des zones séparées par un silence trop court
+    trames_marge = int(round(marge / DUREE_TRAME))
+    debuts = np.maximum(debuts - trames_marge, 0)
+    fins = np.minimum(fins + trames_marge, len(actif))
+
+    separees = debuts[1:] - fins[:-1] >= int(round(silence_min / DUREE_TRAME))
+    debuts = debuts[np.concatenate(([True], separees))]
+    fins = fins[np.concatenate((separees, [True]))]
+
+    zones = np.stack([debuts, fins], axis=1) * taille_trame
+    if fins[-1] == len(actif):
+        # La trame incomplète de la fin suit la dernière zone
+        zones[-1, 1] = len(audio)
+    return zones
+
+
+def compacter(audio: np.ndarray, zones: np.ndarray, taux: int = TAUX_WHISPER) -> tuple:
+    """
+    Audio réduit à ses zones de parole
+
+    Returns:
+        Tuple (audio compacté, plan) ; le plan sert à replacer_segments()
+    """
+    jonction = int(DUREE_JONCTION * taux)
+    longueurs = zones[:, 1] - zones[:, 0]
+    debuts_compacts = np.concatenate(([0], np.cumsum(longueurs + jonction)[:-1])).astype(np.int64)
+
+    compact = np.zeros(int(longueurs.sum() + jonction * max(len(zones) - 1, 0)), np.float32)
+    for (debut, fin), position in zip(zones, debuts_compacts):
+        compact[position:position + fin - debut] = audio[debut:fin]
+
+    return compact, {'zones': zones, 'debuts_compacts': debuts_compacts, 'taux': taux}
+
+
+def proportion_silence(audio: np.ndarray, zones: np.ndarray) -> float:
+    """Part de l'audio retirée par le compactage"""
+    if not len(audio):
+        return 0.0
+    return 1.0 - float((zones[:, 1] - zones[:, 0]).sum()) / len(audio)
+
+
+def replacer_temps(temps: np.ndarray, plan: dict) -> np.ndarray:
+    """Convertit des instants de l'audio compacté (secondes) en instants de l'original"""
+    zones = plan['zones']
+    if not len(zones):
+        return temps
+    taux = plan['taux']
+    position = np.asarray(temps, np.float64) * taux
+
+    i = np.searchsorted(plan['debuts_compacts'], position, side='right') - 1
+    i = np.clip(i, 0, len(zones) - 1)
+    decalage = np.clip(position - plan['debuts_compacts'][i], 0, zones[i, 1] - zones[i, 0])
+    return (zones[i, 0] + decalage) / taux
+
+
+def replacer_segments(segments: List[dict], plan: dict) -> List[dict]:
+    """Replace des segments WhisperX (et leurs mots) sur la ligne de temps d'origine"""
+    # Tous les instants convertis en un seul appel
+    references = []
+    for i, seg in enumerate(segments):
+        for cle in ('start', 'end'):
+            if seg.get(cle) is not None:
+                references.append((i, None, cle, seg[cle]))
+        for j, mot in enumerate(seg.get('words', [])):
+            for cle in ('start', 'end'):
+                if mot.get(cle) is not None:
+                    references.append((i, j, cle, mot[cle]))
+
+    resultat = [
+        dict(seg, words=[dict(m) for m in seg['words']]) if 'words' in seg else dict(seg)
+        for seg in segments
+    ]
+    if not references:
+        return resultat
+
+    temps = replacer_temps(np.array([r[3] for r in references]), plan)
+    for (i, j, cle, _), valeur in zip(references, temps.tolist()):
+        if j is None:
+            resultat[i][cle] = valeur
+        else:
+            resultat[i]['words'][j][cle] = valeur
+    return resultat
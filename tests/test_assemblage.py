@@ -0,0 +1,54 @@
+"""
+Tests de l'assemblage du montage : export en flux contre assemblage en mémoire
+"""
+
+import wave
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+
+from src import assemblage
+
+FORMAT = {'canaux': 2, 'taux_echantillonnage': 16000, 'largeur_echantillon': 2}
+
+
+def _extraits(appels):
+    """Segments différés dont chaque extraction est comptée"""
+    rng = np.random.default_rng(0)
+    extraits = []
+    for i, duree_s in enumerate((0.8, 1.3, 0.5)):
+        donnees = (rng.standard_normal(int(16000 * duree_s) * 2) * 3000).astype('<i2')
+        audio = AudioSegment(data=donnees.tobytes(), sample_width=2, frame_rate=16000, channels=2)
+
+        def charger(i=i, audio=audio):
+            appels[i] += 1
+            return audio
+
+        extraits.append(assemblage.SourceDifferee(charger, FORMAT, int(audio.frame_count())))
+    return extraits
+
+
+def _plan(appels):
+    return assemblage.planifier_montage(_extraits(appels), 200, format_sortie=FORMAT)
+
+
+@pytest.mark.parametrize('parametres_sonie', [
+    None,
+    {'cible_lufs': -16.0, 'plafond_true_peak': -1.0},
+])
+def test_export_normalise_extrait_chaque_segment_une_fois(tmp_path, parametres_sonie):
+    appels = [0, 0, 0]
+    sortie = tmp_path / 'montage.wav'
+    assemblage.exporter_en_flux(
+        _plan(appels), [(sortie, {'format': 'wav'})], {},
+        normaliser=True, parametres_sonie=parametres_sonie
+    )
+    assert appels == [1, 1, 1]
+
+    attendu = assemblage.assembler(
+        _plan([0, 0, 0]), normaliser=True, parametres_sonie=parametres_sonie
+    )
+    with wave.open(str(sortie), 'rb') as wav:
+        assert wav.readframes(wav.getnframes()) == attendu.raw_data
+    assert not list(tmp_path.glob('.reprise_*'))
@@ -0,0 +1,74 @@
+"""
+Tests du traitement audio : concaténation en flux contre pydub
+"""
+
+import wave
+
+import numpy as np
+import pytest
+
+from src.audio_processor import AudioProcessor
+
+
+def _ecrire_wav(chemin, taux, canaux, duree_s, graine, largeur=2):
+    """WAV de bruit aléatoire"""
+    rng = np.random.default_rng(graine)
+    nb = int(taux * duree_s) * canaux
+    types = {1: np.uint8, 2: np.int16, 4: np.int32}
+    info = np.iinfo(types[largeur])
+    donnees = rng.integers(info.min, info.max, nb, dtype=types[largeur], endpoint=True)
+    with wave.open(str(chemin), 'wb') as wav:
+        wav.setnchannels(canaux)
+        wav.setsampwidth(largeur)
+        wav.setframerate(taux)
+        wav.writeframes(donnees.tobytes())
+    return chemin
+
+
+def _processeur():
+    return AudioProcessor({'audio': {'processus_decodage': 1}})
+
+
+def _donnees(chemin):
+    with wave.open(str(chemin), 'rb') as wav:
+        return (
+            wav.getnchannels(), wav.getframerate(), wav.getsampwidth(),
+            wav.readframes(wav.getnframes())
+        )
+
+
+@pytest.mark.parametrize('formats', [
+    # 44,1 kHz stéréo, 44,1 kHz stéréo, puis 48 kHz mono : l'accumulateur est rééchantillonné
+    [(44100, 2, 2), (44100, 2, 2), (48000, 1, 2)],
+    # Promotions successives : canaux, fréquence, puis largeur d'échantillon
+    [(22050, 1, 2), (22050, 2, 2), (32000, 1, 2), (16000, 2, 4), (44100, 1, 1)],
+    # Un fichier au format maximal au milieu
+    [(16000, 1, 2), (48000, 2, 2), (44100, 1, 2)],
+])
+def test_flux_identique_a_pydub_formats_melanges(tmp_path, formats):
+    fichiers = [
+        _ecrire_wav(tmp_path / f"{i:02d}.wav", taux, canaux, 0.7 + 0.13 * i, i, largeur)
+        for i, (taux, canaux, largeur) in enumerate(formats)
+    ]
+
+    processeur = _processeur()
+    sortie_pydub = tmp_path / 'pydub.wav'
+    processeur.concatener_fichiers(fichiers, sortie_pydub, en_flux=False)
+    durees_pydub = processeur.durees_concatenees
+
+    sortie_flux = tmp_path / 'flux.wav'
+    processeur.concatener_fichiers(fichiers, sortie_flux, en_flux=True)
+
+    assert _donnees(sortie_flux) == _donnees(sortie_pydub)
+    assert len(processeur.durees_concatenees) == len(durees_pydub)
+
+
+def test_copie_directe_formats_identiques(tmp_path):
+    fichiers = [_ecrire_wav(tmp_path / f"{i}.wav", 44100, 2, 0.5, i) for i in range(3)]
+
+    processeur = _processeur()
+    processeur.concatener_fichiers(fichiers, tmp_path / 'pydub.wav', en_flux=False)
+    processeur.concatener_fichiers(fichiers, tmp_path / 'flux.wav', en_flux=True)
+
+    assert _donnees(tmp_path / 'flux.wav') == _donnees(tmp_path / 'pydub.wav')
+    assert processeur.durees_concatenees == [0.5, 0.5, 0.5]
@@ -0,0 +1,62 @@
+"""
+Tests du cache des rendus de montage
+"""
+
+from pydub import AudioSegment
+
+from src.assemblage import SourceDifferee
+from src.cache_rendu import CacheRendu, CacheSegments, empreinte_fichier
+
+
+def test_empreinte_stat_distingue_les_homonymes(tmp_path):
+    for dossier in ('a', 'b'):
+        (tmp_path / dossier).mkdir()
+        (tmp_path / dossier / 'piste.wav').write_bytes(b'x' * 100)
+
+    assert (
+        empreinte_fichier(tmp_path / 'a' / 'piste.wav')
+        != empreinte_fichier(tmp_path / 'b' / 'piste.wav')
+    )
+
+
+def test_enregistrer_garde_une_entree_concurrente(tmp_path):
+    rendu = tmp_path / 'rendu.wav'
+    rendu.write_bytes(b'RIFF' * 10)
+    cache = CacheRendu(tmp_path / 'cache')
+    cache.enregistrer('cle', [rendu], {'infos': 'premier'})
+
+    # Un autre processus a déjà renommé son entrée : la nôtre est abandonnée
+    cache.enregistrer('cle', [rendu], {'infos': 'second'})
+
+    assert cache.chercher('cle')['infos'] == 'premier'
+    assert [f.name for f in cache.dossier.iterdir()] == ['cle']
+
+
+def _source_differee(cache):
+    audio = AudioSegment(data=bytes(400), sample_width=2, frame_rate=8000, channels=1)
+    format_pcm = {'canaux': 1, 'taux_echantillonnage': 8000, 'largeur_echantillon': 2}
+    return SourceDifferee(lambda: audio, format_pcm, 200, cache=cache, cle_cache='seg'), format_pcm
+
+
+def test_segments_comptes_une_fois_par_element(tmp_path):
+    cache = CacheSegments(tmp_path)
+
+    # Passe de mesure puis passe d'écriture d'un même montage
+    element, format_pcm = _source_differee(cache)
+    element.charger_au_format(format_pcm)
+    element.charger_au_format(format_pcm)
+    assert (cache.succes, cache.echecs) == (0, 1)
+
+    element, format_pcm = _source_differee(cache)
+    element.charger_au_format(format_pcm)
+    element.charger_au_format(format_pcm)
+    assert (cache.succes, cache.echecs) == (1, 1)
+
+
+def test_cache_segments_dans_le_cache_utilisateur(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+
+    cache = CacheSegments.depuis_config({'montage_incremental': True})
+
+    assert cache.dossier == tmp_path / 'podcasteur' / 'segments'
+    assert CacheSegments.depuis_config({'montage_incremental': False}) is None
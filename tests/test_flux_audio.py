@@ -0,0 +1,58 @@
+"""
+Tests de la lecture des WAV projetés en mémoire
+"""
+
+import wave
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+
+from src import flux_audio
+from src.decoupage import Decoupage
+
+
+@pytest.fixture
+def chemin_wav(tmp_path):
+    rng = np.random.default_rng(0)
+    donnees = rng.integers(-20000, 20000, 44100 * 2 * 2, dtype=np.int16)
+    chemin = tmp_path / 'source.wav'
+    with wave.open(str(chemin), 'wb') as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(44100)
+        wav.writeframes(donnees.tobytes())
+    return chemin
+
+
+@pytest.mark.parametrize('debut_ms, fin_ms', [
+    (250, 1500),
+    (-500, 2000),
+    (-1500, -200),
+    (1999, 2500),
+])
+def test_plage_identique_a_pydub(chemin_wav, debut_ms, fin_ms):
+    reference = AudioSegment.from_wav(chemin_wav)[debut_ms:fin_ms]
+    wav = flux_audio.WavMappe.ouvrir(chemin_wav)
+
+    assert wav[debut_ms:fin_ms].raw_data == reference.raw_data
+    assert flux_audio.LecteurSegments().extraire(chemin_wav, debut_ms, fin_ms).raw_data == (
+        reference.raw_data
+    )
+
+
+def test_plage_negative_bornee_au_debut(chemin_wav):
+    wav = flux_audio.WavMappe.ouvrir(chemin_wav)
+
+    assert wav.plage(-5000, 200) == (0, 8820)
+    assert flux_audio.LecteurSegments().nb_frames_plage(chemin_wav, -5000, 200) == 8820
+
+
+def test_segments_prepares_sans_copie(chemin_wav):
+    decoupage = {'segments': [{'fichier': chemin_wav.name, 'debut': 0.5, 'fin': 1.25}]}
+
+    segment, = Decoupage({}).convertir_en_segments(decoupage, chemin_wav.parent)
+
+    assert not segment['audio'].flags.owndata
+    assert segment['taux'] == 44100
+    assert segment['audio'].shape == (33075, 2)
@@ -0,0 +1,62 @@
+"""
+Tests de la transcription par fenêtres : recollage des segments au chevauchement
+"""
+
+import pytest
+
+from src import flux_transcription
+
+# Deux fenêtres coupées à 600 s, chacune débordant de 2 s sur l'autre
+FENETRE_A = {'decalage': 0.0, 'debut': 0.0, 'fin': 600.0}
+FENETRE_B = {'decalage': 598.0, 'debut': 600.0, 'fin': 1200.0}
+
+
+def _segment(start, end, texte):
+    return {
+        'start': start, 'end': end, 'text': texte,
+        'words': [{'word': texte, 'start': start, 'end': end}, {'word': '42'}]
+    }
+
+
+def _recoller(fenetre, segments):
+    decales = flux_transcription.decaler_segments(segments, fenetre['decalage'])
+    return flux_transcription.garder_plage(decales, fenetre['debut'], fenetre['fin'])
+
+
+def test_chevauchement_garde_chaque_segment_une_fois():
+    # Les mêmes paroles vues par les deux fenêtres (temps locaux à chaque fenêtre)
+    segments_a = [
+        _segment(590.0, 597.0, 'avant'),
+        _segment(597.0, 601.5, 'milieu avant la coupe'),
+        _segment(599.5, 601.5, 'milieu après la coupe'),
+        _segment(599.0, 601.0, 'milieu sur la coupe'),
+    ]
+    segments_b = [
+        _segment(-1.0, 3.5, 'milieu avant la coupe'),
+        _segment(1.5, 3.5, 'milieu après la coupe'),
+        _segment(1.0, 3.0, 'milieu sur la coupe'),
+        _segment(3.5, 9.0, 'après'),
+    ]
+
+    textes = [
+        seg['text']
+        for fenetre, segments in ((FENETRE_A, segments_a), (FENETRE_B, segments_b))
+        for seg in _recoller(fenetre, segments)
+    ]
+
+    assert textes == [
+        'avant', 'milieu avant la coupe',
+        'milieu après la coupe', 'milieu sur la coupe', 'après'
+    ]
+
+
+def test_decaler_segments_et_mots():
+    segments = [_segment(1.5, 3.5, 'bonjour')]
+
+    decales = flux_transcription.decaler_segments(segments, 598.0)
+
+    assert (decales[0]['start'], decales[0]['end']) == (pytest.approx(599.5), pytest.approx(601.5))
+    assert decales[0]['words'][0]['start'] == pytest.approx(599.5)
+    # Un mot sans horodatage le reste ; l'entrée n'est pas modifiée
+    assert 'start' not in decales[0]['words'][1]
+    assert segments[0]['start'] == 1.5
@@ -0,0 +1,60 @@
+"""
+Tests de la pré-passe VAD : retour des horodatages sur l'audio d'origine
+"""
+
+import numpy as np
+import pytest
+
+from src import vad
+
+TAUX = 1000
+
+
+@pytest.fixture
+def plan():
+    # Trois zones de parole ; jonctions de 200 échantillons dans l'audio compacté
+    zones = np.array([[1000, 2000], [5000, 5500], [9000, 10000]])
+    audio = np.zeros(12000, np.float32)
+    compact, plan = vad.compacter(audio, zones, TAUX)
+    assert plan['debuts_compacts'].tolist() == [0, 1200, 1900]
+    assert len(compact) == 2900
+    return plan
+
+
+@pytest.mark.parametrize('compact, original', [
+    (0.0, 1.0),      # début de la première zone
+    (0.5, 1.5),      # intérieur d'une zone
+    (1.0, 2.0),      # fin de la première zone
+    (1.1, 2.0),      # jonction : ramenée à la fin de la zone qui précède
+    (1.199, 2.0),    # fin de jonction
+    (1.2, 5.0),      # début de la deuxième zone
+    (1.7, 5.5),      # fin de la deuxième zone
+    (1.9, 9.0),      # début de la dernière zone
+    (2.9, 10.0),     # fin de l'audio compacté
+    (3.5, 10.0),     # au-delà : borné à la fin de la dernière zone
+    (-0.1, 1.0),     # avant le début : borné au début de la première zone
+])
+def test_replacer_temps_aux_bornes(plan, compact, original):
+    assert vad.replacer_temps(np.array([compact]), plan)[0] == pytest.approx(original)
+
+
+def test_replacer_temps_sans_zone():
+    temps = np.array([0.5, 1.5])
+    plan = {'zones': np.zeros((0, 2), np.int64), 'debuts_compacts': np.zeros(0), 'taux': TAUX}
+    assert vad.replacer_temps(temps, plan) is temps
+
+
+def test_replacer_segments_et_mots(plan):
+    segments = [{
+        'start': 0.8, 'end': 1.5, 'text': 'bonjour',
+        'words': [{'word': 'bon', 'start': 0.8, 'end': 1.1}, {'word': 'jour', 'start': 1.3}]
+    }]
+
+    replaces = vad.replacer_segments(segments, plan)
+
+    assert replaces[0]['start'] == pytest.approx(1.8)
+    assert replaces[0]['end'] == pytest.approx(5.3)
+    assert [m.get('end') for m in replaces[0]['words']] == [pytest.approx(2.0), None]
+    assert replaces[0]['words'][1]['start'] == pytest.approx(5.1)
+    # Les segments d'entrée ne sont pas modifiés
+    assert segments[0]['start'] == 0.8